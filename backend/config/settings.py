@@ -149,3 +149,9 @@ MEDIA_ROOT = BASE_DIR / 'media'
 # ── Default primary key ───────────────────────────────────────────────────────
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# ── Transaction import ────────────────────────────────────────────────────────
+
+# Optional client-side filter of already-imported IDs (see transactions/known_ids.py).
+# Unset disables it; e.g. BASE_DIR / 'known_ids.npz'.
+KNOWN_IDS_PATH = os.getenv('KNOWN_IDS_PATH')
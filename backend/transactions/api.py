@@ -3,12 +3,13 @@ transactions/api.py — Django Ninja API endpoints.
 
 Endpoints:
     POST /api/transactions/import  — upload and import a single CSV file
+    POST /api/transactions/import-batch — upload and import several CSV files for one account
     GET  /api/accounts             — list accounts for a household
     GET  /api/banks                — list banks with their account types
     GET  /api/accounts/detect      — detect account type from filename
+    POST /api/accounts/detect      — detect account type from the uploaded file's header
 """
 
-import io
 import logging
 from typing import List, Optional
 
@@ -16,9 +17,12 @@ from django.shortcuts import get_object_or_404
 from ninja import NinjaAPI, File, Schema
 from ninja.files import UploadedFile
 
+from .known_ids import KnownIdFilter
 from .models import Account, Bank
-from .utils import detect_account_type, upsert_transactions
+from .utils import detect_account_type, load_known_ids, upsert_transactions
 from transactions.handlers.accounts import ACCOUNT_HANDLERS
+from transactions.handlers.dates import shared_date_cache
+from transactions.handlers.detect import read_head
 
 logger = logging.getLogger(__name__)
 
@@ -77,8 +81,40 @@ def import_transactions(
     after filename-based detection suggests a type.
     """
     account = get_object_or_404(Account, id=account_id)
-    handler = ACCOUNT_HANDLERS.get(account.handler_key)
+    known_ids = load_known_ids()
+    result = _import_file(account, file, known_ids)
+    if known_ids is not None:
+        known_ids.save()
+    return result
+
 
+@api.post('/transactions/import-batch', response=List[FileImportResult])
+def import_transactions_batch(
+    request,
+    account_id: int,
+    files:      List[UploadedFile] = File(...),
+):
+    """
+    Import several CSV files for the same account, e.g. a year of monthly
+    statements. Each file is imported and reported on independently;
+    dates are parsed through one cache shared by the whole batch.
+    """
+    account = get_object_or_404(Account, id=account_id)
+    known_ids = load_known_ids()
+    with shared_date_cache():
+        results = [_import_file(account, file, known_ids) for file in files]
+    if known_ids is not None:
+        known_ids.save()
+    return results
+
+
+def _import_file(
+    account:   Account,
+    file:      UploadedFile,
+    known_ids: Optional[KnownIdFilter] = None,
+) -> FileImportResult:
+    """Process and upsert one uploaded CSV file, reporting any error in the result."""
+    handler = ACCOUNT_HANDLERS.get(account.handler_key)
     if handler is None:
         return FileImportResult(
             filename=file.name,
@@ -89,9 +125,8 @@ def import_transactions(
         )
 
     try:
-        content = file.read()
-        buffer  = io.BytesIO(content)
-        df      = handler.process(buffer)
+        # Handlers read uploads directly — large ones from their temporary file
+        df = handler.process(file)
 
         if df is None or df.empty:
             return FileImportResult(
@@ -102,7 +137,7 @@ def import_transactions(
                 error='File produced no valid transactions.',
             )
 
-        counts = upsert_transactions(df, account)
+        counts = upsert_transactions(df, account, known_ids)
         return FileImportResult(filename=file.name, **counts)
 
     except Exception as e:
@@ -176,3 +211,19 @@ def detect_account(request, filename: str):
         handler_key=handler_key,
         detected=handler_key is not None,
     )
+
+
+@api.post('/accounts/detect', response=DetectResponse)
+def detect_account_from_file(request, file: UploadedFile = File(...)):
+    """
+    Suggest an account type from the uploaded file's header content.
+    Only the first few KB are read; the filename breaks ties between
+    accounts that share an export format.
+    """
+    head, truncated = read_head(file)
+    handler_key = detect_account_type(file.name, head=head, truncated=truncated)
+    return DetectResponse(
+        filename=file.name,
+        handler_key=handler_key,
+        detected=handler_key is not None,
+    )
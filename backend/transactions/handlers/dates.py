@@ -0,0 +1,96 @@
+"""
+handlers/dates.py — Memoized date parsing for account handlers.
+
+A statement repeats a small set of dates, so each distinct date string is
+parsed once and broadcast back to its rows. Inside a `shared_date_cache()`
+block, parsed dates are also remembered across files, keyed by
+(format, string), so a multi-file import parses each date only once.
+
+Usage:
+
+    from handlers.dates import shared_date_cache
+
+    with shared_date_cache():
+        for file_path in file_paths:
+            handler.process(file_path)
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+import pandas as pd
+
+DEFAULT_MAXSIZE = 4096  # ~10 years of daily dates in a single format
+
+_active_cache: ContextVar[Optional[DateParseCache]] = ContextVar('date_parse_cache', default=None)
+
+
+class DateParseCache:
+    """Size-bounded LRU of parsed dates keyed by (format, string)."""
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def parse(self, values: pd.Index, date_format: str) -> pd.DatetimeIndex:
+        """Parse distinct, non-null date strings, reusing earlier results."""
+        found = {}
+        missing = []
+        for value in values:
+            key = (date_format, value)
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                found[value] = self._entries[key]
+            else:
+                missing.append(value)
+
+        if missing:
+            parsed = pd.to_datetime(pd.Index(missing), format=date_format)
+            found.update(zip(missing, parsed))
+            for value, timestamp in zip(missing, parsed):
+                self._entries[(date_format, value)] = timestamp
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+        return pd.DatetimeIndex([found[value] for value in values])
+
+
+@contextmanager
+def shared_date_cache(maxsize: int = DEFAULT_MAXSIZE) -> Iterator[DateParseCache]:
+    """Share one DateParseCache across every parse_dates call in the block."""
+    cache = DateParseCache(maxsize)
+    token = _active_cache.set(cache)
+    try:
+        yield cache
+    finally:
+        _active_cache.reset(token)
+
+
+def parse_dates(values: pd.Series, date_format: str) -> pd.Series:
+    """
+    Equivalent of pd.to_datetime(values, format=date_format) that parses
+    each distinct value once, through the shared cache when one is active.
+    """
+    codes, uniques = pd.factorize(values)
+    if len(uniques) == 0:
+        return pd.to_datetime(values, format=date_format)
+
+    cache = _active_cache.get()
+    if cache is None:
+        parsed = pd.to_datetime(pd.Index(uniques), format=date_format)
+    else:
+        parsed = cache.parse(uniques, date_format)
+
+    # Missing values have code -1 and become NaT
+    return pd.Series(
+        parsed.take(codes, allow_fill=True, fill_value=pd.NaT),
+        index=values.index,
+        name=values.name,
+    )
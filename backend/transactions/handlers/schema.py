@@ -0,0 +1,83 @@
+"""
+handlers/schema.py — Compact column dtypes for transaction frames.
+
+Handler output and query results share one schema:
+
+    ID, Concept, Additional Labels   Arrow-backed strings
+    Account, Label, Category         categoricals — a handful of distinct values
+    Amount                           int64 cents
+    ID Scheme                        int8
+
+A full-history frame then takes a fraction of the memory of object
+columns and floats, and group-bys on account or category work on integer
+codes. Cents keep sums exact; convert them back with dollars() where
+amounts leave the app (database, spreadsheet). Write boundaries take
+Amount in cents unless told otherwise, e.g. upsert_transactions(df,
+amount_unit=DOLLARS) — the dtype alone cannot tell whole dollars from cents.
+
+Usage:
+
+    from handlers.schema import concat, dollars
+
+    df = concat(frames)                     # Keeps categoricals categorical
+    totals = df.groupby('Account', observed=True)['Amount'].sum()
+    dollars(totals)
+"""
+
+from __future__ import annotations
+
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+CENTS_PER_DOLLAR = 100
+CENTS, DOLLARS = 'cents', 'dollars'  # Amount units for dollars()
+
+COLUMN_DTYPES = {
+    'ID':                'str',
+    'Concept':           'str',
+    'Account':           'category',
+    'Label':             'category',
+    'Category':          'category',
+    'Additional Labels': 'str',
+    'ID Scheme':         'int8',
+}
+
+
+def to_cents(amounts) -> np.ndarray:
+    """Dollar amounts (floats or Decimals) → int64 cents, rounded to the nearest cent."""
+    values = np.asarray(amounts, dtype=float)
+    missing = np.isnan(values)
+    if missing.any():
+        raise ValueError(f'{missing.sum()} transactions have no amount')
+    return np.rint(values * CENTS_PER_DOLLAR).astype(np.int64)
+
+
+def dollars(amounts: pd.Series, unit: str = CENTS) -> pd.Series:
+    """
+    Amounts in `unit` — CENTS, the schema's, or DOLLARS — as float dollars.
+    The unit is declared, never guessed from the dtype; fractional cents
+    raise ValueError, so dollars passed as cents are not stored 100× too big.
+    """
+    if unit == DOLLARS:
+        return amounts.astype(float)
+    if unit != CENTS:
+        raise ValueError(f'Unknown amount unit: {unit!r} (expected {CENTS!r} or {DOLLARS!r})')
+    if not pd.api.types.is_integer_dtype(amounts) and (amounts.dropna() % 1 != 0).any():
+        raise ValueError('Amounts in cents must be whole numbers; declare dollar amounts with DOLLARS')
+    return amounts / CENTS_PER_DOLLAR
+
+
+def compact(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast the schema columns present in `df`; Amount must already be in cents."""
+    return df.astype({column: dtype for column, dtype in COLUMN_DTYPES.items() if column in df.columns})
+
+
+def concat(frames: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """
+    pd.concat for compact frames. Categoricals whose categories differ
+    between frames (e.g. one Account per handler) would come out as plain
+    objects; they are re-categorized here.
+    """
+    return compact(pd.concat(frames))
@@ -0,0 +1,67 @@
+"""
+transactions/management/commands/migrate_id_scheme.py — One-off migration
+of stored transaction IDs to scheme v2.
+
+Scheme v2 hashes the raw CSV record bytes, which the database does not
+keep, so the original statement files are re-read to pair every v1 ID
+with its v2 ID. Transactions whose source file is not passed in keep
+their v1 ID.
+
+Usage:
+    python manage.py migrate_id_scheme ../data/2025 ../data/2026/Chase.csv
+"""
+
+import os
+
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+
+from transactions.handlers.accounts import ACCOUNT_HANDLERS
+from transactions.handlers.detect import read_head
+from transactions.utils import detect_account_type, migrate_id_scheme
+
+
+class Command(BaseCommand):
+    help = 'Rewrite stored v1 transaction IDs to scheme v2 by re-reading the source CSV files.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help='CSV files, or directories of CSV files')
+
+    def handle(self, *args, **options):
+        mappings = []
+
+        for file_path in self._csv_files(options['paths']):
+            filename = os.path.basename(file_path)
+            # Route by header content, as imports do; the name only breaks ties
+            with open(file_path, 'rb') as stream:
+                head, truncated = read_head(stream)
+            handler_key = detect_account_type(filename, head=head, truncated=truncated)
+            if handler_key is None:
+                self.stderr.write(f'Skipping {filename}: unrecognized file format')
+                continue
+
+            try:
+                mappings.append(ACCOUNT_HANDLERS[handler_key].id_mapping(file_path))
+            except Exception as e:
+                self.stderr.write(f'Skipping {filename}: {e}')
+
+        if not mappings:
+            raise CommandError('No statement files could be read. Nothing to migrate.')
+
+        # Overlapping statements repeat rows; keep one v2 ID per v1 ID
+        mapping = pd.concat(mappings, ignore_index=True).drop_duplicates('v1')
+        result = migrate_id_scheme(mapping)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Migrated {result['migrated']} of {result['total']} mapped transactions to ID scheme v2."
+        ))
+
+    @staticmethod
+    def _csv_files(paths):
+        for path in paths:
+            if os.path.isdir(path):
+                for name in sorted(os.listdir(path)):
+                    if name.lower().endswith('.csv'):
+                        yield os.path.join(path, name)
+            else:
+                yield path
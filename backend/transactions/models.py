@@ -86,9 +86,12 @@ class Transaction(models.Model):
     Represents a single financial transaction.
     ID is an MD5 hash of the raw CSV row — generated before cleaning
     so that fields like balance disambiguate otherwise identical rows.
+    id_scheme records how the hash was computed (see handlers/base.py):
+    1 for the parsed row, 2 for the raw CSV record bytes.
     Labels and category are manually assigned and never overwritten on re-import.
     """
     id = models.CharField(max_length=32, primary_key=True)
+    id_scheme = models.PositiveSmallIntegerField(default=1)
     date = models.DateField()
     concept = models.TextField()
     amount = models.DecimalField(max_digits=12, decimal_places=2)
@@ -107,4 +110,6 @@ class Transaction(models.Model):
             models.Index(fields=['date'], name='idx_transactions_date'),
             models.Index(fields=['label'], name='idx_transactions_label'),
             models.Index(fields=['category'], name='idx_transactions_category'),
+            models.Index(fields=['account', 'date'], name='idx_transactions_account_date'),
+            models.Index(fields=['imported_at'], name='idx_transactions_imported_at'),
         ]
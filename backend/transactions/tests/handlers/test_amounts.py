@@ -0,0 +1,110 @@
+"""
+tests/unit/handlers/test_amounts.py — Unit tests for declarative amount specs.
+"""
+
+import pytest
+import pandas as pd
+from io import StringIO
+
+from transactions.handlers.amounts import AmountSpec, Column, CreditMinusDebit, Negate, SignedByType
+from transactions.handlers.accounts import CapitalOneCheckingHandler, CapitalOneQuicksilverHandler
+
+
+# ── AmountSpec ────────────────────────────────────────────────────────────────
+
+class TestAmountSpec:
+
+    def test_incomplete_spec_cannot_be_created(self):
+        class EvaluateOnly(AmountSpec):
+            def evaluate(self, df):
+                return df['Amount']
+
+        with pytest.raises(TypeError, match='columns'):
+            EvaluateOnly()
+
+
+# ── Column / Negate ───────────────────────────────────────────────────────────
+
+class TestColumn:
+
+    def test_returns_column_as_is(self):
+        df = pd.DataFrame({'Amount': [-45.50, 2.45]})
+        assert Column('Amount').evaluate(df).tolist() == [-45.50, 2.45]
+
+    def test_negate_flips_sign(self):
+        df = pd.DataFrame({'Amount': [-45.50, 2.45]})
+        assert Negate(Column('Amount')).evaluate(df).tolist() == [45.50, -2.45]
+
+
+# ── SignedByType ──────────────────────────────────────────────────────────────
+
+class TestSignedByType:
+
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame({
+            'Transaction Amount': [45.50, 1152.91, 3.00],
+            'Transaction Type': ['Debit', 'Credit', None],
+        })
+
+    def test_positive_type_keeps_sign(self, df):
+        spec = SignedByType('Transaction Amount', 'Transaction Type', positive='Credit')
+        assert spec.evaluate(df).iloc[1] == pytest.approx(1152.91)
+
+    def test_other_types_are_negated(self, df):
+        spec = SignedByType('Transaction Amount', 'Transaction Type', positive='Credit')
+        assert spec.evaluate(df).tolist() == [-45.50, 1152.91, -3.00]
+
+    def test_preserves_index(self, df):
+        df.index = [5, 6, 7]
+        spec = SignedByType('Transaction Amount', 'Transaction Type')
+        assert list(spec.evaluate(df).index) == [5, 6, 7]
+
+
+# ── CreditMinusDebit ──────────────────────────────────────────────────────────
+
+class TestCreditMinusDebit:
+
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame({
+            'Description': ['TRADER JOES', None],
+            'Credit': [None, 1152.91],
+            'Debit': [45.50, None],
+        })
+
+    def test_blank_cells_count_as_zero(self, df):
+        spec = CreditMinusDebit('Credit', 'Debit')
+        spec.prepare(df)
+        assert spec.evaluate(df).tolist() == [-45.50, 1152.91]
+
+    def test_prepare_only_fills_its_own_columns(self, df):
+        CreditMinusDebit('Credit', 'Debit').prepare(df)
+        assert pd.isna(df['Description'].iloc[1])
+
+
+# ── Hash input stability ──────────────────────────────────────────────────────
+
+class TestDerivedAmountIds:
+    """Derived amounts were always hashed as an extra trailing column."""
+
+    def test_capital_one_ids_include_derived_amount(self, mocker):
+        csv = (
+            "Transaction Date,Transaction Description,Transaction Amount,Transaction Type\n"
+            "01/15/26,TRADER JOES,45.50,Debit\n"
+        )
+        mocker.patch('pandas.read_csv', return_value=pd.read_csv(StringIO(csv)))
+        result = CapitalOneCheckingHandler().process('fake.csv')
+        expected = CapitalOneCheckingHandler._generate_id(
+            pd.Series(['01/15/26', 'TRADER JOES', 45.50, 'Debit', -45.50], dtype=object)
+        )
+        assert result['ID'].iloc[0] == expected
+
+    def test_quicksilver_ids_hash_blank_amounts_as_zero(self, mocker):
+        csv = "Transaction Date,Description,Credit,Debit\n2026-01-15,TRADER JOES,,45.50\n"
+        mocker.patch('pandas.read_csv', return_value=pd.read_csv(StringIO(csv)))
+        result = CapitalOneQuicksilverHandler().process('fake.csv')
+        expected = CapitalOneQuicksilverHandler._generate_id(
+            pd.Series(['2026-01-15', 'TRADER JOES', 0.0, 45.50, -45.50], dtype=object)
+        )
+        assert result['ID'].iloc[0] == expected
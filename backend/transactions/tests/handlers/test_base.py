@@ -2,11 +2,14 @@
 tests/unit/handlers/test_base.py — Unit tests for BaseHandler.
 """
 
+import hashlib
+import mmap
 import pytest
 import pandas as pd
-from io import StringIO
+from io import BytesIO, StringIO
 
-from transactions.handlers.base import BaseHandler
+from transactions.handlers import base
+from transactions.handlers.base import BaseHandler, ID_SCHEME_V1, ID_SCHEME_V2
 
 
 # ── Minimal concrete handlers for testing ─────────────────────────────────────
@@ -65,6 +68,38 @@ class TestGenerateId:
         assert BaseHandler._generate_id(row1) != BaseHandler._generate_id(row2)
 
 
+class TestGenerateIds:
+
+    @pytest.fixture
+    def raw_df(self):
+        return pd.read_csv(StringIO(
+            "Date,Description,Amount,Balance,Count\n"
+            "2026-01-15,TRADER JOES,-45.50,10000.00,3\n"
+            "2026-01-16,\"METRO, FARE\",-2.45,9997.55,4\n"
+        ))
+
+    def test_matches_row_wise_ids(self, raw_df):
+        expected = raw_df.apply(BaseHandler._generate_id, axis=1)
+        assert BaseHandler._generate_ids(raw_df).tolist() == expected.tolist()
+
+    def test_matches_row_wise_ids_for_all_numeric_frames(self, raw_df):
+        numeric = raw_df[['Amount', 'Count']]
+        expected = numeric.apply(BaseHandler._generate_id, axis=1)
+        assert BaseHandler._generate_ids(numeric).tolist() == expected.tolist()
+
+    def test_preserves_index(self, raw_df):
+        raw_df.index = [10, 20]
+        assert list(BaseHandler._generate_ids(raw_df).index) == [10, 20]
+
+    def test_renders_missing_cells_as_nan(self):
+        df = pd.DataFrame({'Date': ['2026-01-15'], 'Amount': [float('nan')]})
+        expected = BaseHandler._generate_id(pd.Series({'Date': '2026-01-15', 'Amount': 'nan'}))
+        assert BaseHandler._generate_ids(df).iloc[0] == expected
+
+    def test_empty_frame_produces_no_ids(self):
+        assert BaseHandler._generate_ids(pd.DataFrame({'Date': []})).empty
+
+
 # ── Output DataFrame shape ────────────────────────────────────────────────────
 
 class TestOutputShape:
@@ -78,7 +113,7 @@ class TestOutputShape:
         assert subject is not None
 
     def test_has_correct_columns(self, subject):
-        expected = ['ID', 'Date', 'Concept', 'Account', 'Amount', 'Label', 'Category', 'Additional Labels']
+        expected = ['ID', 'Date', 'Concept', 'Account', 'Amount', 'Label', 'Category', 'Additional Labels', 'ID Scheme']
         assert list(subject.columns) == expected
 
     def test_has_correct_row_count(self, subject):
@@ -93,14 +128,14 @@ class TestOutputShape:
     def test_date_is_datetime(self, subject):
         assert pd.api.types.is_datetime64_any_dtype(subject['Date'])
 
-    def test_label_is_none(self, subject):
-        assert subject['Label'].iloc[0] is None
+    def test_label_is_missing(self, subject):
+        assert pd.isna(subject['Label'].iloc[0])
 
-    def test_category_is_none(self, subject):
-        assert subject['Category'].iloc[0] is None
+    def test_category_is_missing(self, subject):
+        assert pd.isna(subject['Category'].iloc[0])
 
-    def test_additional_labels_is_none(self, subject):
-        assert subject['Additional Labels'].iloc[0] is None
+    def test_additional_labels_is_missing(self, subject):
+        assert pd.isna(subject['Additional Labels'].iloc[0])
 
 
 # ── Multiple rows ─────────────────────────────────────────────────────────────
@@ -129,7 +164,7 @@ class TestAmountPassthrough:
         return SimpleHandler().process('fake_path.csv')
 
     def test_amount_is_preserved(self, subject):
-        assert subject['Amount'].iloc[0] == pytest.approx(-45.50)
+        assert subject['Amount'].iloc[0] == -4550
 
 
 class TestAmountNegation:
@@ -140,7 +175,249 @@ class TestAmountNegation:
         return NegatingHandler().process('fake_path.csv')
 
     def test_amount_is_negated(self, subject):
-        assert subject['Amount'].iloc[0] == pytest.approx(45.50)
+        assert subject['Amount'].iloc[0] == 4550
+
+
+# ── Chunked processing ────────────────────────────────────────────────────────
+
+class TestProcessChunks:
+
+    @pytest.fixture
+    def csv_path(self, tmp_path):
+        path = tmp_path / 'statement.csv'
+        rows = ''.join(f'2026-01-{day:02d},PURCHASE {day},-{day}.50\n' for day in range(1, 11))
+        path.write_text('Date,Description,Amount\n' + rows)
+        return str(path)
+
+    def test_yields_batches_of_at_most_chunksize_rows(self, csv_path):
+        batches = list(SimpleHandler().process_chunks(csv_path, chunksize=4))
+        assert [len(b) for b in batches] == [4, 4, 2]
+
+    def test_batches_match_whole_file_processing(self, csv_path):
+        batches = pd.concat(SimpleHandler().process_chunks(csv_path, chunksize=3))
+        whole = SimpleHandler().process(csv_path)
+        pd.testing.assert_frame_equal(batches, whole)
+
+    @pytest.mark.parametrize('csv', [
+        'Date,Description,Amount\n2026-01-02,GROCERY,-12.34\n2026-01-03,REFUND,100\n',    # int batch after float
+        'Date,Description,Amount\n2026-01-02,REFUND,100\n2026-01-03,GROCERY,-12.34\n',    # float batch after int
+        'Date,Description,Amount,Ref\n2026-01-02,A,-1,7\n2026-01-03,B,-2,\n2026-01-04,C,-3,x1\n',  # int, blank, text
+    ])
+    def test_ids_match_whole_file_on_mixed_columns(self, tmp_path, csv):
+        path = tmp_path / 'statement.csv'
+        path.write_text(csv)
+        batches = pd.concat(SimpleHandler().process_chunks(str(path), chunksize=1))
+        assert batches['ID'].tolist() == SimpleHandler().process(str(path))['ID'].tolist()
+
+    def test_yields_nothing_for_missing_file(self):
+        assert list(SimpleHandler().process_chunks('nonexistent_file.csv')) == []
+
+    def test_reads_file_like_sources(self):
+        csv = b'Date,Description,Amount\n2026-01-02,GROCERY,-12.34\n2026-01-03,REFUND,100\n'
+        batches = pd.concat(SimpleHandler().process_chunks(BytesIO(csv), chunksize=1))
+        pd.testing.assert_frame_equal(batches, SimpleHandler().process(BytesIO(csv)))
+
+    def test_unseekable_source_is_rejected(self, caplog):
+        class Unseekable(BytesIO):
+            def seekable(self):
+                return False
+
+        csv = b'Date,Description,Amount\n2026-01-02,GROCERY,-12.34\n'
+        assert list(SimpleHandler().process_chunks(Unseekable(csv), chunksize=1)) == []
+        assert 'needs a seekable one' in caplog.text
+
+    def test_logs_error_for_missing_file(self, mocker):
+        mock_logger = mocker.patch('transactions.handlers.base.logger')
+        list(SimpleHandler().process_chunks('nonexistent_file.csv'))
+        mock_logger.error.assert_called_once()
+        assert 'nonexistent_file.csv' in mock_logger.error.call_args[0][0]
+
+
+# ── CSV engine and declared dtypes ────────────────────────────────────────────
+
+class ArrowHandler(SimpleHandler):
+    csv_engine = 'pyarrow'
+    csv_dtypes = {'Date': 'str', 'Description': 'str', 'Balance': 'float64'}
+
+
+class TestCsvEngine:
+
+    @pytest.fixture
+    def csv_path(self, tmp_path):
+        path = tmp_path / 'statement.csv'
+        path.write_text(
+            "Date,Description,Amount,Balance\n"
+            "2026-01-15,TRADER JOES,-45.50,\n"
+            "2026-01-16,\"METRO, FARE\",-2.45,9997.55\n"
+        )
+        return str(path)
+
+    def test_pyarrow_output_matches_default_engine(self, csv_path):
+        pd.testing.assert_frame_equal(ArrowHandler().process(csv_path), SimpleHandler().process(csv_path))
+
+    def test_declared_dtypes_are_applied(self, csv_path, mocker):
+        spy = mocker.spy(pd, 'read_csv')
+        ArrowHandler().process(csv_path)
+        assert spy.call_args.kwargs['dtype'] == ArrowHandler.csv_dtypes
+
+    def test_declared_dtypes_are_not_mutated(self, csv_path):
+        ArrowHandler().process(csv_path)
+        assert ArrowHandler.csv_dtypes == {'Date': 'str', 'Description': 'str', 'Balance': 'float64'}
+
+    def test_chunks_fall_back_to_default_engine(self, csv_path):
+        batches = list(ArrowHandler().process_chunks(csv_path, chunksize=1))
+        pd.testing.assert_frame_equal(pd.concat(batches), ArrowHandler().process(csv_path))
+
+
+# ── ID scheme v2 ──────────────────────────────────────────────────────────────
+
+class RawBytesHandler(SimpleHandler):
+    id_scheme = ID_SCHEME_V2
+
+
+class HeaderlessRawBytesHandler(RawBytesHandler):
+    date_format = '%m/%d/%Y'
+    csv_names = ['Date', 'Amount', '*', '_', 'Description']
+    csv_header = None
+    col_concept = 'Description'
+
+
+def md5(record: bytes) -> str:
+    return hashlib.md5(record).hexdigest()
+
+
+class TestIdSchemeV2:
+    CSV = (
+        b'Date,Description,Amount\r\n'
+        b'2026-01-15,TRADER JOES,-45.50\r\n'
+        b'\r\n'
+        b'2026-01-16,"METRO\r\nFARE, ""NYC""",-2.45\r\n'
+    )
+
+    @pytest.fixture
+    def csv_path(self, tmp_path):
+        path = tmp_path / 'statement.csv'
+        path.write_bytes(self.CSV)
+        return str(path)
+
+    def test_ids_hash_raw_record_bytes(self, csv_path):
+        subject = RawBytesHandler().process(csv_path)
+        assert subject['ID'].tolist() == [
+            md5(b'2026-01-15,TRADER JOES,-45.50'),
+            md5(b'2026-01-16,"METRO\r\nFARE, ""NYC""",-2.45'),
+        ]
+
+    def test_quoted_line_breaks_stay_in_their_record(self, csv_path):
+        subject = RawBytesHandler().process(csv_path)
+        assert subject['Concept'].iloc[1] == 'METRO\r\nFARE, "NYC"'
+
+    def test_records_the_scheme_version(self, csv_path):
+        assert (RawBytesHandler().process(csv_path)['ID Scheme'] == ID_SCHEME_V2).all()
+
+    def test_v1_remains_the_default(self, csv_path):
+        assert (SimpleHandler().process(csv_path)['ID Scheme'] == ID_SCHEME_V1).all()
+
+    def test_env_var_is_read_when_processing(self, csv_path, monkeypatch):
+        monkeypatch.setenv('ID_SCHEME', '2')
+        assert (SimpleHandler().process(csv_path)['ID Scheme'] == ID_SCHEME_V2).all()
+
+    def test_unknown_scheme_is_rejected(self, csv_path, monkeypatch):
+        monkeypatch.setenv('ID_SCHEME', '3')
+        assert SimpleHandler().process(csv_path) is None
+        assert list(SimpleHandler().process_chunks(csv_path)) == []
+
+    def test_other_columns_match_v1(self, csv_path):
+        v1 = SimpleHandler().process(csv_path).drop(columns=['ID', 'ID Scheme'])
+        v2 = RawBytesHandler().process(csv_path).drop(columns=['ID', 'ID Scheme'])
+        pd.testing.assert_frame_equal(v1, v2)
+
+    def test_reads_byte_buffers(self):
+        subject = RawBytesHandler().process(BytesIO(self.CSV))
+        assert subject['ID'].iloc[0] == md5(b'2026-01-15,TRADER JOES,-45.50')
+
+    def test_headerless_files_hash_every_record(self, tmp_path):
+        path = tmp_path / 'wf.csv'
+        path.write_bytes(b'"02/15/2026","-45.50","*","","GROCERY STORE"\n')
+        subject = HeaderlessRawBytesHandler().process(str(path))
+        assert subject['ID'].tolist() == [md5(b'"02/15/2026","-45.50","*","","GROCERY STORE"')]
+
+    def test_chunks_match_whole_file(self, csv_path):
+        batches = pd.concat(RawBytesHandler().process_chunks(csv_path, chunksize=1))
+        pd.testing.assert_frame_equal(batches, RawBytesHandler().process(csv_path))
+
+    def test_single_headerless_record_with_pyarrow(self, tmp_path):
+        path = tmp_path / 'wf.csv'
+        path.write_bytes(b'"02/15/2026","-45.50","*","","GROCERY STORE"')
+        handler = HeaderlessRawBytesHandler()
+        handler.csv_engine = 'pyarrow'
+        assert len(handler.process(str(path))) == 1
+
+    def test_id_mapping_pairs_v1_and_v2_ids(self, csv_path):
+        mapping = SimpleHandler().id_mapping(csv_path)
+        assert mapping['v1'].tolist() == SimpleHandler().process(csv_path)['ID'].tolist()
+        assert mapping['v2'].tolist() == RawBytesHandler().process(csv_path)['ID'].tolist()
+
+
+# ── Sources ───────────────────────────────────────────────────────────────────
+
+class TemporaryUpload:
+    """Stand-in for Django's TemporaryUploadedFile, which spools to disk."""
+
+    def __init__(self, path):
+        self.name = 'upload.csv'
+        self._path = path
+
+    def temporary_file_path(self):
+        return self._path
+
+
+class TestSources:
+
+    @pytest.fixture
+    def csv_path(self, tmp_path):
+        path = tmp_path / 'statement.csv'
+        path.write_text(SIMPLE_CSV)
+        return str(path)
+
+    def test_local_path_is_memory_mapped(self, csv_path, mocker):
+        spy = mocker.spy(pd, 'read_csv')
+        SimpleHandler().process(csv_path)
+        assert spy.call_args.kwargs['memory_map'] is True
+
+    def test_pyarrow_reads_path_natively(self, csv_path, mocker):
+        spy = mocker.spy(pd, 'read_csv')
+        ArrowHandler().process(csv_path)
+        assert spy.call_args.args[0] == csv_path
+        assert spy.call_args.kwargs['memory_map'] is False
+
+    def test_temporary_upload_is_read_from_disk(self, csv_path, mocker):
+        spy = mocker.spy(pd, 'read_csv')
+        subject = SimpleHandler().process(TemporaryUpload(csv_path))
+        assert spy.call_args.args[0] == csv_path
+        pd.testing.assert_frame_equal(subject, SimpleHandler().process(csv_path))
+
+    def test_file_like_is_passed_through(self, mocker):
+        spy = mocker.spy(pd, 'read_csv')
+        stream = BytesIO(SIMPLE_CSV.encode())
+        SimpleHandler().process(stream)
+        assert spy.call_args.args[0] is stream
+
+    def test_v2_maps_local_files(self, csv_path, mocker):
+        spy = mocker.patch('transactions.handlers.base._iter_lines', wraps=base._iter_lines)
+        subject = RawBytesHandler().process(csv_path)
+        assert isinstance(spy.call_args.args[0], mmap.mmap)
+        assert subject['ID'].iloc[0] == md5(b'2026-01-15,TRADER JOES,-45.50')
+
+    def test_v2_temporary_upload_matches_path(self, csv_path):
+        pd.testing.assert_frame_equal(
+            RawBytesHandler().process(TemporaryUpload(csv_path)),
+            RawBytesHandler().process(csv_path),
+        )
+
+    def test_v2_empty_file_returns_none(self, tmp_path):
+        path = tmp_path / 'empty.csv'
+        path.write_bytes(b'')
+        assert RawBytesHandler().process(str(path)) is None
 
 
 # ── Error handling ────────────────────────────────────────────────────────────
@@ -0,0 +1,94 @@
+"""
+tests/unit/handlers/test_dates.py — Unit tests for memoized date parsing.
+"""
+
+import pandas as pd
+from unittest.mock import patch
+
+from transactions.handlers import dates
+from transactions.handlers.dates import DateParseCache, parse_dates, shared_date_cache
+from transactions.handlers.accounts import SoFiSavingsHandler
+
+
+# ── parse_dates ───────────────────────────────────────────────────────────────
+
+class TestParseDates:
+
+    def test_matches_to_datetime(self):
+        values = pd.Series(['01/15/2026', '01/16/2026', '01/15/2026'], name='Date')
+        result = parse_dates(values, '%m/%d/%Y')
+        pd.testing.assert_series_equal(result, pd.to_datetime(values, format='%m/%d/%Y'))
+
+    def test_keeps_index(self):
+        values = pd.Series(['2026-01-15', '2026-01-16'], index=[10, 11])
+        assert parse_dates(values, '%Y-%m-%d').index.tolist() == [10, 11]
+
+    def test_missing_values_become_nat(self):
+        values = pd.Series(['2026-01-15', None, '2026-01-15'])
+        result = parse_dates(values, '%Y-%m-%d')
+        assert result.isna().tolist() == [False, True, False]
+        assert result.iloc[2] == pd.Timestamp('2026-01-15')
+
+    def test_all_missing(self):
+        values = pd.Series([None, None], dtype=object)
+        assert parse_dates(values, '%Y-%m-%d').isna().all()
+
+    def test_parses_each_distinct_value_once(self):
+        values = pd.Series(['2026-01-15'] * 50 + ['2026-01-16'] * 50)
+        with patch.object(dates.pd, 'to_datetime', wraps=pd.to_datetime) as to_datetime:
+            parse_dates(values, '%Y-%m-%d')
+        assert len(to_datetime.call_args.args[0]) == 2
+
+
+# ── shared_date_cache ─────────────────────────────────────────────────────────
+
+class TestSharedDateCache:
+
+    def test_reuses_dates_across_calls(self):
+        with shared_date_cache() as cache:
+            parse_dates(pd.Series(['2026-01-15', '2026-01-16']), '%Y-%m-%d')
+            with patch.object(dates.pd, 'to_datetime', wraps=pd.to_datetime) as to_datetime:
+                result = parse_dates(pd.Series(['2026-01-16', '2026-01-15']), '%Y-%m-%d')
+
+        to_datetime.assert_not_called()
+        assert result.tolist() == [pd.Timestamp('2026-01-16'), pd.Timestamp('2026-01-15')]
+        assert len(cache) == 2
+
+    def test_keys_include_format(self):
+        with shared_date_cache():
+            us = parse_dates(pd.Series(['01/02/2026']), '%m/%d/%Y')
+            eu = parse_dates(pd.Series(['01/02/2026']), '%d/%m/%Y')
+        assert us.iloc[0] == pd.Timestamp('2026-01-02')
+        assert eu.iloc[0] == pd.Timestamp('2026-02-01')
+
+    def test_cache_is_cleared_on_exit(self):
+        with shared_date_cache():
+            assert dates._active_cache.get() is not None
+        assert dates._active_cache.get() is None
+
+    def test_lru_is_bounded(self):
+        cache = DateParseCache(maxsize=2)
+        cache.parse(pd.Index(['2026-01-15', '2026-01-16']), '%Y-%m-%d')
+        cache.parse(pd.Index(['2026-01-15']), '%Y-%m-%d')   # refresh 15th
+        cache.parse(pd.Index(['2026-01-17']), '%Y-%m-%d')   # evicts 16th
+        assert len(cache) == 2
+        assert ('%Y-%m-%d', '2026-01-15') in cache._entries
+        assert ('%Y-%m-%d', '2026-01-16') not in cache._entries
+
+
+# ── Handler integration ───────────────────────────────────────────────────────
+
+class TestHandlerDates:
+
+    def test_shared_cache_does_not_change_output(self):
+        df = pd.DataFrame({
+            'Date': ['2026-01-15', '2026-01-15', '2026-01-16'],
+            'Description': ['A', 'B', 'C'],
+            'Amount': [-1.0, -2.0, 3.0],
+        })
+        handler = SoFiSavingsHandler()
+        with patch('pandas.read_csv', return_value=df.copy()):
+            plain = handler.process('dummy.csv')
+        with shared_date_cache(), patch('pandas.read_csv', return_value=df.copy()):
+            cached = handler.process('dummy.csv')
+        pd.testing.assert_frame_equal(plain, cached)
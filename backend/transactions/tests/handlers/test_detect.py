@@ -0,0 +1,124 @@
+"""
+tests/unit/handlers/test_detect.py — Unit tests for content-based account detection.
+"""
+
+import pytest
+
+from transactions.handlers.accounts import ACCOUNT_HANDLERS
+from transactions.handlers.detect import (
+    SIGNATURES, date_pattern, detect_account, detect_file, match_signatures, parse_head, read_head,
+)
+
+
+HEADS = {
+    'SoFi Savings': b"Date,Description,Type,Amount,Current balance,Status\n2026-01-15,VENMO,Withdrawal,-180.00,1000.25,Posted\n",
+    'CO Checking': (
+        b"Account Number,Transaction Description,Transaction Date,Transaction Type,Transaction Amount,Balance\n"
+        b"1234,TRADER JOES,01/15/26,Debit,45.50,100.00\n"
+    ),
+    'Quicksilver': (
+        b"Transaction Date,Posted Date,Card No.,Description,Category,Debit,Credit\n"
+        b"2026-01-15,2026-01-16,1234,TRADER JOES,Groceries,45.50,\n"
+    ),
+    'Delta': b"Date,Description,Amount\n02/04/2026,METRO FARE,2.45\n",
+    'Chase': b"Transaction Date,Post Date,Description,Category,Type,Amount,Memo\n02/15/2026,02/16/2026,WHOLEFDS,Groceries,Sale,-67.89,\n",
+    'Discover': b"Trans. Date,Post Date,Description,Amount,Category\n02/04/2026,02/05/2026,AMAZON,29.99,Merchandise\n",
+    'WF Checking': b'"02/15/2026","-45.50","*","","GROCERY STORE"\n',
+}
+
+
+# ── Signatures ────────────────────────────────────────────────────────────────
+
+class TestSignatures:
+
+    def test_one_signature_per_handler(self):
+        assert [signature.handler_key for signature in SIGNATURES] == list(ACCOUNT_HANDLERS)
+
+    def test_amount_spec_columns_are_required(self):
+        quicksilver = next(s for s in SIGNATURES if s.handler_key == 'Quicksilver')
+        assert {'Credit', 'Debit'} <= quicksilver.columns
+        assert 'Amount' not in quicksilver.columns
+
+    def test_headerless_handler_uses_column_count(self):
+        wells_fargo = next(s for s in SIGNATURES if s.handler_key == 'WF Checking')
+        assert wells_fargo.column_count == 5
+        assert wells_fargo.date_column == 0
+
+    @pytest.mark.parametrize('date_format, text, expected', [
+        ('%Y-%m-%d', '2026-01-15', True),
+        ('%Y-%m-%d', '01/15/2026', False),
+        ('%m/%d/%y', '01/15/26', True),
+        ('%m/%d/%y', '01/15/2026', False),
+        ('%m/%d/%Y', '1/5/2026', True),
+    ])
+    def test_date_pattern(self, date_format, text, expected):
+        assert bool(date_pattern(date_format).fullmatch(text)) is expected
+
+
+# ── Detection ─────────────────────────────────────────────────────────────────
+
+class TestDetectAccount:
+
+    @pytest.mark.parametrize('handler_key', ['Quicksilver', 'Delta', 'Chase', 'Discover'])
+    def test_detects_unique_format_without_hint(self, handler_key):
+        assert detect_account(HEADS[handler_key]) == handler_key
+
+    def test_date_shape_separates_same_columns(self):
+        # SoFi and Amex both read Date, Description, Amount
+        assert 'Delta' not in match_signatures(HEADS['SoFi Savings'])
+        assert 'SoFi Savings' not in match_signatures(HEADS['Delta'])
+
+    @pytest.mark.parametrize('head, candidates', [
+        (HEADS['SoFi Savings'], ['SoFi Savings', 'SoFi Checking']),
+        (HEADS['CO Checking'], ['CO Checking', 'CO Savings']),
+        (HEADS['WF Checking'], ['WF Checking', 'WF Savings']),
+    ])
+    def test_shared_format_needs_hint(self, head, candidates):
+        assert match_signatures(head) == candidates
+        assert detect_account(head) is None
+        assert detect_account(head, hint=candidates[1]) == candidates[1]
+
+    def test_hint_outside_candidates_is_ignored(self):
+        assert detect_account(HEADS['Discover'], hint='Chase') == 'Discover'
+        assert detect_account(HEADS['SoFi Savings'], hint='Chase') is None
+
+    def test_renamed_file_is_detected(self, tmp_path):
+        path = tmp_path / 'download (3).csv'
+        path.write_bytes(HEADS['Quicksilver'])
+        assert detect_file(path) == 'Quicksilver'
+
+    def test_unknown_header(self):
+        assert detect_account(b"When,What,How Much\n2026-01-15,COFFEE,3.00\n") is None
+
+    def test_empty_head(self):
+        assert detect_account(b"") is None
+
+
+# ── Head parsing ──────────────────────────────────────────────────────────────
+
+class TestReadHead:
+
+    def test_reads_only_the_head(self, tmp_path):
+        path = tmp_path / 'big.csv'
+        path.write_bytes(HEADS['Delta'] + b"02/05/2026,TAXI,10.00\n" * 10_000)
+        with open(path, 'rb') as stream:
+            head, truncated = read_head(stream, size=64)
+            assert stream.tell() == 65
+        assert len(head) == 64
+        assert truncated
+
+    def test_short_file_is_not_truncated(self, tmp_path):
+        path = tmp_path / 'small.csv'
+        path.write_bytes(HEADS['Delta'])
+        with open(path, 'rb') as stream:
+            head, truncated = read_head(stream)
+        assert head == HEADS['Delta']
+        assert not truncated
+
+    def test_truncated_record_is_dropped(self):
+        records = parse_head(b"Date,Description,Amount\n02/04/2026,METRO FARE,2.45\n02/0", truncated=True)
+        assert records == [['Date', 'Description', 'Amount'], ['02/04/2026', 'METRO FARE', '2.45']]
+
+    def test_quoted_line_break_stays_in_record(self):
+        records = parse_head(b'Date,Description,Amount\n02/04/2026,"METRO\nFARE",2.45\n')
+        assert records[1] == ['02/04/2026', 'METRO\nFARE', '2.45']
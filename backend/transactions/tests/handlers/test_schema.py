@@ -0,0 +1,86 @@
+"""
+tests/unit/handlers/test_schema.py — Unit tests for the compact transaction frame schema.
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+from decimal import Decimal
+from io import StringIO
+
+from transactions.handlers.schema import DOLLARS, compact, concat, dollars, to_cents
+from transactions.handlers.accounts import ChaseHandler, SoFiSavingsHandler
+
+
+# ── Amounts ───────────────────────────────────────────────────────────────────
+
+class TestCents:
+
+    def test_floats_to_cents(self):
+        assert to_cents([-45.50, 2.45, 1152.91]).tolist() == [-4550, 245, 115291]
+
+    def test_decimals_to_cents(self):
+        assert to_cents([Decimal('-45.50'), Decimal('0.07')]).tolist() == [-4550, 7]
+
+    def test_cents_are_int64(self):
+        assert to_cents(pd.Series([1.5])).dtype == np.int64
+
+    def test_missing_amount_raises(self):
+        with pytest.raises(ValueError, match='1 transactions have no amount'):
+            to_cents([1.0, float('nan')])
+
+    def test_dollars_from_cents(self):
+        assert dollars(pd.Series([-4550, 245])).tolist() == [-45.50, 2.45]
+
+    def test_whole_float_cents(self):
+        assert dollars(pd.Series([-4550.0, 245.0])).tolist() == [-45.50, 2.45]
+
+    def test_integer_dollars_when_declared(self):
+        assert dollars(pd.Series([-45, 3000]), DOLLARS).tolist() == [-45.0, 3000.0]
+
+    def test_fractional_cents_raise(self):
+        with pytest.raises(ValueError, match='whole numbers'):
+            dollars(pd.Series([-45.50]))
+
+    def test_unknown_unit_raises(self):
+        with pytest.raises(ValueError, match='Unknown amount unit'):
+            dollars(pd.Series([1]), 'euros')
+
+
+# ── Frames ────────────────────────────────────────────────────────────────────
+
+@pytest.fixture
+def sofi_df():
+    csv = "Date,Description,Amount\n2026-01-15,TRADER JOES,-45.50\n2026-01-20,SALARY,3000.00\n"
+    return SoFiSavingsHandler().process(StringIO(csv))
+
+
+@pytest.fixture
+def chase_df():
+    csv = (
+        "Transaction Date,Post Date,Description,Category,Type,Amount,Memo\n"
+        "01/15/2026,01/16/2026,COFFEE SHOP,Food & Drink,Sale,-4.75,\n"
+    )
+    return ChaseHandler().process(StringIO(csv))
+
+
+class TestCompact:
+
+    def test_handler_output_is_compact(self, sofi_df):
+        assert sofi_df['Amount'].dtype == np.int64
+        assert isinstance(sofi_df['Account'].dtype, pd.CategoricalDtype)
+        assert isinstance(sofi_df['Label'].dtype, pd.CategoricalDtype)
+        assert isinstance(sofi_df['Category'].dtype, pd.CategoricalDtype)
+        assert sofi_df['Concept'].dtype == 'str'
+        assert sofi_df['ID Scheme'].dtype == np.int8
+
+    def test_only_present_columns_are_cast(self):
+        df = compact(pd.DataFrame({'Account': ['Chase'], 'Other': ['x']}))
+        assert isinstance(df['Account'].dtype, pd.CategoricalDtype)
+        assert df['Other'].dtype != 'category'
+
+    def test_concat_keeps_categoricals(self, sofi_df, chase_df):
+        df = concat([sofi_df, chase_df])
+        assert isinstance(df['Account'].dtype, pd.CategoricalDtype)
+        assert sorted(df['Account'].cat.categories) == ['Chase', 'SoFi Savings']
+        assert df['Amount'].tolist() == [-4550, 300000, -475]
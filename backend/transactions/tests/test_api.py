@@ -4,16 +4,19 @@ backend/transactions/tests/test_api.py — Unit tests for API endpoints.
 Tests the API layer in isolation using mocked handlers and database queries.
 """
 
+import io
 import pytest
 from unittest.mock import Mock
 import pandas as pd
 
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils.datastructures import MultiValueDict
 
 from ninja.testing import TestClient
 from ninja.main import NinjaAPI
 
 from transactions.api import api
+from transactions.handlers.dates import _active_cache
 from transactions.models import Bank, AccountType, Account
 from users.models import Household
 
@@ -75,7 +78,7 @@ def sample_dataframe():
         'Date': pd.to_datetime(['2026-01-15']),
         'Concept': ['TRADER JOES'],
         'Account': ['Test Account'],
-        'Amount': [-45.50],
+        'Amount': [-4550],  # Cents
         'Label': [None],
         'Category': [None],
         'Additional Labels': [None],
@@ -152,6 +155,25 @@ class TestDetectAccount:
         assert data['handler_key'] is None
         assert data['detected'] is False
 
+    def test_detects_from_uploaded_head(self, client):
+        upload = SimpleUploadedFile(
+            'download.csv',
+            b"Transaction Date,Posted Date,Card No.,Description,Category,Debit,Credit\n"
+            b"2026-01-15,2026-01-16,1234,TRADER JOES,Groceries,45.50,\n",
+            content_type='text/csv',
+        )
+        response = client.post('/accounts/detect', FILES={'file': upload})
+        assert response.status_code == 200
+        data = response.json()
+        assert data['filename'] == 'download.csv'
+        assert data['handler_key'] == 'Quicksilver'
+        assert data['detected'] is True
+
+    def test_uploaded_head_with_unknown_header(self, client, csv_file):
+        response = client.post('/accounts/detect', FILES={'file': csv_file})
+        assert response.status_code == 200
+        assert response.json()['detected'] is False
+
 
 # ── POST /api/transactions/import ────────────────────────────────────────────
 
@@ -180,6 +202,18 @@ class TestImportTransactions:
         assert data['total'] == 1
         assert data['error'] is None
 
+    def test_passes_upload_to_handler_without_copying(self, client, account, csv_file, sample_dataframe, mocker):
+        mock_handler = Mock()
+        mock_handler.process.return_value = sample_dataframe
+        mocker.patch.dict('transactions.handlers.accounts.ACCOUNT_HANDLERS', {'SoFi Savings': mock_handler})
+        mocker.patch('transactions.api.upsert_transactions', return_value={'inserted': 1, 'skipped': 0, 'total': 1})
+
+        client.post(f'/transactions/import?account_id={account.id}', FILES={'file': csv_file})
+
+        uploaded = mock_handler.process.call_args.args[0]
+        assert not isinstance(uploaded, io.BytesIO)
+        assert uploaded.name == 'test.csv'
+
     def test_returns_error_for_nonexistent_account(self, client, csv_file):
         response = client.post(
             '/transactions/import?account_id=9999',
@@ -231,4 +265,60 @@ class TestImportTransactions:
         assert response.status_code == 200
         data = response.json()
         assert data['inserted'] == 0
-        assert 'Handler error' in data['error']
\ No newline at end of file
+        assert 'Handler error' in data['error']
+
+# ── POST /api/transactions/import-batch ──────────────────────────────────────
+
+@pytest.mark.django_db
+class TestImportTransactionsBatch:
+
+    @pytest.fixture
+    def csv_files(self, sample_csv_content):
+        return MultiValueDict({'files': [
+            SimpleUploadedFile('january.csv', sample_csv_content, content_type='text/csv'),
+            SimpleUploadedFile('february.csv', sample_csv_content, content_type='text/csv'),
+        ]})
+
+    def test_returns_one_result_per_file(self, client, account, csv_files, sample_dataframe, mocker):
+        mock_handler = Mock()
+        mock_handler.process.return_value = sample_dataframe
+        mocker.patch.dict('transactions.handlers.accounts.ACCOUNT_HANDLERS', {'SoFi Savings': mock_handler})
+        mocker.patch('transactions.api.upsert_transactions', return_value={'inserted': 1, 'skipped': 0, 'total': 1})
+
+        response = client.post(f'/transactions/import-batch?account_id={account.id}', FILES=csv_files)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [result['filename'] for result in data] == ['january.csv', 'february.csv']
+        assert all(result['inserted'] == 1 for result in data)
+
+    def test_files_share_one_date_cache(self, client, account, csv_files, sample_dataframe, mocker):
+        caches = []
+
+        def process(file):
+            caches.append(_active_cache.get())
+            return sample_dataframe
+
+        mock_handler = Mock()
+        mock_handler.process.side_effect = process
+        mocker.patch.dict('transactions.handlers.accounts.ACCOUNT_HANDLERS', {'SoFi Savings': mock_handler})
+        mocker.patch('transactions.api.upsert_transactions', return_value={'inserted': 1, 'skipped': 0, 'total': 1})
+
+        client.post(f'/transactions/import-batch?account_id={account.id}', FILES=csv_files)
+
+        assert len(caches) == 2
+        assert caches[0] is not None
+        assert caches[0] is caches[1]
+
+    def test_error_in_one_file_does_not_stop_the_batch(self, client, account, csv_files, sample_dataframe, mocker):
+        mock_handler = Mock()
+        mock_handler.process.side_effect = [Exception('Handler error'), sample_dataframe]
+        mocker.patch.dict('transactions.handlers.accounts.ACCOUNT_HANDLERS', {'SoFi Savings': mock_handler})
+        mocker.patch('transactions.api.upsert_transactions', return_value={'inserted': 1, 'skipped': 0, 'total': 1})
+
+        response = client.post(f'/transactions/import-batch?account_id={account.id}', FILES=csv_files)
+
+        data = response.json()
+        assert 'Handler error' in data[0]['error']
+        assert data[1]['inserted'] == 1
+        assert data[1]['error'] is None
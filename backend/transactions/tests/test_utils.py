@@ -1,8 +1,12 @@
 import pytest
 import pandas as pd
-from datetime import date
+from datetime import date, timedelta
+from decimal import Decimal
+from django.utils import timezone
 
-from transactions.utils import detect_account_type, upsert_transactions
+from transactions.handlers.schema import DOLLARS
+from transactions.known_ids import KnownIdFilter
+from transactions.utils import detect_account_type, load_known_ids, upsert_transactions
 from transactions.models import Account, AccountType, Bank, Transaction
 from users.models import Household
 
@@ -52,6 +56,19 @@ class TestDetectAccountType:
     def test_matches_substring_anywhere_in_filename(self):
         assert detect_account_type('SOFI-Savings-0000-2020-01-01T00_00_00.csv') == 'SoFi Savings'
 
+    def test_detects_renamed_file_from_head(self):
+        head = b"Trans. Date,Post Date,Description,Amount,Category\n02/04/2026,02/05/2026,AMAZON,29.99,Merchandise\n"
+        assert detect_account_type('export.csv', head=head) == 'Discover'
+
+    def test_head_overrides_misleading_filename(self):
+        head = b"Date,Description,Amount\n02/04/2026,METRO FARE,2.45\n"
+        assert detect_account_type('Chase.csv', head=head) == 'Delta'
+
+    def test_filename_breaks_tie_between_shared_formats(self):
+        head = b"Date,Description,Amount\n2026-01-15,VENMO,-180.00\n"
+        assert detect_account_type('SOFI-Checking-123.csv', head=head) == 'SoFi Checking'
+        assert detect_account_type('export.csv', head=head) is None
+
 
 # ── upsert_transactions tests ─────────────────────────────────────────────────
 
@@ -88,7 +105,7 @@ class TestUpsertTransactions:
             'ID': ['abc123', 'def456'],
             'Date': pd.to_datetime(['2026-01-15', '2026-01-20']),
             'Concept': ['TRADER JOES', 'METRO FARE'],
-            'Amount': [-45.50, -2.45],
+            'Amount': [-4550, -245],  # Cents
             'Label': [None, None],
             'Category': [None, None],
             'Additional Labels': [None, None],
@@ -140,6 +157,21 @@ class TestUpsertTransactions:
         assert float(txn.amount) == pytest.approx(-45.50)
         assert txn.account == account
 
+    def test_stores_cents_as_dollars(self, account, sample_df):
+        # Handler output carries amounts in integer cents
+        upsert_transactions(sample_df.assign(Amount=[-4550, 300000]), account)
+        assert Transaction.objects.get(id='abc123').amount == Decimal('-45.50')
+        assert Transaction.objects.get(id='def456').amount == Decimal('3000.00')
+
+    def test_stores_declared_integer_dollars(self, account, sample_df):
+        upsert_transactions(sample_df.assign(Amount=[-45, 3000]), account, amount_unit=DOLLARS)
+        assert Transaction.objects.get(id='abc123').amount == Decimal('-45.00')
+        assert Transaction.objects.get(id='def456').amount == Decimal('3000.00')
+
+    def test_rejects_dollars_passed_as_cents(self, account, sample_df):
+        with pytest.raises(ValueError, match='whole numbers'):
+            upsert_transactions(sample_df.assign(Amount=[-45.50, -2.45]), account)
+
     def test_handles_datetime_objects(self, account, sample_df):
         # Ensure Date column has Timestamps, not just dates
         assert pd.api.types.is_datetime64_any_dtype(sample_df['Date'])
@@ -160,7 +192,7 @@ class TestUpsertTransactions:
             'ID': ['abc123', 'new999'],
             'Date': pd.to_datetime(['2026-01-15', '2026-01-20']),
             'Concept': ['TRADER JOES', 'NEW TRANSACTION'],
-            'Amount': [-45.50, -10.00],
+            'Amount': [-4550, -1000],  # Cents
             'Label': [None, None],
             'Category': [None, None],
             'Additional Labels': [None, None],
@@ -170,6 +202,26 @@ class TestUpsertTransactions:
         assert result['skipped'] == 1
         assert result['total'] == 2
 
+    def test_stores_id_scheme(self, account, sample_df):
+        sample_df['ID Scheme'] = 2
+        upsert_transactions(sample_df, account)
+        assert Transaction.objects.get(id='abc123').id_scheme == 2
+
+    def test_defaults_to_id_scheme_v1(self, account, sample_df):
+        upsert_transactions(sample_df, account)
+        assert Transaction.objects.get(id='abc123').id_scheme == 1
+
+    def test_inserts_batches_one_at_a_time(self, account, sample_df):
+        batches = iter([sample_df.iloc[:1], sample_df.iloc[1:]])
+        result = upsert_transactions(batches, account)
+        assert result == {'inserted': 2, 'skipped': 0, 'total': 2}
+        assert Transaction.objects.count() == 2
+
+    def test_counts_duplicates_across_batches(self, account, sample_df):
+        result = upsert_transactions([sample_df, sample_df], account)
+        assert result == {'inserted': 2, 'skipped': 2, 'total': 4}
+        assert Transaction.objects.count() == 2
+
     def test_links_transactions_to_correct_account(self, account, household, bank):
         # Create second account
         at2 = AccountType.objects.create(name='Other', handler_key='Other', bank=bank)
@@ -179,7 +231,7 @@ class TestUpsertTransactions:
             'ID': ['txn1'],
             'Date': pd.to_datetime(['2026-01-15']),
             'Concept': ['TXN 1'],
-            'Amount': [-10.00],
+            'Amount': [-1000],  # Cents
             'Label': [None],
             'Category': [None],
             'Additional Labels': [None],
@@ -188,7 +240,7 @@ class TestUpsertTransactions:
             'ID': ['txn2'],
             'Date': pd.to_datetime(['2026-01-20']),
             'Concept': ['TXN 2'],
-            'Amount': [-20.00],
+            'Amount': [-2000],  # Cents
             'Label': [None],
             'Category': [None],
             'Additional Labels': [None],
@@ -198,4 +250,85 @@ class TestUpsertTransactions:
         upsert_transactions(df2, account2)
 
         assert Transaction.objects.get(id='txn1').account == account
-        assert Transaction.objects.get(id='txn2').account == account2
\ No newline at end of file
+        assert Transaction.objects.get(id='txn2').account == account2
+
+
+# ── known-ID filter tests ─────────────────────────────────────────────────────
+
+@pytest.mark.django_db
+class TestKnownIdFilter:
+
+    @pytest.fixture
+    def household(self):
+        return Household.objects.create(name='Test Household')
+
+    @pytest.fixture
+    def bank(self):
+        return Bank.objects.create(name='Test Bank')
+
+    @pytest.fixture
+    def account(self, household, bank):
+        account_type = AccountType.objects.create(name='Savings', handler_key='SoFi Savings', bank=bank)
+        return Account.objects.create(name='SoFi Savings', account_type=account_type, household=household)
+
+    @pytest.fixture
+    def sample_df(self):
+        return pd.DataFrame({
+            'ID': ['abc123', 'def456'],
+            'Date': pd.to_datetime(['2026-01-15', '2026-01-20']),
+            'Concept': ['TRADER JOES', 'SALARY'],
+            'Amount': [-4550, 300000],  # Cents
+            'Label': [None, None],
+            'Category': [None, None],
+            'Additional Labels': [None, None],
+        })
+
+    def test_known_rows_count_as_skipped(self, account, sample_df, tmp_path):
+        known_ids = KnownIdFilter(str(tmp_path / 'known_ids.npz'))
+        upsert_transactions(sample_df, account, known_ids)
+
+        result = upsert_transactions(sample_df, account, known_ids)
+        assert result == {'inserted': 0, 'skipped': 2, 'total': 2}
+        assert Transaction.objects.count() == 2
+
+    def test_unknown_rows_are_still_checked(self, account, sample_df, tmp_path):
+        upsert_transactions(sample_df, account)
+
+        known_ids = KnownIdFilter(str(tmp_path / 'known_ids.npz'))
+        result = upsert_transactions(sample_df, account, known_ids)
+        assert result == {'inserted': 0, 'skipped': 2, 'total': 2}
+        assert known_ids.contains([account.pk] * 2, sample_df['ID']).all()
+
+    def test_load_is_disabled_without_setting(self, settings):
+        settings.KNOWN_IDS_PATH = None
+        assert load_known_ids() is None
+
+    def test_load_refreshes_from_database(self, account, sample_df, settings, tmp_path):
+        settings.KNOWN_IDS_PATH = str(tmp_path / 'known_ids.npz')
+        upsert_transactions(sample_df, account)
+
+        known_ids = load_known_ids()
+        assert len(known_ids) == 2
+        assert known_ids.watermark == Transaction.objects.latest('imported_at').imported_at
+
+    def test_load_rebuilds_after_deletion(self, account, sample_df, settings, tmp_path):
+        settings.KNOWN_IDS_PATH = str(tmp_path / 'known_ids.npz')
+        upsert_transactions(sample_df, account)
+        load_known_ids().save()
+        Transaction.objects.filter(id='abc123').delete()
+
+        known_ids = load_known_ids()
+        result = upsert_transactions(sample_df, account, known_ids)
+        assert result == {'inserted': 1, 'skipped': 1, 'total': 2}
+
+    def test_load_rebuilds_when_only_the_ids_changed(self, account, sample_df, settings, tmp_path):
+        settings.KNOWN_IDS_PATH = str(tmp_path / 'known_ids.npz')
+        upsert_transactions(sample_df, account)
+        load_known_ids().save()
+        Transaction.objects.filter(id='abc123').delete()
+        # Same count, and stamped too early for the incremental refresh
+        upsert_transactions(sample_df.assign(ID=['fed789', 'def456']), account)
+        Transaction.objects.filter(id='fed789').update(imported_at=timezone.now() - timedelta(days=1))
+
+        known_ids = load_known_ids()
+        assert known_ids.contains([account.pk] * 3, ['abc123', 'def456', 'fed789']).tolist() == [False, True, True]
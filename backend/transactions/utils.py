@@ -3,10 +3,16 @@ transactions/utils.py — Business logic for transaction processing.
 """
 
 import logging
-from typing import Optional
+from typing import Iterable, Optional, Union
 
 import pandas as pd
+from django.conf import settings
+from django.db import connection
+from django.db.models import Aggregate, BigIntegerField, Count
 
+from .handlers.detect import detect_account
+from .handlers.schema import CENTS, dollars
+from .known_ids import DIGEST_DIGITS, KnownIdFilter
 from .models import Account, Transaction
 
 logger = logging.getLogger(__name__)
@@ -30,36 +36,85 @@ FILE_DETECTION_MAP = {
 }
 
 
-def detect_account_type(filename: str) -> Optional[str]:
+def detect_account_type(filename: str, head: Optional[bytes] = None, truncated: bool = False) -> Optional[str]:
     """
-    Attempt to detect the account type from a CSV filename.
+    Attempt to detect the account type of a CSV file.
+
+    Without `head`, the filename is matched against FILE_DETECTION_MAP.
+    With the first bytes of the file, the header content decides and the
+    filename only breaks ties between accounts that share a format.
 
     Returns the handler_key string if detected, or None if unrecognized.
     The result is always shown to the user for confirmation before import.
     """
+    hint = None
     for substring, handler_key in FILE_DETECTION_MAP.items():
         if substring in filename:
-            return handler_key
-    return None
+            hint = handler_key
+            break
+
+    if head is None:
+        return hint
+    return detect_account(head, hint=hint, truncated=truncated)
 
 
 # ── Transaction upsert ────────────────────────────────────────────────────────
 
-def upsert_transactions(df: pd.DataFrame, account: Account) -> dict:
+def upsert_transactions(
+    data: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+    account: Account,
+    known_ids: Optional[KnownIdFilter] = None,
+    amount_unit: str = CENTS,
+) -> dict:
     """
     Insert new transactions from a DataFrame, skipping duplicates.
     Labels, category, and additional_labels are never overwritten on re-import.
 
     Args:
-        df:      Cleaned DataFrame from a handler's process() method.
+        data:    Cleaned DataFrame from a handler's process() method, or an
+                 iterable of batches from process_chunks(), inserted one
+                 batch at a time.
         account: The Account instance transactions belong to.
+        known_ids: Optional KnownIdFilter. Rows it already knows are
+                 counted as skipped without an existence lookup, and the
+                 rows that are written are added to it.
+        amount_unit: Unit of the Amount column — CENTS (handler output,
+                 the default) or DOLLARS. See handlers/schema.py.
 
     Returns:
         dict with keys: inserted, skipped, total.
     """
+    batches = [data] if isinstance(data, pd.DataFrame) else data
+
+    counts = {'inserted': 0, 'skipped': 0, 'total': 0}
+    for df in batches:
+        for key, value in _upsert_batch(df, account, known_ids, amount_unit).items():
+            counts[key] += value
+
+    logger.info(
+        f"Upsert complete for account '{account.name}' — "
+        f"inserted: {counts['inserted']}, skipped: {counts['skipped']}, total: {counts['total']}"
+    )
+
+    return counts
+
+
+def _upsert_batch(
+    df: pd.DataFrame,
+    account: Account,
+    known_ids: Optional[KnownIdFilter] = None,
+    amount_unit: str = CENTS,
+) -> dict:
+    """Insert a single DataFrame of transactions and return its counts."""
     if df.empty:
         return {'inserted': 0, 'skipped': 0, 'total': 0}
 
+    total = len(df)
+    if known_ids is not None:
+        df = df[~known_ids.contains([account.pk] * total, df['ID'])]
+        if df.empty:
+            return {'inserted': 0, 'skipped': total, 'total': total}
+
     # Extract all IDs from the DataFrame
     incoming_ids = df['ID'].tolist()
 
@@ -68,16 +123,22 @@ def upsert_transactions(df: pd.DataFrame, account: Account) -> dict:
         Transaction.objects.filter(id__in=incoming_ids).values_list('id', flat=True)
     )
 
+    # Frames built before ID schemes were versioned are v1
+    id_schemes = df['ID Scheme'] if 'ID Scheme' in df.columns else [1] * len(df)
+
+    amounts = dollars(df['Amount'], amount_unit)
+
     # Build list of new transactions to insert
     new_transactions = []
-    for row in df.itertuples(index=False):
+    for row, id_scheme, amount in zip(df.itertuples(index=False), id_schemes, amounts):
         if row.ID not in existing_ids:
             new_transactions.append(
                 Transaction(
                     id=row.ID,
+                    id_scheme=id_scheme,
                     date=row.Date.date() if hasattr(row.Date, 'date') else row.Date,
                     concept=row.Concept,
-                    amount=row.Amount,
+                    amount=amount,
                     label=None,
                     category=None,
                     additional_labels=None,
@@ -89,13 +150,90 @@ def upsert_transactions(df: pd.DataFrame, account: Account) -> dict:
     if new_transactions:
         Transaction.objects.bulk_create(new_transactions, ignore_conflicts=True)
 
+    # Every remaining ID is in the database now, inserted or not
+    if known_ids is not None:
+        known_ids.add([account.pk] * len(df), df['ID'])
+
     inserted = len(new_transactions)
-    skipped = len(df) - inserted
-    total = len(df)
+    return {'inserted': inserted, 'skipped': total - inserted, 'total': total}
 
-    logger.info(
-        f"Upsert complete for account '{account.name}' — "
-        f"inserted: {inserted}, skipped: {skipped}, total: {total}"
+
+# ── Known-ID filter ───────────────────────────────────────────────────────────
+
+def load_known_ids() -> Optional[KnownIdFilter]:
+    """
+    Load the known-ID filter at settings.KNOWN_IDS_PATH and bring it up to
+    date with transactions imported since it was last saved (rebuilt if
+    an account's IDs differ from the database's, e.g. after deletions).
+    Returns None when the filter is not configured.
+    """
+    if not settings.KNOWN_IDS_PATH:
+        return None
+
+    def iter_ids(since):
+        transactions = Transaction.objects.all()
+        if since is not None:
+            # >= rather than > — rows imported in the same instant may be new
+            transactions = transactions.filter(imported_at__gte=since)
+        return transactions.values_list('account_id', 'id', 'imported_at').iterator(chunk_size=10_000)
+
+    digests = (
+        Transaction.objects.order_by()
+        .values('account_id')
+        .annotate(count=Count('id'), digest=_IdDigest('id'))
+        .values_list('account_id', 'count', 'digest')
     )
 
-    return {'inserted': inserted, 'skipped': skipped, 'total': total}
+    known_ids = KnownIdFilter.load(settings.KNOWN_IDS_PATH)
+    known_ids.sync(iter_ids, {account: (count, digest) for account, count, digest in digests})
+    return known_ids
+
+
+class _IdDigest(Aggregate):
+    """known_ids.id_digest() of a group's IDs, computed by MySQL."""
+    template = f'BIT_XOR(CAST(CONV(LEFT(%(expressions)s, {DIGEST_DIGITS}), 16, 10) AS UNSIGNED))'
+    output_field = BigIntegerField()
+
+
+# ── ID scheme migration ───────────────────────────────────────────────────────
+
+def migrate_id_scheme(mapping: pd.DataFrame) -> dict:
+    """
+    Rewrite v1 transaction IDs to their v2 equivalents in bulk.
+
+    The mapping is loaded into a temporary table and applied with a single
+    joined UPDATE. Rows already on v2, and v2 IDs that already exist, are
+    left untouched.
+
+    Args:
+        mapping: DataFrame with columns 'v1' and 'v2', as returned by a
+                 handler's id_mapping() method.
+
+    Returns:
+        dict with keys: migrated, total.
+    """
+    pairs = list(zip(mapping['v1'], mapping['v2']))
+    if not pairs:
+        return {'migrated': 0, 'total': 0}
+
+    with connection.cursor() as cur:
+        cur.execute("""
+            CREATE TEMPORARY TABLE id_migration (
+                v1 VARCHAR(32) NOT NULL PRIMARY KEY,
+                v2 VARCHAR(32) NOT NULL
+            )
+        """)
+        try:
+            cur.executemany('INSERT IGNORE INTO id_migration (v1, v2) VALUES (%s, %s)', pairs)
+            cur.execute("""
+                UPDATE IGNORE transactions t
+                JOIN id_migration m ON t.id = m.v1
+                SET t.id = m.v2, t.id_scheme = 2
+                WHERE t.id_scheme = 1
+            """)
+            migrated = cur.rowcount
+        finally:
+            cur.execute('DROP TEMPORARY TABLE id_migration')
+
+    logger.info(f'ID migration complete — migrated: {migrated}, mapped: {len(pairs)}')
+    return {'migrated': migrated, 'total': len(pairs)}
@@ -5,6 +5,10 @@ Handles connection management, schema validation, and upsert logic.
 Classifications (label, category, additional_labels) are never overwritten
 on re-import — INSERT IGNORE skips any row whose ID already exists.
 
+With DB_BACKEND=sqlite the same interface runs in-process on an embedded
+SQLite file instead (see SQLiteDatabase) — no server needed for
+single-user runs, tests and benchmarks.
+
 Usage:
     from db import Database
 
@@ -15,14 +19,27 @@ Usage:
 
 import os
 import logging
+import sqlite3
+import tempfile
+import threading
+import time
 import pandas as pd
 import mysql.connector
-from contextlib import contextmanager
+from collections import deque
+from contextlib import closing, contextmanager
 from dataclasses import dataclass
-from typing import Optional
+from datetime import date, datetime
+from itertools import repeat
+from typing import Iterable, Iterator, Optional, Union
+
+from handlers.schema import CENTS, compact, dollars, to_cents
+from known_ids import DIGEST_DIGITS, KnownIdFilter, id_digest
+from query_cache import ParquetQueryCache, QueryCache, cache_key
 
 logger = logging.getLogger(__name__)
 
+QUERY_CHUNKSIZE = 50_000  # Rows per DataFrame from query_transaction_chunks
+
 
 # ── Configuration ─────────────────────────────────────────────────────────────
 
@@ -34,26 +51,257 @@ class DBConfig:
     Reads from environment variables by default.
 
     Environment variables:
-        DB_HOST        default: 127.0.0.1
-        DB_PORT        default: 3306
-        DB_NAME        default: budget
-        DB_USER        default: root
-        DB_PASSWORD    (required)
+        DB_BACKEND       default: mysql (or sqlite — embedded, see SQLiteDatabase)
+        DB_SQLITE_PATH   default: ./data/budget.sqlite3 (only for DB_BACKEND=sqlite)
+        DB_HOST          default: 127.0.0.1
+        DB_PORT          default: 3306
+        DB_NAME          default: budget
+        DB_USER          default: root
+        DB_PASSWORD      (required)
+        DB_POOL_SIZE     default: 0 (no pooling — one connection per connect())
+        DB_POOL_RECYCLE  default: 1800 (seconds idle before a pooled connection is replaced)
+        DB_POOL_TIMEOUT  default: 30 (seconds to wait when every pooled connection is in use)
+        DB_POOL_PING     default: true (check pooled connections before handing them out)
+        DB_LOCAL_INFILE  default: false (allow LOAD DATA LOCAL INFILE bulk loads)
+        DB_BULK_THRESHOLD default: 10000 (rows per batch at which bulk loading kicks in)
+        DB_QUERY_CACHE   default: off ('memory', or a directory for Parquet files; see query_cache.py)
     """
+    backend: str = os.getenv('DB_BACKEND', 'mysql')
+    sqlite_path: str = os.getenv('DB_SQLITE_PATH', './data/budget.sqlite3')
     host: str = os.getenv('DB_HOST', '127.0.0.1')
     port: int = int(os.getenv('DB_PORT', 3306))
     database: str = os.getenv('DB_NAME', 'budget')
     user: str = os.getenv('DB_USER', 'root')
     password: str = os.getenv('DB_PASSWORD', '')
+    pool_size: int = int(os.getenv('DB_POOL_SIZE', 0))
+    pool_recycle: float = float(os.getenv('DB_POOL_RECYCLE', 1800))
+    pool_timeout: float = float(os.getenv('DB_POOL_TIMEOUT', 30))
+    pool_ping: bool = os.getenv('DB_POOL_PING', 'true').lower() == 'true'
+    local_infile: bool = os.getenv('DB_LOCAL_INFILE', 'false').lower() == 'true'
+    bulk_threshold: int = int(os.getenv('DB_BULK_THRESHOLD', 10_000))
+    query_cache: str = os.getenv('DB_QUERY_CACHE', '')
 
     def to_connector_kwargs(self) -> dict:
-        return {
+        kwargs = {
             'host': self.host,
             'port': self.port,
             'database': self.database,
             'user': self.user,
             'password': self.password,
         }
+        if self.local_infile:
+            kwargs['allow_local_infile'] = True
+        return kwargs
+
+
+# ── Bulk load encoding ────────────────────────────────────────────────────────
+
+# LOAD DATA's default escapes, applied to text fields
+_TSV_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r', '\0': '\\0'})
+
+
+def _tsv_field(value) -> str:
+    """Render one value for LOAD DATA with the default FIELDS/LINES options."""
+    if value is None or (isinstance(value, float) and value != value):
+        return '\\N'  # NULL (None or NaN)
+    if isinstance(value, str):
+        return value.translate(_TSV_ESCAPES)
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+def _to_dates(series: pd.Series) -> list:
+    """
+    datetime64 column → list of datetime.date (None for NaT), which is
+    what mysql-connector expects. Converted in one step through NumPy's
+    day unit rather than one Timestamp per row.
+    """
+    if isinstance(series.dtype, pd.DatetimeTZDtype):
+        series = series.dt.tz_localize(None)  # Keep the local calendar date
+    return series.to_numpy(dtype='datetime64[D]').tolist()
+
+
+# ── Connection pool ───────────────────────────────────────────────────────────
+
+class ConnectionPool:
+    """
+    Thread-safe pool of MySQL connections, shared process-wide per DBConfig.
+
+    At most `pool_size` connections are handed out at once; further
+    borrowers wait up to `pool_timeout` seconds. On borrow, connections
+    idle for longer than `pool_recycle` are replaced, and the rest are
+    pinged first when `pool_ping` is set, so a connection dropped by the
+    server is never handed out.
+    """
+
+    def __init__(self, config: DBConfig):
+        self._config = config
+        self._idle = deque()  # (connection, returned_at) — most recent on the right
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(config.pool_size)
+
+    def acquire(self) -> mysql.connector.MySQLConnection:
+        """Borrow a healthy connection, opening a new one if none is idle."""
+        if not self._slots.acquire(timeout=self._config.pool_timeout):
+            raise mysql.connector.errors.PoolError(
+                f"No connection available after {self._config.pool_timeout}s "
+                f"(pool size {self._config.pool_size})"
+            )
+        try:
+            while True:
+                with self._lock:
+                    conn, returned_at = self._idle.pop() if self._idle else (None, None)
+                if conn is None:
+                    return mysql.connector.connect(**self._config.to_connector_kwargs())
+                if time.monotonic() - returned_at > self._config.pool_recycle:
+                    self._discard(conn)
+                elif self._config.pool_ping and not self._is_healthy(conn):
+                    self._discard(conn)
+                else:
+                    return conn
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, conn: mysql.connector.MySQLConnection):
+        """
+        Return a borrowed connection. Any transaction still open is rolled
+        back first, so the next borrower starts clean.
+        """
+        try:
+            conn.rollback()
+        except mysql.connector.Error:
+            self._discard(conn)
+        else:
+            with self._lock:
+                self._idle.append((conn, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    def close(self):
+        """Close every idle connection. Borrowed ones are closed on release."""
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for conn, _ in idle:
+            self._discard(conn)
+
+    @staticmethod
+    def _is_healthy(conn: mysql.connector.MySQLConnection) -> bool:
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except mysql.connector.Error:
+            return False
+
+    @staticmethod
+    def _discard(conn: mysql.connector.MySQLConnection):
+        try:
+            conn.close()
+        except mysql.connector.Error:
+            pass
+
+
+_pools: dict = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(config: DBConfig) -> ConnectionPool:
+    """
+    The process-wide pool for this config. A forked child gets its own
+    pool rather than sharing its parent's sockets, and configs that differ
+    only in their pool settings get separate pools.
+    """
+    key = (
+        os.getpid(),
+        tuple(sorted(config.to_connector_kwargs().items())),
+        (config.pool_size, config.pool_recycle, config.pool_timeout, config.pool_ping),
+    )
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(config)
+        return _pools[key]
+
+
+def close_pools():
+    """Close the idle connections of every pool in this process."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+# ── Schema upgrades ───────────────────────────────────────────────────────────
+
+# Columns added to migration.sql since it first shipped, each with the
+# statements that bring an existing table up to date. Database.connect()
+# runs those whose column is missing, once per database per process.
+MYSQL_UPGRADES = (
+    ('id_scheme', (
+        "ALTER TABLE transactions ADD COLUMN id_scheme TINYINT NOT NULL DEFAULT 1 AFTER id",  # Existing rows are v1
+    )),
+    ('updated_at', (
+        """ALTER TABLE transactions
+            ADD COLUMN updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            ADD INDEX idx_transactions_updated_at (updated_at)""",
+        "UPDATE transactions SET updated_at = imported_at",  # Existing rows last changed on import
+    )),
+)
+
+_upgraded: set = set()
+_upgraded_lock = threading.Lock()
+
+
+def upgrade_schema(conn: mysql.connector.MySQLConnection, config: DBConfig):
+    """
+    Add any MYSQL_UPGRADES column the transactions table lacks. A database
+    without the table is left alone — migration.sql creates it complete.
+    """
+    key = tuple(sorted(config.to_connector_kwargs().items()))
+    with _upgraded_lock:
+        if key in _upgraded:
+            return
+        with closing(conn.cursor()) as cur:
+            cur.execute("""
+                SELECT column_name FROM information_schema.columns
+                WHERE table_schema = DATABASE() AND table_name = 'transactions'
+            """)
+            columns = {row[0].lower() for row in cur.fetchall()}
+            for column, statements in MYSQL_UPGRADES if columns else ():
+                if column not in columns:
+                    logger.info(f"Upgrading schema: adding transactions.{column}")
+                    for statement in statements:
+                        cur.execute(statement)
+        _upgraded.add(key)
+
+
+# ── Query cache ───────────────────────────────────────────────────────────────
+
+_query_caches: dict = {}
+
+
+def get_query_cache(config: DBConfig) -> Optional[QueryCache]:
+    """
+    The process-wide query result cache for this config, or None when
+    caching is off. 'memory' gives one in-memory cache per database; any
+    other value is the directory of a ParquetQueryCache.
+    """
+    if not config.query_cache:
+        return None
+    if config.query_cache == 'memory':
+        if config.backend == 'sqlite':
+            database = os.path.abspath(config.sqlite_path)
+        else:
+            database = tuple(sorted(config.to_connector_kwargs().items()))
+        key = ('memory', config.backend, database)
+    else:
+        key = ('parquet', os.path.abspath(config.query_cache))
+
+    with _pools_lock:
+        if key not in _query_caches:
+            _query_caches[key] = QueryCache() if key[0] == 'memory' else ParquetQueryCache(config.query_cache)
+        return _query_caches[key]
 
 
 # ── Database class ─────────────────────────────────────────────────────────────
@@ -73,8 +321,45 @@ class Database:
     # label, category, additional_labels are optional — assigned manually later.
     REQUIRED_COLUMNS = {'id', 'date', 'concept', 'account', 'amount'}
 
-    def __init__(self, connection: mysql.connector.MySQLConnection):
+    # Inserted table columns, in parameter order.
+    INSERT_COLUMNS = (
+        'id', 'id_scheme', 'date', 'concept', 'account', 'amount', 'label', 'category', 'additional_labels',
+    )
+
+    # Selected table columns → DataFrame columns, matching the spreadsheet.
+    QUERY_COLUMNS = {
+        'id': 'ID',
+        'date': 'Date',
+        'concept': 'Concept',
+        'account': 'Account',
+        'amount': 'Amount',
+        'label': 'Label',
+        'category': 'Category',
+        'additional_labels': 'Additional Labels',
+    }
+
+    # SQL dialect — overridden by SQLiteDatabase.
+    PLACEHOLDER = '%s'
+    INSERT_IGNORE = 'INSERT IGNORE'
+    MONTH_OF_DATE = 'MONTH(date)'
+    ID_DIGEST = f'BIT_XOR(CAST(CONV(LEFT(id, {DIGEST_DIGITS}), 16, 10) AS UNSIGNED))'  # known_ids.id_digest()
+
+    def __init__(
+            self,
+            connection: mysql.connector.MySQLConnection,
+            bulk_threshold: Optional[int] = None,
+            query_cache: Optional[QueryCache] = None,
+    ):
+        """
+        bulk_threshold: batches of at least this many rows are inserted with
+        LOAD DATA LOCAL INFILE instead of INSERT; None always uses INSERT.
+        query_cache: where query_transactions() results are cached; None
+        disables caching.
+        """
         self._conn = connection
+        self._bulk_threshold = bulk_threshold
+        self._query_cache = query_cache
+        self._writes_pending = False  # Uncommitted changes — bypass the cache until commit
 
     @staticmethod
     @contextmanager
@@ -82,16 +367,37 @@ class Database:
         """
         Context manager that yields a Database instance with an open connection.
         Commits on clean exit, rolls back on exception.
+
+        With config.pool_size > 0 the connection is borrowed from the
+        process-wide pool and returned to it on exit instead of closed.
+        With config.backend == 'sqlite' it yields a SQLiteDatabase instead.
         """
         config = config or DBConfig()
+        if config.backend == 'sqlite':
+            with SQLiteDatabase.connect(config) as db:
+                yield db
+            return
+        if config.backend != 'mysql':
+            raise ValueError(f"Unknown database backend: {config.backend!r}")
+
+        pool = get_pool(config) if config.pool_size > 0 else None
         conn = None
         try:
-            conn = mysql.connector.connect(**config.to_connector_kwargs())
-            logger.info(
-                f"Connected to MySQL database '{config.database}' "
-                f"at {config.host}:{config.port}"
+            if pool is None:
+                conn = mysql.connector.connect(**config.to_connector_kwargs())
+                logger.info(
+                    f"Connected to MySQL database '{config.database}' "
+                    f"at {config.host}:{config.port}"
+                )
+            else:
+                conn = pool.acquire()
+            upgrade_schema(conn, config)
+            # Bulk loading needs the client to allow LOCAL INFILE
+            yield Database(
+                conn,
+                bulk_threshold=config.bulk_threshold if config.local_infile else None,
+                query_cache=get_query_cache(config),
             )
-            yield Database(conn)
             conn.commit()
         except mysql.connector.Error as e:
             logger.error(f"Could not connect to database: {e}")
@@ -102,12 +408,19 @@ class Database:
                 logger.warning("Transaction rolled back due to error.")
             raise
         finally:
-            if conn and conn.is_connected():
+            if conn and pool is not None:
+                pool.release(conn)
+            elif conn and conn.is_connected():
                 conn.close()
 
     # ── Upsert ────────────────────────────────────────────────────────────────
 
-    def upsert_transactions(self, df: pd.DataFrame) -> dict:
+    def upsert_transactions(
+            self,
+            data: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+            known_ids: Optional[KnownIdFilter] = None,
+            amount_unit: str = CENTS,
+    ) -> dict:
         """
         Insert new transactions from a DataFrame, ignoring duplicates.
 
@@ -116,47 +429,160 @@ class Database:
         overwritten.
 
         Args:
-            df: Cleaned DataFrame with at minimum the columns:
-                id, date, concept, account, amount.
-                May also contain label, category, additional_labels,
-                which are written for new rows only.
+            data: Cleaned DataFrame with at minimum the columns:
+                  id, date, concept, account, amount.
+                  May also contain label, category, additional_labels,
+                  which are written for new rows only.
+                  An iterable of such DataFrames (e.g. from a handler's
+                  process_chunks()) is inserted one batch at a time.
+            known_ids: Optional KnownIdFilter. Rows it already knows are
+                  counted as skipped without being sent, and the rows
+                  that are sent are added to it once written. Save it
+                  only after the surrounding transaction commits.
+            amount_unit: Unit of the amount column — CENTS (handler
+                  output, the default) or DOLLARS. See handlers/schema.py.
 
         Returns:
             dict with keys: 'inserted', 'skipped', 'total'
         """
+        batches = [data] if isinstance(data, pd.DataFrame) else data
+
+        counts = {'inserted': 0, 'skipped': 0, 'total': 0}
+        for df in batches:
+            for key, value in self._upsert_batch(df, known_ids, amount_unit).items():
+                counts[key] += value
+        if counts['inserted']:
+            self._writes_pending = True
+
+        logger.info(
+            f"Upsert complete — inserted: {counts['inserted']}, "
+            f"skipped (already exist): {counts['skipped']}, "
+            f"total: {counts['total']}"
+        )
+        return counts
+
+    def _upsert_batch(
+            self,
+            df: pd.DataFrame,
+            known_ids: Optional[KnownIdFilter] = None,
+            amount_unit: str = CENTS,
+    ) -> dict:
+        """
+        INSERT IGNORE a single DataFrame and return its counts. Batches at
+        or above the bulk threshold go through _bulk_load() instead.
+        """
         self._validate_dataframe(df)
 
-        records = self._prepare_records(df)
-        if not records:
+        total = len(df)
+        if known_ids is not None and total:
+            columns = self._column_names(df)
+            account_col, id_col = columns['account'], columns['id']
+            known = known_ids.contains(df[account_col], df[id_col])
+            df = df[~known]
+            if not len(df):
+                return {'inserted': 0, 'skipped': total, 'total': total}
+
+        values = self._prepare_records(df, amount_unit)
+        if not values:
             logger.warning("No records to upsert.")
             return {'inserted': 0, 'skipped': 0, 'total': 0}
 
-        sql = """
-            INSERT IGNORE INTO transactions
-                (id, date, concept, account, amount, label, category, additional_labels)
+        sql = f"""
+            {self.INSERT_IGNORE} INTO transactions
+                ({', '.join(self.INSERT_COLUMNS)})
             VALUES
-                (%s, %s, %s, %s, %s, %s, %s, %s)
+                ({', '.join([self.PLACEHOLDER] * len(self.INSERT_COLUMNS))})
         """
 
-        values = [
-            (r['id'], r['date'], r['concept'], r['account'], r['amount'],
-             r['label'], r['category'], r['additional_labels'])
-            for r in records
-        ]
+        if self._bulk_threshold is not None and len(values) >= self._bulk_threshold:
+            inserted = self._bulk_load(values)
+        else:
+            with self._cursor() as cur:
+                cur.executemany(sql, values)
+                inserted = cur.rowcount  # rows actually inserted (not ignored)
 
-        with self._conn.cursor() as cur:
-            cur.executemany(sql, values)
-            inserted = cur.rowcount  # rows actually inserted (not ignored)
+        if known_ids is not None:
+            # Sent rows exist now that the batch is written, inserted or not
+            columns = self._column_names(df)
+            known_ids.add(df[columns['account']], df[columns['id']])
 
-        skipped = len(records) - inserted
-        total = len(records)
+        return {'inserted': inserted, 'skipped': total - inserted, 'total': total}
 
-        logger.info(
-            f"Upsert complete — inserted: {inserted}, "
-            f"skipped (already exist): {skipped}, "
-            f"total: {total}"
-        )
-        return {'inserted': inserted, 'skipped': skipped, 'total': total}
+    def _bulk_load(self, values: list[tuple]) -> int:
+        """
+        Load rows through a temporary tab-separated file with
+        LOAD DATA LOCAL INFILE ... IGNORE and return how many were inserted.
+
+        IGNORE gives the same duplicate handling as INSERT IGNORE: rows
+        whose ID already exists are skipped and never overwrite labels.
+        """
+        fd, path = tempfile.mkstemp(prefix='transactions-', suffix='.tsv')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+                for row in values:
+                    f.write('\t'.join(_tsv_field(value) for value in row))
+                    f.write('\n')
+
+            with self._cursor() as cur:
+                cur.execute(f"""
+                    LOAD DATA LOCAL INFILE %s
+                    IGNORE INTO TABLE transactions
+                    CHARACTER SET utf8mb4
+                    FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'
+                    LINES TERMINATED BY '\\n'
+                    ({', '.join(self.INSERT_COLUMNS)})
+                """, (path,))
+                inserted = cur.rowcount  # rows actually loaded (not ignored)
+        finally:
+            os.remove(path)
+
+        logger.info(f"Bulk loaded {len(values)} rows via LOAD DATA — inserted: {inserted}")
+        return inserted
+
+    # ── ID scheme migration ───────────────────────────────────────────────────
+
+    def migrate_id_scheme(self, mapping: pd.DataFrame) -> dict:
+        """
+        Rewrite v1 transaction IDs to their v2 equivalents in bulk.
+
+        The mapping is loaded into a temporary table and applied with a
+        single joined UPDATE. Rows already on v2, and v2 IDs that already
+        exist, are left untouched.
+
+        Args:
+            mapping: DataFrame with columns 'v1' and 'v2', as returned by
+                     BaseHandler.id_mapping().
+
+        Returns:
+            dict with keys: 'migrated', 'total'
+        """
+        pairs = list(zip(mapping['v1'], mapping['v2']))
+        if not pairs:
+            return {'migrated': 0, 'total': 0}
+
+        with self._cursor() as cur:
+            cur.execute("""
+                CREATE TEMPORARY TABLE id_migration (
+                    v1 VARCHAR(32) NOT NULL PRIMARY KEY,
+                    v2 VARCHAR(32) NOT NULL
+                )
+            """)
+            try:
+                cur.executemany("INSERT IGNORE INTO id_migration (v1, v2) VALUES (%s, %s)", pairs)
+                cur.execute("""
+                    UPDATE IGNORE transactions t
+                    JOIN id_migration m ON t.id = m.v1
+                    SET t.id = m.v2, t.id_scheme = 2
+                    WHERE t.id_scheme = 1
+                """)
+                migrated = cur.rowcount
+            finally:
+                cur.execute("DROP TEMPORARY TABLE id_migration")
+
+        if migrated:
+            self._invalidate_query_cache()
+        logger.info(f"ID migration complete — migrated: {migrated}, mapped: {len(pairs)}")
+        return {'migrated': migrated, 'total': len(pairs)}
 
     # ── Query ─────────────────────────────────────────────────────────────────
 
@@ -165,65 +591,234 @@ class Database:
             year: Optional[int] = None,
             month: Optional[int] = None,
             account: Optional[str] = None,
+            start_date: Optional[date] = None,
+            end_date: Optional[date] = None,
+            accounts: Optional[Iterable[str]] = None,
     ) -> pd.DataFrame:
         """
-        Query transactions with optional filters.
+        Query transactions with optional filters. All filters combine with AND.
+
+        Periods are matched as half-open date ranges on the bare column
+        (date >= start AND date < end) so MySQL can use its date indexes.
 
         Args:
-            year:    Filter by calendar year.
-            month:   Filter by calendar month (1–12).
-            account: Filter by account name (exact match).
+            year:       Filter by calendar year.
+            month:      Filter by calendar month (1–12). Without `year`, matches
+                        that month in every year and cannot use an index.
+            account:    Filter by account name (exact match).
+            start_date: First date to include.
+            end_date:   First date to exclude — e.g. date(2026, 2, 1) for
+                        everything up to the end of January.
+            accounts:   Filter by several account names; combined with
+                        `account` if both are given.
 
         Returns:
             DataFrame with columns matching the spreadsheet:
             ID, Date, Concept, Account, Amount, Label, Category, Additional Labels
+            in the compact dtypes of handlers/schema.py (Amount in cents).
+
+        With a query cache, the result is served from it while table_version()
+        is unchanged — one aggregate query instead of the full read.
+        """
+        cache = None if self._writes_pending else self._query_cache
+        if cache is not None:
+            key = cache_key(
+                year=year, month=month, account=account, start_date=start_date, end_date=end_date,
+                accounts=sorted(accounts or []),  # Order does not change the result
+            )
+            version = self.table_version()
+            df = cache.get(key, version)
+            if df is not None:
+                logger.info(f"Queried {len(df)} transactions from cache.")
+                return df
+
+        sql, params = self._build_query(year, month, account, start_date, end_date, accounts)
+
+        with self._cursor() as cur:
+            cur.execute(sql, params)
+            rows = cur.fetchall()
+
+        df = self._rows_to_frame(rows) if rows else pd.DataFrame()
+        if cache is not None:
+            cache.put(key, version, df)
+
+        logger.info(f"Queried {len(df)} transactions from database.")
+        return df
+
+    def table_version(self) -> tuple:
+        """
+        Cheap fingerprint of the table contents: (row count, latest
+        updated_at). Changes whenever rows are imported, edited (e.g.
+        relabeled) or deleted.
+        """
+        with self._cursor() as cur:
+            cur.execute("SELECT COUNT(*), MAX(updated_at) AS updated_at FROM transactions")
+            count, latest = cur.fetchone()
+        return count, latest
+
+    def query_transaction_chunks(self, chunksize: int = QUERY_CHUNKSIZE, **filters) -> Iterator[pd.DataFrame]:
+        """
+        Stream query results as DataFrames of at most `chunksize` rows.
+
+        Rows are read from an unbuffered cursor (see _stream()), so the
+        server sends them as they are consumed and only one chunk is held
+        in memory at a time — use this for full-history exports. The
+        connection cannot run other queries until the generator is
+        exhausted or closed.
+
+        Args:
+            chunksize: Rows per DataFrame.
+            filters:   Same keyword arguments as query_transactions().
+
+        Yields:
+            DataFrames with the same columns as query_transactions().
+        """
+        sql, params = self._build_query(**filters)
+
+        total = 0
+        for rows in self._stream(sql, params, chunksize):
+            total += len(rows)
+            yield self._rows_to_frame(rows)
+
+        logger.info(f"Streamed {total} transactions from database.")
+
+    def id_digests(self) -> dict:
+        """Each account's (count, id_digest()) of stored IDs, for KnownIdFilter.sync()."""
+        with self._cursor() as cur:
+            cur.execute(f"SELECT account, COUNT(*), {self.ID_DIGEST} FROM transactions GROUP BY account")
+            return {account: (count, int(digest)) for account, count, digest in cur.fetchall()}
+
+    def iter_imported_ids(self, since: Optional[datetime] = None) -> Iterator[tuple]:
+        """
+        Stream (account, id, imported_at) for transactions imported at or
+        after `since` (all of them if None), for KnownIdFilter.sync().
+        """
+        sql = "SELECT account, id, imported_at FROM transactions"
+        params = []
+        if since is not None:
+            # >= rather than > — rows imported in the same second may be new
+            sql += f" WHERE imported_at >= {self.PLACEHOLDER}"
+            params.append(since)
+
+        for rows in self._stream(sql, params, QUERY_CHUNKSIZE):
+            yield from rows
+
+    def query_changes(
+            self,
+            since: Optional[datetime] = None,
+            chunksize: int = QUERY_CHUNKSIZE,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Stream transactions inserted or updated (e.g. relabeled) at or after
+        `since` — all of them if None — as DataFrames of at most `chunksize`
+        rows, for incremental exports such as snapshot.py.
+
+        Yields:
+            DataFrames with the columns of query_transactions() plus
+            'Updated At'.
         """
+        sql = f"SELECT {', '.join(self.QUERY_COLUMNS)}, updated_at FROM transactions"
+        params = []
+        if since is not None:
+            sql += f" WHERE updated_at >= {self.PLACEHOLDER}"
+            params.append(since)
+
+        for rows in self._stream(sql, params, chunksize):
+            yield self._rows_to_frame(rows, extra_columns=('Updated At',))
+
+    # ── Helpers ───────────────────────────────────────────────────────────────
+
+    def _invalidate_query_cache(self):
+        """Drop cached results after a change table_version() cannot see."""
+        self._writes_pending = True
+        if self._query_cache is not None:
+            self._query_cache.clear()
+
+    def _cursor(self):
+        """A cursor usable as a context manager."""
+        return self._conn.cursor()
+
+    def _stream(self, sql: str, params: list, size: int) -> Iterator[list[tuple]]:
+        """Run a SELECT on an unbuffered cursor and yield its rows `size` at a time."""
+        cur = self._conn.cursor(buffered=False)
+        try:
+            cur.execute(sql, params)
+            while rows := cur.fetchmany(size):
+                yield rows
+        finally:
+            # Stopped early — drain the rest of the result so the connection stays usable
+            if self._conn.unread_result:
+                self._conn.consume_results()
+            cur.close()
+
+    def _build_query(
+            self,
+            year: Optional[int] = None,
+            month: Optional[int] = None,
+            account: Optional[str] = None,
+            start_date: Optional[date] = None,
+            end_date: Optional[date] = None,
+            accounts: Optional[Iterable[str]] = None,
+    ) -> tuple[str, list]:
+        """SELECT statement and parameters for the query_transactions() filters."""
+        p = self.PLACEHOLDER
         conditions = []
         params = []
 
         if year:
-            conditions.append("YEAR(date) = %s")
-            params.append(year)
-        if month:
-            conditions.append("MONTH(date) = %s")
+            period_start, period_end = self._period_bounds(year, month)
+            conditions.append(f"date >= {p} AND date < {p}")
+            params.extend([period_start, period_end])
+        elif month:
+            conditions.append(f"{self.MONTH_OF_DATE} = {p}")
             params.append(month)
+        if start_date:
+            conditions.append(f"date >= {p}")
+            params.append(start_date)
+        if end_date:
+            conditions.append(f"date < {p}")
+            params.append(end_date)
+
+        account_names = list(accounts or [])
         if account:
-            conditions.append("account = %s")
-            params.append(account)
+            account_names.append(account)
+        if len(account_names) == 1:
+            conditions.append(f"account = {p}")
+            params.append(account_names[0])
+        elif account_names:
+            conditions.append(f"account IN ({', '.join([p] * len(account_names))})")
+            params.extend(account_names)
 
         where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
 
         sql = f"""
-            SELECT id, date, concept, account, amount, label, category, additional_labels
+            SELECT {', '.join(self.QUERY_COLUMNS)}
             FROM transactions
             {where_clause}
             ORDER BY date ASC, account ASC
         """
 
-        with self._conn.cursor(dictionary=True) as cur:
-            cur.execute(sql, params)
-            rows = cur.fetchall()
-
-        df = pd.DataFrame(rows)
-
-        if not df.empty:
-            df = df.rename(columns={
-                'id': 'ID',
-                'date': 'Date',
-                'concept': 'Concept',
-                'account': 'Account',
-                'amount': 'Amount',
-                'label': 'Label',
-                'category': 'Category',
-                'additional_labels': 'Additional Labels',
-            })
-            df['Date'] = pd.to_datetime(df['Date'])
-            df['Amount'] = df['Amount'].astype(float)
+        return sql, params
 
-        logger.info(f"Queried {len(df)} transactions from database.")
-        return df
+    def _rows_to_frame(self, rows: list[tuple], extra_columns: tuple = ()) -> pd.DataFrame:
+        """
+        Build a compact result DataFrame column by column from cursor tuples:
+        the QUERY_COLUMNS, then any `extra_columns` selected after them.
+        """
+        columns = zip(*rows)
+        df = pd.DataFrame(dict(zip((*self.QUERY_COLUMNS.values(), *extra_columns), columns)))
+        df['Date'] = pd.to_datetime(df['Date'])
+        df['Amount'] = to_cents(df['Amount'])
+        return compact(df)
 
-    # ── Helpers ───────────────────────────────────────────────────────────────
+    @staticmethod
+    def _period_bounds(year: int, month: Optional[int] = None) -> tuple[date, date]:
+        """[start, end) dates of a calendar year, or of one month in it."""
+        if month is None:
+            return date(year, 1, 1), date(year + 1, 1, 1)
+        if month == 12:
+            return date(year, 12, 1), date(year + 1, 1, 1)
+        return date(year, month, 1), date(year, month + 1, 1)
 
     def _validate_dataframe(self, df: pd.DataFrame):
         """Raise ValueError if any required columns are missing."""
@@ -233,22 +828,264 @@ class Database:
             raise ValueError(f"DataFrame is missing required columns: {missing}")
 
     @staticmethod
-    def _prepare_records(df: pd.DataFrame) -> list[dict]:
+    def _column_names(df: pd.DataFrame) -> dict:
+        """Normalized (lowercase, snake_case) column name → actual column name."""
+        return {col.lower().replace(' ', '_'): col for col in df.columns}
+
+    @classmethod
+    def _prepare_records(cls, df: pd.DataFrame, amount_unit: str = CENTS) -> list[tuple]:
+        """
+        Build INSERT parameter tuples, in INSERT_COLUMNS order, straight
+        from the column arrays — no copy of the DataFrame and no per-row
+        dicts. Optional columns that are missing are filled with None;
+        amounts are converted from `amount_unit` to dollars.
+        """
+        names = cls._column_names(df)
+        defaults = {
+            'label': None,
+            'category': None,
+            'additional_labels': None,
+            'id_scheme': 1,  # Frames built before ID schemes were versioned are v1
+        }
+
+        columns = []
+        for name in cls.INSERT_COLUMNS:
+            if name not in names:
+                columns.append(repeat(defaults[name]))
+                continue
+            series = df[names[name]]
+            if name == 'date' and pd.api.types.is_datetime64_any_dtype(series):
+                columns.append(_to_dates(series))
+            elif name == 'amount':
+                columns.append(dollars(series, amount_unit).tolist())
+            else:
+                columns.append(series.tolist())  # Native Python scalars for the driver
+
+        return list(zip(*columns))
+
+
+# ── SQLite backend ────────────────────────────────────────────────────────────
+
+# Equivalent of migration.sql. SQLite has no date or decimal storage: dates
+# are ISO-8601 text (so range filters still compare correctly), converted
+# back on read by _SQLiteCursor, and amounts are REAL, which
+# query results are converted to anyway. NOCASE matches MySQL's
+# case-insensitive collation for the text columns that are filtered on.
+SQLITE_TABLE = """
+CREATE TABLE IF NOT EXISTS {table} (
+    id                TEXT      NOT NULL PRIMARY KEY,
+    id_scheme         INTEGER   NOT NULL DEFAULT 1,
+    date              DATE      NOT NULL,
+    concept           TEXT      NOT NULL,
+    account           TEXT      NOT NULL COLLATE NOCASE,
+    amount            REAL      NOT NULL,
+    label             TEXT      DEFAULT NULL COLLATE NOCASE,
+    category          TEXT      DEFAULT NULL COLLATE NOCASE,
+    additional_labels TEXT      DEFAULT NULL,
+    imported_at       TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at        TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+# Files from before updated_at. SQLite cannot add a column defaulting to
+# CURRENT_TIMESTAMP, so the table is copied into one with the current
+# definition (SQLite's documented way to change a table), with updated_at
+# backfilled from imported_at. Runs in one transaction with the version bump.
+SQLITE_ADD_UPDATED_AT = f"""
+BEGIN;
+{SQLITE_TABLE.format(table='transactions_upgrade')}
+INSERT INTO transactions_upgrade
+    (id, id_scheme, date, concept, account, amount, label, category, additional_labels, imported_at, updated_at)
+SELECT id, id_scheme, date, concept, account, amount, label, category, additional_labels, imported_at, imported_at
+FROM transactions;
+DROP TABLE transactions;
+ALTER TABLE transactions_upgrade RENAME TO transactions;
+PRAGMA user_version = 1;
+COMMIT;
+"""
+
+SQLITE_SCHEMA_VERSION = 1  # PRAGMA user_version once every upgrade has run
+
+# Created once the table is current — the index and trigger need updated_at
+SQLITE_SCHEMA = """
+CREATE INDEX IF NOT EXISTS idx_transactions_date         ON transactions (date);
+CREATE INDEX IF NOT EXISTS idx_transactions_category     ON transactions (category);
+CREATE INDEX IF NOT EXISTS idx_transactions_label        ON transactions (label);
+CREATE INDEX IF NOT EXISTS idx_transactions_account_date ON transactions (account, date);
+CREATE INDEX IF NOT EXISTS idx_transactions_imported_at  ON transactions (imported_at);
+CREATE INDEX IF NOT EXISTS idx_transactions_updated_at   ON transactions (updated_at);
+
+-- MySQL's ON UPDATE CURRENT_TIMESTAMP
+CREATE TRIGGER IF NOT EXISTS trg_transactions_updated_at
+AFTER UPDATE ON transactions
+FOR EACH ROW WHEN NEW.updated_at = OLD.updated_at
+BEGIN
+    UPDATE transactions SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+END;
+"""
+
+# Result columns, by name, converted back from ISO-8601 text — rows come
+# back with the same date/datetime types as from MySQL.
+SQLITE_CONVERTERS = {
+    'date': date.fromisoformat,
+    'imported_at': datetime.fromisoformat,
+    'updated_at': datetime.fromisoformat,
+}
+
+
+def _sqlite_param(value):
+    """A date or datetime as ISO-8601 text; anything else unchanged."""
+    if isinstance(value, datetime):
+        return value.isoformat(' ')  # Space separator, to compare with CURRENT_TIMESTAMP
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def _upgrade_sqlite(conn: sqlite3.Connection):
+    """Bring a file created by an earlier version up to SQLITE_SCHEMA_VERSION."""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version >= SQLITE_SCHEMA_VERSION:
+        return
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(transactions)")}
+    if 'updated_at' not in columns:
+        logger.info("Upgrading SQLite schema: adding transactions.updated_at")
+        conn.executescript(SQLITE_ADD_UPDATED_AT)
+    else:
+        conn.execute(f"PRAGMA user_version = {SQLITE_SCHEMA_VERSION}")  # Created current
+
+
+class _SQLiteCursor(sqlite3.Cursor):
+    """
+    Cursor that converts dates itself. sqlite3.register_adapter() and
+    register_converter() would instead change every sqlite3 connection in
+    the process, Django's included.
+    """
+
+    def execute(self, sql, parameters=()):
+        return super().execute(sql, [_sqlite_param(value) for value in parameters])
+
+    def executemany(self, sql, seq_of_parameters):
+        return super().executemany(sql, ([_sqlite_param(value) for value in row] for row in seq_of_parameters))
+
+    def fetchone(self):
+        row = super().fetchone()
+        return None if row is None else self._convert([row])[0]
+
+    def fetchmany(self, size=None):
+        return self._convert(super().fetchmany(self.arraysize if size is None else size))
+
+    def fetchall(self):
+        return self._convert(super().fetchall())
+
+    def _convert(self, rows: list) -> list:
+        converters = [
+            (position, SQLITE_CONVERTERS[column[0]])
+            for position, column in enumerate(self.description or ())
+            if column[0] in SQLITE_CONVERTERS
+        ]
+        if not converters or not rows:
+            return rows
+        converted = []
+        for row in rows:
+            row = list(row)
+            for position, convert in converters:
+                if row[position] is not None:
+                    row[position] = convert(row[position])
+            converted.append(tuple(row))
+        return converted
+
+
+class _IdDigest:
+    """SQLite aggregate computing known_ids.id_digest() of a group's IDs."""
+
+    def __init__(self):
+        self.ids = []
+
+    def step(self, value):
+        self.ids.append(value)
+
+    def finalize(self):
+        return id_digest(self.ids)
+
+
+class SQLiteDatabase(Database):
+    """
+    Database on an embedded SQLite file, for single-user runs, tests and
+    benchmarks. Same interface and results as the MySQL backend; the
+    schema is created on first connect and the file runs in WAL mode.
+
+    Select it with DB_BACKEND=sqlite, or directly:
+
+        with SQLiteDatabase.connect(DBConfig(sqlite_path=':memory:')) as db:
+            db.upsert_transactions(df)
+    """
+
+    PLACEHOLDER = '?'
+    INSERT_IGNORE = 'INSERT OR IGNORE'
+    MONTH_OF_DATE = "CAST(strftime('%m', date) AS INTEGER)"
+    ID_DIGEST = 'ID_DIGEST(id)'  # No BIT_XOR; registered on connect
+
+    @staticmethod
+    @contextmanager
+    def connect(config: Optional[DBConfig] = None):
         """
-        Normalize the DataFrame into a list of dicts ready for insertion.
-        Lowercases column names and fills in None for optional columns.
+        Context manager that yields a SQLiteDatabase on config.sqlite_path.
+        Commits on clean exit, rolls back on exception.
         """
-        df = df.copy()
-        df.columns = df.columns.str.lower().str.replace(' ', '_')
+        config = config or DBConfig()
+        path = config.sqlite_path
+        if path != ':memory:' and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
 
-        for optional_col in ('label', 'category', 'additional_labels'):
-            if optional_col not in df.columns:
-                df[optional_col] = None
+        conn = sqlite3.connect(path)
+        conn.create_aggregate('ID_DIGEST', 1, _IdDigest)
+        try:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")  # Durable at checkpoints; safe with WAL
+            conn.executescript(SQLITE_TABLE.format(table='transactions'))
+            _upgrade_sqlite(conn)
+            conn.executescript(SQLITE_SCHEMA)
+            logger.info(f"Opened SQLite database '{path}'")
+            yield SQLiteDatabase(conn, query_cache=get_query_cache(config))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            logger.warning("Transaction rolled back due to error.")
+            raise
+        finally:
+            conn.close()
+
+    def migrate_id_scheme(self, mapping: pd.DataFrame) -> dict:
+        """SQLite version of Database.migrate_id_scheme() — no UPDATE ... JOIN."""
+        pairs = list(zip(mapping['v1'], mapping['v2']))
+        if not pairs:
+            return {'migrated': 0, 'total': 0}
 
-        # mysql-connector expects Python date objects, not Timestamps
-        if pd.api.types.is_datetime64_any_dtype(df['date']):
-            df['date'] = df['date'].dt.date
+        with self._cursor() as cur:
+            cur.execute("CREATE TEMPORARY TABLE id_migration (v1 TEXT NOT NULL PRIMARY KEY, v2 TEXT NOT NULL)")
+            try:
+                cur.executemany("INSERT OR IGNORE INTO id_migration (v1, v2) VALUES (?, ?)", pairs)
+                cur.execute("""
+                    UPDATE OR IGNORE transactions
+                    SET id = (SELECT v2 FROM id_migration WHERE v1 = transactions.id), id_scheme = 2
+                    WHERE id_scheme = 1 AND id IN (SELECT v1 FROM id_migration)
+                """)
+                migrated = cur.rowcount
+            finally:
+                cur.execute("DROP TABLE temp.id_migration")
 
-        return df[
-            ['id', 'date', 'concept', 'account', 'amount', 'label', 'category', 'additional_labels']
-        ].to_dict('records')
+        if migrated:
+            self._invalidate_query_cache()
+        logger.info(f"ID migration complete — migrated: {migrated}, mapped: {len(pairs)}")
+        return {'migrated': migrated, 'total': len(pairs)}
+
+    def _cursor(self):
+        return closing(self._conn.cursor(_SQLiteCursor))
+
+    def _stream(self, sql: str, params: list, size: int) -> Iterator[list[tuple]]:
+        # SQLite steps through results lazily; there is nothing to drain
+        with self._cursor() as cur:
+            cur.execute(sql, params)
+            while rows := cur.fetchmany(size):
+                yield rows
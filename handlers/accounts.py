@@ -1,3 +1,4 @@
+from handlers.amounts import CreditMinusDebit, SignedByType
 from handlers.base import BaseHandler
 
 
@@ -9,6 +10,8 @@ class SoFiSavingsHandler(BaseHandler):
     col_date = 'Date'
     col_concept = 'Description'
     col_amount = 'Amount'
+    csv_engine = 'pyarrow'
+    csv_dtypes = {'Date': 'str', 'Description': 'str'}
 
 
 class SoFiCheckingHandler(BaseHandler):
@@ -17,6 +20,8 @@ class SoFiCheckingHandler(BaseHandler):
     col_date = 'Date'
     col_concept = 'Description'
     col_amount = 'Amount'
+    csv_engine = 'pyarrow'
+    csv_dtypes = {'Date': 'str', 'Description': 'str'}
 
 
 # ── Capital One ───────────────────────────────────────────────────────────────
@@ -26,17 +31,10 @@ class CapitalOneCheckingHandler(BaseHandler):
     date_format = '%m/%d/%y'
     col_date = 'Transaction Date'
     col_concept = 'Transaction Description'
-    col_amount = 'Amount'  # Derived in _apply_amount_logic
-
-    @staticmethod
-    def _apply_amount_logic(df):
-        df['Amount'] = df.apply(
-            lambda row: row['Transaction Amount']
-            if row['Transaction Type'] == 'Credit'
-            else -row['Transaction Amount'],
-            axis=1
-        )
-        return df
+    col_amount = 'Amount'  # Derived by amount_spec
+    amount_spec = SignedByType('Transaction Amount', 'Transaction Type', positive='Credit')
+    csv_engine = 'pyarrow'
+    csv_dtypes = {'Transaction Date': 'str', 'Transaction Description': 'str', 'Transaction Type': 'str'}
 
 
 class CapitalOneSavingsHandler(BaseHandler):
@@ -44,17 +42,10 @@ class CapitalOneSavingsHandler(BaseHandler):
     date_format = '%m/%d/%y'
     col_date = 'Transaction Date'
     col_concept = 'Transaction Description'
-    col_amount = 'Amount'  # Derived in _apply_amount_logic
-
-    @staticmethod
-    def _apply_amount_logic(df):
-        df['Amount'] = df.apply(
-            lambda row: row['Transaction Amount']
-            if row['Transaction Type'] == 'Credit'
-            else -row['Transaction Amount'],
-            axis=1
-        )
-        return df
+    col_amount = 'Amount'  # Derived by amount_spec
+    amount_spec = SignedByType('Transaction Amount', 'Transaction Type', positive='Credit')
+    csv_engine = 'pyarrow'
+    csv_dtypes = {'Transaction Date': 'str', 'Transaction Description': 'str', 'Transaction Type': 'str'}
 
 
 class CapitalOneQuicksilverHandler(BaseHandler):
@@ -62,13 +53,11 @@ class CapitalOneQuicksilverHandler(BaseHandler):
     date_format = '%Y-%m-%d'
     col_date = 'Transaction Date'
     col_concept = 'Description'
-    col_amount = 'Amount'  # Derived in _apply_amount_logic
-
-    @staticmethod
-    def _apply_amount_logic(df):
-        df = df.fillna(0)
-        df['Amount'] = df['Credit'] - df['Debit']
-        return df
+    col_amount = 'Amount'  # Derived by amount_spec
+    amount_spec = CreditMinusDebit('Credit', 'Debit')
+    # The C engine: pyarrow would parse the ISO dates unless declared, and cannot
+    # read the often-blank Credit and Debit columns once anything is declared
+    csv_dtypes = {'Transaction Date': 'str', 'Description': 'str'}
 
 
 # ── Amex ──────────────────────────────────────────────────────────────────────
@@ -80,6 +69,8 @@ class AmexHandler(BaseHandler):
     col_concept = 'Description'
     col_amount = 'Amount'
     negate_amount = True
+    csv_engine = 'pyarrow'
+    csv_dtypes = {'Date': 'str', 'Description': 'str'}
 
 
 # ── Chase ─────────────────────────────────────────────────────────────────────
@@ -90,6 +81,8 @@ class ChaseHandler(BaseHandler):
     col_date = 'Transaction Date'
     col_concept = 'Description'
     col_amount = 'Amount'
+    csv_engine = 'pyarrow'
+    csv_dtypes = {'Transaction Date': 'str', 'Description': 'str'}
 
 
 # ── Discover ──────────────────────────────────────────────────────────────────
@@ -101,6 +94,8 @@ class DiscoverHandler(BaseHandler):
     col_concept = 'Description'
     col_amount = 'Amount'
     negate_amount = True
+    csv_engine = 'pyarrow'
+    csv_dtypes = {'Trans. Date': 'str', 'Description': 'str'}
 
 
 # ── Wells Fargo ───────────────────────────────────────────────────────────────
@@ -113,6 +108,7 @@ class WellsFargoCheckingHandler(BaseHandler):
     col_amount = 'Amount'
     csv_names = ['Date', 'Amount', '*', '_', 'Description']
     csv_header = None
+    csv_engine = 'pyarrow'  # Nothing declared: '_' holds check numbers, often blank
 
 
 class WellsFargoSavingsHandler(BaseHandler):
@@ -123,6 +119,7 @@ class WellsFargoSavingsHandler(BaseHandler):
     col_amount = 'Amount'
     csv_names = ['Date', 'Amount', '*', '_', 'Description']
     csv_header = None
+    csv_engine = 'pyarrow'  # Nothing declared: '_' holds check numbers, often blank
 
 
 # ── Registry ──────────────────────────────────────────────────────────────────
@@ -141,3 +138,19 @@ ACCOUNT_HANDLERS = {
     'WF Checking': WellsFargoCheckingHandler(),
     'WF Savings': WellsFargoSavingsHandler(),
 }
+
+
+# Maps filename substrings to ACCOUNT_HANDLERS keys for the CLI.
+# Order matters — more specific patterns should come first.
+FILE_ACCOUNT_MAP = {
+    '360Checking': 'CO Checking',
+    '360PerformanceSavings': 'CO Savings',
+    'transaction_download': 'Quicksilver',
+    'SOFI-Checking': 'SoFi Checking',
+    'SOFI-Savings': 'SoFi Savings',
+    'WF-Checking': 'WF Checking',
+    'WF-Savings': 'WF Savings',
+    'activity': 'Delta',
+    'Chase': 'Chase',
+    'Discover': 'Discover',
+}
@@ -0,0 +1,117 @@
+"""
+handlers/amounts.py — Declarative amount specs for account handlers.
+
+A handler whose amount is not a single signed CSV column declares an
+`amount_spec` built from the pieces below instead of deriving the column
+itself. Every spec evaluates to whole-column NumPy operations, so the
+cost does not grow with per-row Python calls.
+
+Example — sign taken from a type column (e.g. Capital One Checking):
+
+    amount_spec = SignedByType('Transaction Amount', 'Transaction Type', positive='Credit')
+
+Example — separate credit and debit columns (e.g. Quicksilver):
+
+    amount_spec = CreditMinusDebit('Credit', 'Debit')
+
+Example — bank reports charges as positive numbers:
+
+    amount_spec = Negate(Column('Amount'))
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+class AmountSpec(ABC):
+    """Base class for amount specs. Subclasses must define evaluate() and columns."""
+
+    def prepare(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Normalize the source columns this spec reads, in place.
+        Runs before IDs are generated, so changes here are part of the
+        hash input. The default implementation is a no-op.
+        """
+        return df
+
+    @abstractmethod
+    def evaluate(self, df: pd.DataFrame) -> pd.Series:
+        """Return the signed amount for every row of `df`."""
+
+    @property
+    @abstractmethod
+    def columns(self) -> tuple:
+        """Source columns this spec reads, used for account detection."""
+
+
+@dataclass(frozen=True)
+class Column(AmountSpec):
+    """Amount read as-is from a single column."""
+    column: str
+
+    def evaluate(self, df: pd.DataFrame) -> pd.Series:
+        return df[self.column]
+
+    @property
+    def columns(self) -> tuple:
+        return (self.column,)
+
+
+@dataclass(frozen=True)
+class Negate(AmountSpec):
+    """Sign-flipped amount of another spec."""
+    spec: AmountSpec
+
+    def prepare(self, df: pd.DataFrame) -> pd.DataFrame:
+        return self.spec.prepare(df)
+
+    def evaluate(self, df: pd.DataFrame) -> pd.Series:
+        return -self.spec.evaluate(df)
+
+    @property
+    def columns(self) -> tuple:
+        return self.spec.columns
+
+
+@dataclass(frozen=True)
+class SignedByType(AmountSpec):
+    """Unsigned amount column, positive when `type_column` equals `positive`
+    and negative otherwise."""
+    column: str
+    type_column: str
+    positive: str = 'Credit'
+
+    def evaluate(self, df: pd.DataFrame) -> pd.Series:
+        values = df[self.column].to_numpy()
+        is_positive = (df[self.type_column] == self.positive).to_numpy()
+        return pd.Series(np.where(is_positive, values, -values), index=df.index)
+
+    @property
+    def columns(self) -> tuple:
+        return (self.column, self.type_column)
+
+
+@dataclass(frozen=True)
+class CreditMinusDebit(AmountSpec):
+    """Separate credit and debit columns; blank cells count as zero."""
+    credit: str
+    debit: str
+
+    def prepare(self, df: pd.DataFrame) -> pd.DataFrame:
+        # Only these two columns — other columns keep their blanks
+        columns = [self.credit, self.debit]
+        df[columns] = df[columns].fillna(0)
+        return df
+
+    def evaluate(self, df: pd.DataFrame) -> pd.Series:
+        values = df[self.credit].to_numpy() - df[self.debit].to_numpy()
+        return pd.Series(values, index=df.index)
+
+    @property
+    def columns(self) -> tuple:
+        return (self.credit, self.debit)
@@ -2,9 +2,9 @@
 handlers/base.py — Base class for all account transaction handlers.
 
 To add a new account handler, subclass BaseHandler and declare the
-class-level attributes. Override `_apply_amount_logic` only if the
-account needs custom amount calculation before the DataFrame is built
-(e.g. Capital One's Credit/Debit column logic).
+class-level attributes. Declare an `amount_spec` (see handlers/amounts.py)
+only if the account derives its amount from several source columns
+(e.g. Capital One's Credit/Debit type column).
 
 Example — minimal subclass:
 
@@ -29,24 +29,15 @@ Example — subclass with amount negation (e.g. Amex, Discover):
         negate_amount = True
 
 
-Example — subclass with custom amount logic (e.g. Capital One):
+Example — subclass with a derived amount (e.g. Capital One):
 
     class CapitalOneCheckingHandler(BaseHandler):
         account     = 'CO Checking'
         date_format = '%m/%d/%y'
         col_date    = 'Transaction Date'
         col_concept = 'Transaction Description'
-        col_amount  = 'Amount'  # Populated by _apply_amount_logic
-
-        @staticmethod
-        def _apply_amount_logic(df):
-            df['Amount'] = df.apply(
-                lambda row: row['Transaction Amount']
-                if row['Transaction Type'] == 'Credit'
-                else -row['Transaction Amount'],
-                axis=1
-            )
-            return df
+        col_amount  = 'Amount'  # Derived by amount_spec
+        amount_spec = SignedByType('Transaction Amount', 'Transaction Type', positive='Credit')
 
 
 Example — subclass with no headers (e.g. Wells Fargo):
@@ -59,17 +50,69 @@ Example — subclass with no headers (e.g. Wells Fargo):
         col_amount  = 'Amount'
         csv_names   = ['Date', 'Amount', '*', '_', 'Description']
         csv_header  = None
+
+
+Declared dtypes and the pyarrow engine:
+
+    csv_engine = 'pyarrow'
+    csv_dtypes = {'Date': 'str', 'Description': 'str'}
+
+Declared dtypes end up in the ID hash, so they must match what pandas
+would infer whatever the file holds — declare text columns as 'str', and
+leave numeric ones undeclared: a 'float64' declaration would render a
+column of whole numbers as '1001.0' where pandas infers '1001'. With the
+pyarrow engine, pandas cannot read an integer column with blank cells
+once any dtype is declared, so a handler with such a column declares
+nothing, or uses the default engine.
+
+
+Transaction ID schemes (set with the ID_SCHEME environment variable):
+
+    1 — MD5 of the parsed row as rendered by pandas, '_'-joined (default)
+    2 — MD5 of the raw CSV record bytes, hashed while the file is read
+
+Each output row records its scheme in the 'ID Scheme' column. Switch an
+existing database to v2 with migrate_ids.py before importing with it.
+
+
+Output columns use the compact dtypes of handlers/schema.py — notably
+Amount in int64 cents and a categorical Account.
+
+
+Sources — `process()` and friends read any of these without first
+copying the file into memory:
+
+    - a local path, memory-mapped
+    - a Django TemporaryUploadedFile, read from its path on disk
+    - any binary file-like object (e.g. an in-memory Django upload)
 """
 
 from __future__ import annotations
 
 import hashlib
+import importlib.util
+import io
 import logging
+import mmap
+import os
+import numpy as np
 import pandas as pd
-from typing import Optional
+from contextlib import contextmanager
+from itertools import islice
+from typing import Iterable, Iterator, Optional
+
+from handlers.amounts import AmountSpec, Column
+from handlers.dates import parse_dates
+from handlers.schema import compact, to_cents
 
 logger = logging.getLogger(__name__)
 
+# pyarrow is optional — handlers that ask for it fall back to the C engine
+HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+
+ID_SCHEME_V1 = 1  # MD5 of the parsed row as rendered by pandas
+ID_SCHEME_V2 = 2  # MD5 of the raw CSV record bytes
+
 
 class BaseHandler:
     # ── Required — must be set by every subclass ───────────────────────────
@@ -84,12 +127,18 @@ class BaseHandler:
     negate_amount: bool = False  # Set True if the bank inverts sign (e.g. Amex, Discover)
     csv_names: list = None  # Column names to assign (for headerless CSVs e.g. Wells Fargo)
     csv_header: Optional[int] = 0  # Row number of header; None for headerless CSVs
+    amount_spec: AmountSpec = None  # How to derive the amount; defaults to col_amount as-is
+    chunksize: int = 50_000  # Rows per batch yielded by process_chunks
+    csv_engine: Optional[str] = None  # pandas read_csv engine, e.g. 'pyarrow'; None for the default
+    csv_dtypes: dict = None  # Declared column dtypes; undeclared columns are inferred
+    id_scheme: Optional[int] = None  # Scheme for new IDs; None reads ID_SCHEME when used (see module docstring)
 
     # ── Public entry point ─────────────────────────────────────────────────
 
     def process(self, file_path: str) -> Optional[pd.DataFrame]:
         """
         Parse, clean, and return a normalized DataFrame for this account.
+        `file_path` may also be an upload or file-like (see module docstring).
         Returns None and logs the error if anything goes wrong.
         """
         try:
@@ -97,52 +146,175 @@ class BaseHandler:
             df = self._read_and_process(file_path)
             logger.info(f'Successfully processed: {file_path}')
             return df
-        except FileNotFoundError:
-            logger.error(f'File not found: {file_path}')
-        except pd.errors.EmptyDataError:
-            logger.error(f'No data in file: {file_path}')
-        except pd.errors.ParserError as e:
-            logger.error(f'Parsing error in {file_path}: {e}')
         except Exception as e:
-            logger.error(f'Unexpected error processing {file_path}: {e}')
+            self._log_error(file_path, e)
         return None
 
+    def process_chunks(self, file_path: str, chunksize: Optional[int] = None) -> Iterator[pd.DataFrame]:
+        """
+        Parse and yield normalized DataFrames of at most `chunksize` rows,
+        so only one batch of the file is held in memory at a time.
+        Stops and logs the error if anything goes wrong; batches already
+        yielded are complete and safe to keep.
+
+        IDs match process(): for ID scheme v1, which hashes the rendered
+        raw columns, the file is first scanned once to find the dtypes
+        pandas infers for the whole of it, and every batch is read with
+        those (e.g. '100' renders as '100.0' in a column that also holds
+        '-12.34'). A file-like source is rewound between the two reads, so
+        it must be seekable.
+        """
+        try:
+            logger.info(f'Processing in chunks: {file_path}')
+            for raw_df, record_ids in self._iter_raw_batches(file_path, chunksize or self.chunksize):
+                yield self._normalize(raw_df, record_ids)
+            logger.info(f'Successfully processed: {file_path}')
+        except Exception as e:
+            self._log_error(file_path, e)
+
+    def id_mapping(self, file_path: str) -> pd.DataFrame:
+        """
+        Return the v1 and v2 IDs of every record in a file, as columns
+        'v1' and 'v2', for migrating stored IDs between schemes.
+        Raises instead of logging if the file cannot be processed.
+        """
+        raw_df, record_ids = self._read_with_record_ids(file_path)
+        v1_ids = self._normalize(raw_df)['ID']
+        return pd.DataFrame({'v1': v1_ids.to_numpy(), 'v2': record_ids})
+
     # ── Internal ───────────────────────────────────────────────────────────
 
+    def _id_scheme(self) -> int:
+        """The scheme for new IDs — the class's own, else the ID_SCHEME environment variable."""
+        scheme = self.id_scheme if self.id_scheme is not None else int(os.getenv('ID_SCHEME', ID_SCHEME_V1))
+        if scheme not in (ID_SCHEME_V1, ID_SCHEME_V2):
+            raise ValueError(f'Unknown ID scheme: {scheme} (expected {ID_SCHEME_V1} or {ID_SCHEME_V2})')
+        return scheme
+
     def _read_and_process(self, file_path: str) -> pd.DataFrame:
-        raw_df = pd.read_csv(
-            file_path,
+        if self._id_scheme() == ID_SCHEME_V2:
+            return self._normalize(*self._read_with_record_ids(file_path))
+        return self._normalize(self._read_csv(file_path))
+
+    def _read_with_record_ids(self, file_path: str) -> tuple[pd.DataFrame, list[str]]:
+        """Parse a whole file and hash its raw data records (ID scheme v2)."""
+        with _open_binary(file_path) as stream:
+            records = list(_iter_records(_iter_lines(stream), self.encoding))
+        header_count = self._header_record_count()
+        return self._parse_records(records), _hash_records(records[header_count:])
+
+    def _iter_raw_batches(self, file_path: str, chunksize: int) -> Iterator[tuple[pd.DataFrame, Optional[list[str]]]]:
+        """Yield (raw batch, record IDs or None) pairs of at most `chunksize` rows."""
+        if self._id_scheme() != ID_SCHEME_V2:
+            start = _rewind_position(file_path)
+            dtypes = self._whole_file_dtypes(file_path, chunksize)
+            if start is not None:
+                file_path.seek(start)  # The dtype scan left a file-like source at its end
+            with self._read_csv(file_path, chunksize=chunksize, dtype=dtypes) as reader:
+                for raw_df in reader:
+                    yield raw_df, None
+            return
+
+        with _open_binary(file_path) as stream:
+            records = _iter_records(_iter_lines(stream), self.encoding)
+            header = list(islice(records, self._header_record_count()))
+            start = 0
+            while batch := list(islice(records, chunksize)):
+                raw_df = self._parse_records(header + batch)
+                # Continue the row index across batches, as pandas' chunked reader does
+                raw_df.index = pd.RangeIndex(start, start + len(raw_df))
+                start += len(raw_df)
+                yield raw_df, _hash_records(batch)
+
+    def _whole_file_dtypes(self, file_path: str, chunksize: int) -> dict:
+        """The column dtypes a whole-file read infers, found one batch at a time."""
+        dtypes = {}
+        with self._read_csv(file_path, chunksize=chunksize) as reader:
+            for raw_df in reader:
+                for column, dtype in raw_df.dtypes.items():
+                    dtypes[column] = _common_dtype(dtypes[column], dtype) if column in dtypes else dtype
+        return dtypes
+
+    def _header_record_count(self) -> int:
+        return 0 if self.csv_header is None else self.csv_header + 1
+
+    def _parse_records(self, records: list[bytes]) -> pd.DataFrame:
+        # Terminate the last record too — pyarrow rejects a lone unterminated one
+        return self._read_csv(io.BytesIO(b'\n'.join([*records, b''])))
+
+    def _read_csv(self, file_path: str, dtype: Optional[dict] = None, **kwargs):
+        """pd.read_csv with the handler's settings; `dtype` replaces the declared csv_dtypes."""
+        engine = self.csv_engine
+        if engine == 'pyarrow' and (not HAS_PYARROW or 'chunksize' in kwargs):
+            engine = None  # pyarrow is unavailable or cannot read in chunks
+
+        path = _local_path(file_path)
+        return pd.read_csv(
+            file_path if path is None else path,
             encoding=self.encoding,
             names=self.csv_names,
             header=self.csv_header,
+            engine=engine,
+            # pandas may write inferred dtypes back into the mapping
+            dtype=dict(dtype or self.csv_dtypes or {}) or None,
+            # pyarrow reads files natively; the C engine needs to be asked to map them
+            memory_map=path is not None and engine != 'pyarrow',
+            **kwargs,
         )
 
-        # Hook for subclasses that need custom amount derivation
-        raw_df = self._apply_amount_logic(raw_df)
+    def _normalize(self, raw_df: pd.DataFrame, record_ids: Optional[list[str]] = None) -> pd.DataFrame:
+        """
+        Build the clean DataFrame from one raw CSV frame or batch.
+        IDs are v2 record hashes when `record_ids` is given, v1 otherwise.
+        """
+        if raw_df.empty:
+            raise pd.errors.EmptyDataError
+        if record_ids is not None and len(record_ids) != len(raw_df):
+            raise pd.errors.ParserError(
+                f'Found {len(record_ids)} CSV records but parsed {len(raw_df)} rows'
+            )
+
+        spec = self.amount_spec or Column(self.col_amount)
+        raw_df = spec.prepare(raw_df)
+        amount = spec.evaluate(raw_df)
+
+        # A derived amount has always been part of the hash input — keep it
+        # there so IDs stay stable.
+        if self.col_amount not in raw_df.columns:
+            raw_df[self.col_amount] = amount
 
-        amount = -raw_df[self.col_amount] if self.negate_amount else raw_df[self.col_amount]
+        if self.negate_amount:
+            amount = -amount
+
+        if record_ids is None:
+            ids, id_scheme = self._generate_ids(raw_df), ID_SCHEME_V1
+        else:
+            ids, id_scheme = pd.Series(record_ids, index=raw_df.index, dtype=str), ID_SCHEME_V2
 
         clean_df = pd.DataFrame({
-            'ID': raw_df.apply(self._generate_id, axis=1),
-            'Date': pd.to_datetime(raw_df[self.col_date], format=self.date_format),
+            'ID': ids,
+            'Date': parse_dates(raw_df[self.col_date], self.date_format),
             'Concept': raw_df[self.col_concept],
             'Account': self.account,
-            'Amount': amount,
+            'Amount': to_cents(amount),
             'Label': None,
             'Category': None,
             'Additional Labels': None,
+            'ID Scheme': id_scheme,
         })
 
-        return clean_df
+        return compact(clean_df)
 
     @staticmethod
-    def _apply_amount_logic(df: pd.DataFrame) -> pd.DataFrame:
-        """
-        Override in subclasses that derive the amount column from multiple
-        source columns before the clean DataFrame is built.
-        The default implementation is a no-op.
-        """
-        return df
+    def _log_error(file_path: str, error: Exception):
+        if isinstance(error, FileNotFoundError):
+            logger.error(f'File not found: {file_path}')
+        elif isinstance(error, pd.errors.EmptyDataError):
+            logger.error(f'No data in file: {file_path}')
+        elif isinstance(error, pd.errors.ParserError):
+            logger.error(f'Parsing error in {file_path}: {error}')
+        else:
+            logger.error(f'Unexpected error processing {file_path}: {error}')
 
     @staticmethod
     def _generate_id(row: pd.Series) -> str:
@@ -151,3 +323,133 @@ class BaseHandler:
         identical rows (e.g. two Roth IRA contributions same date/amount)."""
         unique_string = '_'.join(row.astype(str))
         return hashlib.md5(unique_string.encode()).hexdigest()
+
+    @staticmethod
+    def _generate_ids(df: pd.DataFrame) -> pd.Series:
+        """Column-wise equivalent of applying `_generate_id` to every row.
+
+        Each column is stringified in one vectorized step and the columns
+        are joined with '_', so the resulting IDs are byte-identical to the
+        row-wise scheme and previously imported rows still deduplicate.
+        Missing cells render as 'nan', as they did before pandas 3.
+        """
+        if df.empty:
+            return pd.Series([], index=df.index, dtype=str)
+
+        # A row of a frame with no text columns is upcast to the common
+        # dtype (e.g. int -> float) before it is stringified — mirror that.
+        if not any(_is_text_dtype(dtype) for dtype in df.dtypes):
+            df = df.astype(df.to_numpy().dtype)
+
+        columns = [_stringify_column(df.iloc[:, i]) for i in range(df.shape[1])]
+        joined = columns[0].str.cat(columns[1:], sep='_') if len(columns) > 1 else columns[0]
+
+        md5 = hashlib.md5
+        return pd.Series(
+            [md5(s.encode()).hexdigest() for s in joined],
+            index=df.index,
+            dtype=str,
+        )
+
+
+def _common_dtype(a, b):
+    """
+    The dtype pandas infers for a column whose parts were inferred as `a`
+    and `b`: numbers widen (int and float → float, as for a blank cell);
+    anything else mixed stays text, as read.
+    """
+    if a == b:
+        return a
+    if all(pd.api.types.is_numeric_dtype(d) and not pd.api.types.is_bool_dtype(d) for d in (a, b)):
+        return np.result_type(a, b)
+    return 'str'
+
+
+def _is_text_dtype(dtype) -> bool:
+    return pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype)
+
+
+def _stringify_column(col: pd.Series) -> pd.Series:
+    """Render a column the way `str()` renders each of its cells."""
+    if pd.api.types.is_numeric_dtype(col.dtype) or _is_text_dtype(col.dtype):
+        rendered = col.astype(str)
+    else:
+        # Datetimes and other extension types: astype(str) differs from
+        # str(value) (e.g. drops the time part), so fall back to str().
+        rendered = col.astype(object).map(str, na_action='ignore').astype(str)
+    return rendered.fillna('nan')
+
+
+def _local_path(source) -> Optional[str]:
+    """Path on disk behind `source`, or None for in-memory file-likes."""
+    if isinstance(source, (str, os.PathLike)):
+        return os.fspath(source)
+    # Django's TemporaryUploadedFile is already spooled to disk
+    temporary_file_path = getattr(source, 'temporary_file_path', None)
+    if callable(temporary_file_path):
+        return temporary_file_path()
+    return None
+
+
+def _rewind_position(source) -> Optional[int]:
+    """
+    Where a file-like source starts, so it can be read a second time; None
+    for sources read from disk. Raises ValueError if it cannot seek.
+    """
+    if _local_path(source) is not None:
+        return None
+    if not (hasattr(source, 'seekable') and source.seekable()):
+        raise ValueError(
+            'process_chunks() reads the source twice for ID scheme v1 and needs a seekable one; '
+            'use process() or ID scheme v2 instead'
+        )
+    return source.tell()
+
+
+@contextmanager
+def _open_binary(source):
+    """
+    Open a source for binary reading. Files on disk are memory-mapped;
+    file-like objects are used as-is.
+    """
+    path = _local_path(source)
+    if path is None:
+        yield source
+        return
+
+    with open(path, 'rb') as stream:
+        if os.fstat(stream.fileno()).st_size == 0:
+            yield stream  # Empty files cannot be mapped
+            return
+        with mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+def _iter_lines(stream) -> Iterator[bytes]:
+    """Lines of a binary stream; works for files, uploads and memory maps alike."""
+    return iter(stream.readline, b'')
+
+
+def _iter_records(lines: Iterable, encoding: str) -> Iterator[bytes]:
+    """
+    Yield the raw bytes of each CSV record without its line terminator.
+    A line break inside a quoted field stays part of its record, and
+    blank lines are skipped the way pandas skips them.
+    """
+    pending = b''
+    for line in lines:
+        if isinstance(line, str):
+            line = line.encode(encoding)
+        pending += line
+        if pending.count(b'"') % 2:
+            continue  # Still inside a quoted field
+        record, pending = pending.rstrip(b'\r\n'), b''
+        if record.strip():
+            yield record
+    if pending.strip():
+        yield pending.rstrip(b'\r\n')
+
+
+def _hash_records(records: list[bytes]) -> list[str]:
+    md5 = hashlib.md5
+    return [md5(record).hexdigest() for record in records]
@@ -0,0 +1,178 @@
+"""
+handlers/detect.py — Content-based account detection.
+
+Each handler in ACCOUNT_HANDLERS gets a signature built from what it
+already declares: the header columns it reads (or, for headerless files,
+its column count) and the shape of its date format. A file is classified
+from its first few KB, without parsing the rest.
+
+Some accounts share an export format (e.g. SoFi Checking and Savings).
+Content alone narrows those to a set of candidates; pass the
+filename-based guess as `hint` to choose between them.
+
+Usage:
+
+    from handlers.detect import detect_file
+
+    account_key = detect_file('data/export.csv', hint='SoFi Savings')
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import re
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from handlers.accounts import ACCOUNT_HANDLERS
+from handlers.base import BaseHandler, _iter_records
+
+DETECT_HEAD_BYTES = 4096
+DETECT_SAMPLE_ROWS = 5
+
+# strftime directives → regex of the text they produce
+_DATE_DIRECTIVES = {
+    '%Y': r'\d{4}',
+    '%y': r'\d{2}',
+    '%m': r'\d{1,2}',
+    '%d': r'\d{1,2}',
+    '%b': r'[A-Za-z]{3}',
+    '%B': r'[A-Za-z]+',
+}
+
+
+# ── Signatures ────────────────────────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class Signature:
+    """What a handler's files look like in their first few records."""
+    handler_key:  str
+    columns:      frozenset        # Header columns the handler reads
+    column_count: Optional[int]    # Only for headerless files
+    date_column:  object           # Header name, or position when headerless
+    date_pattern: re.Pattern
+    encoding:     str
+
+    def matches(self, records: list[list[str]]) -> bool:
+        """True if the parsed head records fit this signature."""
+        if not records:
+            return False
+
+        if self.column_count is None:
+            header, rows = records[0], records[1:]
+            if not self.columns <= set(header):
+                return False
+            date_index = header.index(self.date_column)
+        else:
+            rows = records
+            if len(rows[0]) != self.column_count:
+                return False
+            date_index = self.date_column
+
+        rows = [row for row in rows[:DETECT_SAMPLE_ROWS] if len(row) > date_index]
+        return all(self.date_pattern.fullmatch(row[date_index].strip()) for row in rows)
+
+
+def date_pattern(date_format: str) -> re.Pattern:
+    """Regex matching the text `date_format` produces, e.g. %m/%d/%Y → 01/15/2026."""
+    parts = re.split(r'(%.)', date_format)
+    return re.compile(''.join(_DATE_DIRECTIVES.get(part, re.escape(part)) for part in parts))
+
+
+def signature_for(handler_key: str, handler: BaseHandler) -> Signature:
+    """Build the detection signature for one registered handler."""
+    if handler.amount_spec is not None:
+        amount_columns = handler.amount_spec.columns
+    else:
+        amount_columns = (handler.col_amount,)
+    columns = frozenset((handler.col_date, handler.col_concept, *amount_columns))
+
+    if handler.csv_header is None and handler.csv_names:
+        column_count = len(handler.csv_names)
+        date_column = handler.csv_names.index(handler.col_date)
+    else:
+        column_count = None
+        date_column = handler.col_date
+
+    return Signature(
+        handler_key=handler_key,
+        columns=columns,
+        column_count=column_count,
+        date_column=date_column,
+        date_pattern=date_pattern(handler.date_format),
+        encoding=handler.encoding,
+    )
+
+
+def build_signature_index(handlers: dict = ACCOUNT_HANDLERS) -> list[Signature]:
+    """Signatures for every handler, in registry order."""
+    return [signature_for(key, handler) for key, handler in handlers.items()]
+
+
+SIGNATURES = build_signature_index()
+
+
+# ── Detection ─────────────────────────────────────────────────────────────────
+
+def parse_head(head: bytes, encoding: str = 'latin1', truncated: bool = False) -> list[list[str]]:
+    """
+    Split the first bytes of a CSV file into records of fields. When the
+    head was cut off mid-file, its last (possibly partial) record is dropped.
+    """
+    records = list(_iter_records(head.splitlines(keepends=True), encoding))
+    if truncated and records:
+        records.pop()
+    text = '\n'.join(record.decode(encoding) for record in records)
+    return list(csv.reader(io.StringIO(text)))
+
+
+def match_signatures(head: bytes, signatures: Iterable[Signature] = None,
+                     truncated: bool = False) -> list[str]:
+    """
+    Handler keys whose signature fits the file head. Handlers that read
+    more of the header rank first, so a superset format wins over a
+    subset one (e.g. Credit/Debit columns over a single Amount).
+    """
+    signatures = SIGNATURES if signatures is None else signatures
+
+    parsed = {}
+    matched = []
+    for signature in signatures:
+        if signature.encoding not in parsed:
+            parsed[signature.encoding] = parse_head(head, signature.encoding, truncated)
+        if signature.matches(parsed[signature.encoding]):
+            matched.append(signature)
+
+    if not matched:
+        return []
+    best = max(len(signature.columns) for signature in matched)
+    return [signature.handler_key for signature in matched if len(signature.columns) == best]
+
+
+def detect_account(head: bytes, hint: Optional[str] = None,
+                   signatures: Iterable[Signature] = None,
+                   truncated: bool = False) -> Optional[str]:
+    """
+    Classify a file from its head. Returns the handler key, or None if
+    no handler fits, or if several do and `hint` does not pick one of them.
+    """
+    candidates = match_signatures(head, signatures, truncated)
+    if len(candidates) == 1:
+        return candidates[0]
+    if hint in candidates:
+        return hint
+    return None
+
+
+def read_head(stream, size: int = DETECT_HEAD_BYTES) -> tuple[bytes, bool]:
+    """Read up to `size` bytes and report whether the file continues past them."""
+    head = stream.read(size + 1)
+    return head[:size], len(head) > size
+
+
+def detect_file(file_path, hint: Optional[str] = None) -> Optional[str]:
+    """Classify a local CSV file from its first DETECT_HEAD_BYTES bytes."""
+    with open(file_path, 'rb') as stream:
+        head, truncated = read_head(stream)
+    return detect_account(head, hint, truncated=truncated)
@@ -0,0 +1,197 @@
+"""
+known_ids.py — Client-side filter of transaction IDs already in the database.
+
+Bank exports cover rolling windows, so most rows of a re-import already
+exist. KnownIdFilter keeps one sorted array of IDs per account, persisted
+to a local .npz file and refreshed incrementally from `imported_at`, so
+those rows are dropped before any SQL is sent. Only IDs not in the filter
+go to the database, which still decides with INSERT IGNORE.
+
+Membership is exact (no false positives), so a row is only dropped when
+its ID was seen in the database. The filter can miss recent IDs, which
+only costs a round trip. Deletions are caught by sync(): a filter whose
+per-account count and digest of IDs differ from the database's is
+rebuilt.
+
+Usage:
+    from known_ids import KnownIdFilter
+
+    known_ids = KnownIdFilter.load('./data/.known_ids.npz')
+    with Database.connect() as db:
+        known_ids.sync(db.iter_imported_ids, db.id_digests())
+        db.upsert_transactions(df, known_ids=known_ids)
+    known_ids.save()  # only once the import has committed
+"""
+
+import logging
+import os
+import tempfile
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ID_DTYPE = 'S32'  # IDs are at most 32 ASCII characters (MD5 hex)
+
+# Leading hex digits of each ID that enter id_digest() — 60 bits, so
+# digests fit a signed 64-bit integer in every database
+DIGEST_DIGITS = 15
+
+# An import that commits after a sync can carry slightly older imported_at
+# stamps than the watermark that sync saw, so each sync re-reads this much
+# before it; merging is idempotent, so the overlap costs nothing else.
+WATERMARK_OVERLAP = timedelta(minutes=10)
+
+_HEX_VALUES = np.full(256, -1, dtype=np.int64)
+for _digits in (b'0123456789abcdef', b'0123456789ABCDEF'):
+    _HEX_VALUES[np.frombuffer(_digits, dtype=np.uint8)] = np.arange(16)
+
+
+class KnownIdFilter:
+    """Per-account sorted arrays of IDs known to exist in the database."""
+
+    def __init__(self, path: str, ids: Optional[dict] = None, watermark: Optional[datetime] = None):
+        self.path = path
+        self.watermark = watermark  # Latest imported_at seen; None until the first refresh
+        self._ids = ids or {}       # account key → sorted, unique ID_DTYPE array
+
+    @classmethod
+    def load(cls, path: str) -> 'KnownIdFilter':
+        """Load a saved filter, or start an empty one if there is none yet."""
+        try:
+            with np.load(path, allow_pickle=False) as saved:
+                accounts = saved['accounts'].tolist()
+                bounds = np.concatenate([[0], np.cumsum(saved['sizes'])])
+                ids = {
+                    account: saved['ids'][bounds[i]:bounds[i + 1]]
+                    for i, account in enumerate(accounts)
+                }
+                watermark = saved['watermark'].item()
+        except FileNotFoundError:
+            return cls(path)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f'Ignoring unreadable known-ID filter {path}: {e}')
+            return cls(path)
+        return cls(path, ids, datetime.fromisoformat(watermark) if watermark else None)
+
+    def __len__(self) -> int:
+        return sum(len(ids) for ids in self._ids.values())
+
+    def contains(self, accounts: Iterable, ids: Iterable[str]) -> np.ndarray:
+        """Boolean mask: True where (account, ID) is certainly in the database."""
+        accounts = np.asarray(list(accounts), dtype=object)
+        ids = np.asarray(list(ids), dtype=ID_DTYPE)
+        mask = np.zeros(len(ids), dtype=bool)
+
+        for account in set(accounts):
+            known = self._ids.get(_account_key(account))
+            if known is None or not len(known):
+                continue
+            rows = accounts == account
+            wanted = ids[rows]
+            positions = np.searchsorted(known, wanted)
+            found = positions < len(known)
+            found[found] = known[positions[found]] == wanted[found]
+            mask[rows] = found
+        return mask
+
+    def add(self, accounts: Iterable, ids: Iterable[str]):
+        """Record IDs that are now in the database (e.g. after a committed import)."""
+        accounts = np.asarray(list(accounts), dtype=object)
+        ids = np.asarray(list(ids), dtype=ID_DTYPE)
+        for account in set(accounts):
+            key = _account_key(account)
+            new = ids[accounts == account]
+            known = self._ids.get(key)
+            self._ids[key] = np.unique(new if known is None else np.concatenate([known, new]))
+
+    def refresh(self, rows: Iterable[tuple]):
+        """
+        Merge (account, id, imported_at) rows imported since `watermark`,
+        e.g. from Database.iter_imported_ids(), and advance the watermark.
+        """
+        accounts, ids = [], []
+        for account, transaction_id, imported_at in rows:
+            accounts.append(account)
+            ids.append(transaction_id)
+            if self.watermark is None or imported_at > self.watermark:
+                self.watermark = imported_at
+        if ids:
+            self.add(accounts, ids)
+        logger.info(f'Known-ID filter refreshed: {len(ids)} new, {len(self)} total')
+
+    def sync(self, iter_ids: Callable[[Optional[datetime]], Iterable[tuple]], digests: dict):
+        """
+        Bring the filter up to date with the database. iter_ids(since)
+        streams the (account, id, imported_at) rows imported at or after
+        `since`, or all of them for None; `digests` maps each account in the
+        database to the (count, id_digest()) of its IDs.
+
+        Only rows imported since the watermark, less WATERMARK_OVERLAP, are
+        fetched. If any account's IDs then still differ from the database's
+        — transactions were deleted, or rows were missed — the filter is
+        rebuilt from all of them, so a deleted row is never skipped on
+        re-import.
+        """
+        self.refresh(iter_ids(self.watermark - WATERMARK_OVERLAP if self.watermark else None))
+
+        expected = {_account_key(account): tuple(digest) for account, digest in digests.items()}
+        stale = [
+            key for key in set(self._ids) | set(expected)
+            if self._digest(key) != expected.get(key, (0, 0))
+        ]
+        if stale:
+            logger.info(f'Known-ID filter differs from the database for {len(stale)} accounts; rebuilding')
+            self._ids, self.watermark = {}, None
+            self.refresh(iter_ids(None))
+
+    def _digest(self, key: str) -> tuple:
+        ids = self._ids.get(key, ())
+        return len(ids), id_digest(ids)
+
+    def save(self):
+        """
+        Write the filter to disk, replacing the file atomically. Each save
+        writes its own temporary file, so concurrent savers never interleave.
+        """
+        accounts = sorted(self._ids)
+        directory, name = os.path.split(os.path.abspath(self.path))
+        with tempfile.NamedTemporaryFile(dir=directory, prefix=f'{name}.', suffix='.tmp', delete=False) as f:
+            try:
+                np.savez(
+                    f,
+                    accounts=np.array(accounts, dtype=str),
+                    sizes=np.array([len(self._ids[a]) for a in accounts], dtype=np.int64),
+                    ids=np.concatenate([self._ids[a] for a in accounts]) if accounts else np.array([], dtype=ID_DTYPE),
+                    watermark=np.array(self.watermark.isoformat() if self.watermark else ''),
+                )
+            except BaseException:
+                f.close()
+                os.remove(f.name)
+                raise
+        os.replace(f.name, self.path)
+
+
+def id_digest(ids: Sequence) -> int:
+    """
+    Order-independent digest of a set of IDs: the XOR of each ID's leading
+    DIGEST_DIGITS hex digits, read up to the first non-hex character as
+    MySQL's CONV() reads them. The database computes the same per account
+    for KnownIdFilter.sync().
+    """
+    prefixes = np.asarray(ids, dtype=ID_DTYPE)
+    if not len(prefixes):
+        return 0
+    prefixes = prefixes.astype(f'S{DIGEST_DIGITS}')
+    digits = _HEX_VALUES[prefixes.view(np.uint8).reshape(-1, DIGEST_DIGITS)]
+    valid = np.logical_and.accumulate(digits >= 0, axis=1)
+    shifts = 4 * (valid.sum(axis=1, keepdims=True) - 1 - np.arange(DIGEST_DIGITS))
+    values = np.where(valid, digits << np.maximum(shifts, 0), 0).sum(axis=1)
+    return int(np.bitwise_xor.reduce(values))
+
+
+def _account_key(account) -> str:
+    # Account names in the CLI database, primary keys in Django
+    return str(account)
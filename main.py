@@ -1,59 +1,91 @@
 import calendar
 import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
 import pandas as pd
 import logging
-import gspread
 from db import Database, DBConfig
-from google.oauth2.service_account import Credentials
-from handlers.accounts import ACCOUNT_HANDLERS
+from handlers.accounts import ACCOUNT_HANDLERS, FILE_ACCOUNT_MAP
+from handlers.base import BaseHandler
+from handlers.dates import shared_date_cache
+from handlers.detect import detect_file
+from handlers.schema import concat
+from known_ids import KnownIdFilter
+from manifest import ImportManifest
+from sheets import ChunkedWriter, export_tabs, partition_rows, serialize, sync_rows
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, force=True)
 
-# Authenticate with Google Sheets API
+# Google Sheets API scopes; authentication is deferred until the first export
 SCOPES = ["https://www.googleapis.com/auth/spreadsheets", "https://www.googleapis.com/auth/drive"]
-creds = Credentials.from_service_account_file("expenses_credentials.json", scopes=SCOPES)
-client = gspread.authorize(creds)
-
-FILE_ACCOUNT_MAP = {
-    '360Checking': 'CO Checking',
-    '360PerformanceSavings': 'CO Savings',
-    'transaction_download': 'Quicksilver',
-    'SOFI-Checking': 'SoFi Checking',
-    'SOFI-Savings': 'SoFi Savings',
-    'WF-Checking': 'WF Checking',
-    'WF-Savings': 'WF Savings',
-    'activity': 'Delta',
-    'Chase': 'Chase',
-    'Discover': 'Discover',
-}
-
-
-def read_files(data_dir):
-    all_transactions = []
 
-    for file in os.listdir(data_dir):
-        if not file.lower().endswith('.csv'):
-            logging.error(f'Unsupported file format: {file}. Please provide a CSV file')
-            continue
 
-        file_path = os.path.join(data_dir, file)
-        account_key = next((key for substring, key in FILE_ACCOUNT_MAP.items() if substring in file), None)
+def read_files(data_dir, workers=1, manifest=None):
+    """
+    Parse every CSV file in `data_dir` with its account's handler.
 
-        if account_key is None:
-            logging.error(f'Error reading {file}. Unrecognized file name')
-            continue
+    With workers > 1, files are parsed in a pool of that many processes.
+    Results are merged in file name order either way, so the output does
+    not depend on which file finishes first.
+
+    With an ImportManifest, files unchanged since the last import are
+    skipped, and files that parse are staged in it for the caller to save.
+    """
+    tasks = []
+
+    # Statements share most of their dates — parse each distinct date once per run
+    with shared_date_cache():
+        for file in sorted(os.listdir(data_dir)):
+            if not file.lower().endswith('.csv'):
+                logging.error(f'Unsupported file format: {file}. Please provide a CSV file')
+                continue
 
-        handler = ACCOUNT_HANDLERS[account_key]
-        file_data = handler.process(file_path)
-        if file_data is not None:
-            all_transactions.append(file_data)
+            file_path = os.path.join(data_dir, file)
+            if manifest is not None and not manifest.is_changed(file_path):
+                logging.info(f'Skipping unchanged file: {file}')
+                continue
+
+            # Route by header content; the file name only breaks ties between
+            # accounts that share an export format
+            hint = next((key for substring, key in FILE_ACCOUNT_MAP.items() if substring in file), None)
+            account_key = detect_file(file_path, hint=hint)
+
+            if account_key is None:
+                logging.error(f'Error reading {file}. Unrecognized file format')
+                continue
+
+            tasks.append((ACCOUNT_HANDLERS[account_key], file_path))
+
+        if workers > 1 and len(tasks) > 1:
+            # Each worker process keeps its own per-file date parsing
+            results = _process_in_pool(tasks, workers)
+        else:
+            results = [handler.process(file_path) for handler, file_path in tasks]
+
+    all_transactions = []
+    for (_, file_path), file_data in zip(tasks, results):
+        if file_data is None:
+            continue
+        all_transactions.append(file_data)
+        if manifest is not None:
+            manifest.stage(file_path)
 
     if not all_transactions:
         logging.warning('No valid transactions found')
         return None
 
-    return pd.concat(all_transactions).drop_duplicates()
+    return concat(all_transactions).drop_duplicates()
+
+
+def _process_in_pool(tasks, workers):
+    """Run handler.process for each (handler, file_path) task in a process pool, in task order."""
+    handlers, file_paths = zip(*tasks)
+    # Workers log per-file errors themselves, so give them the same logging setup.
+    # Both callables live outside this module, so workers never re-import main.
+    init_logging = partial(logging.basicConfig, level=logging.INFO, force=True)
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), initializer=init_logging) as executor:
+        return list(executor.map(BaseHandler.process, handlers, file_paths))
 
 
 def filter_transactions_by_date(transactions_df, target_month=None, target_year=None):
@@ -74,20 +106,37 @@ def filter_transactions_by_date(transactions_df, target_month=None, target_year=
     return transactions_df
 
 
+@lru_cache(maxsize=None)
 def get_gspread_client(credentials_file='expenses_credentials.json'):
-    """Authenticate and return a gspread client with proper scopes."""
-    scopes = [
-        "https://www.googleapis.com/auth/spreadsheets",
-        "https://www.googleapis.com/auth/drive"  # Add Drive scope
-    ]
-    creds = Credentials.from_service_account_file(credentials_file, scopes=scopes)
+    """
+    Authenticate and return a gspread client with proper scopes.
+
+    Authenticates on the first call only: the client is kept for the life
+    of the process, and its credentials reuse their access token until it
+    expires. gspread itself is imported here, so runs that never export do
+    not pay for it.
+    """
+    import gspread
+    from google.oauth2.service_account import Credentials
+
+    creds = Credentials.from_service_account_file(credentials_file, scopes=SCOPES)
     return gspread.authorize(creds)
 
 
-def export_to_gsheet(df, spreadsheet_name, worksheet_name, credentials_file='expenses_credentials.json'):
-    """Exports DataFrame to a Google Sheets worksheet, appending data starting at row 4, column A."""
-    # Authenticate with Google Sheets
-    client = get_gspread_client()
+def export_to_gsheet(df, spreadsheet_name, worksheet_name, credentials_file='expenses_credentials.json',
+                     incremental=False, checkpoint_path=None):
+    """
+    Exports DataFrame to a Google Sheets worksheet, writing data starting at row 2, column A.
+
+    Rows are sent in size-bounded, retried batches (see sheets.ChunkedWriter).
+    With `incremental`, the sheet is read first and only new or changed
+    rows are written. With a `checkpoint_path`, a full export that fails
+    part-way resumes after the last batch the API confirmed.
+    """
+    import gspread
+
+    # Authenticate with Google Sheets (once per process)
+    client = get_gspread_client(credentials_file)
 
     # Open the Google Sheet
     try:
@@ -100,46 +149,93 @@ def export_to_gsheet(df, spreadsheet_name, worksheet_name, credentials_file='exp
     df.sort_values(by=['Date', 'Concept'], inplace=True)
     data = df.drop(columns=['Label', 'Category'], errors='ignore')
 
-    # Convert Pandas Timestamp objects to strings
-    data = data.applymap(lambda x: x.isoformat() if isinstance(x, pd.Timestamp) else x)
-    # Define the starting cell (row 4, column A)
-    start_row, start_col = 2, 1  # 'A4' is row 4, column 1 (A)
+    # Define the starting cell (row 2, column A)
+    start_row = 2
 
-    # Convert dataframe to list of lists
-    data_values = data.values.tolist()
+    # ISO dates, amounts in dollars, blank cells for nulls — column by column
+    data_values = serialize(data)
+
+    writer = ChunkedWriter(checkpoint_path=checkpoint_path)
+    if incremental:
+        sync_rows(sheet, data_values, start_row=start_row, writer=writer)
+        logging.info(f"Successfully synced {len(df)} transactions to '{worksheet_name}' in '{spreadsheet_name}'.")
+        return
 
-    # Define the range to update dynamically
-    end_row = start_row + len(data_values) - 1
-    end_col = start_col + len(data.columns) - 1
-    range_to_update = f"A{start_row}:{chr(64 + end_col)}{end_row}"
     # Update existing cells
-    sheet.update(range_name=range_to_update, values=data_values)
+    result = writer.write(sheet, [(start_row, data_values)])
+    if result['resumed']:
+        logging.info(f"Resumed export — {result['resumed']} of {result['requests']} batches were already written.")
 
     logging.info(f"Successfully exported {len(df)} transactions to '{worksheet_name}' in '{spreadsheet_name}'.")
 
 
+def export_tabs_to_gsheet(df, spreadsheet_name, by='month', all_tab='Transactions',
+                          credentials_file='expenses_credentials.json'):
+    """
+    Exports DataFrame to one worksheet per month, account or category (`by`),
+    plus `all_tab` with every row unless it is None. All tabs are written,
+    and missing ones created, in a single request (see sheets.export_tabs).
+    """
+    # Authenticate with Google Sheets (once per process)
+    client = get_gspread_client(credentials_file)
+    spreadsheet = client.open(spreadsheet_name)
+
+    df.sort_values(by=['Date', 'Concept'], inplace=True)
+    data = df.drop(columns=['Label', 'Category'], errors='ignore')
+    data_values = serialize(data)
+
+    # Serialize once; each tab takes its rows by position
+    tabs = {all_tab: data_values} if all_tab else {}
+    for title, positions in partition_rows(df, by).items():
+        tabs[title] = [data_values[position] for position in positions]
+
+    result = export_tabs(spreadsheet, tabs, header=list(data.columns))
+    logging.info(f"Successfully exported {len(df)} transactions to {result['tabs']} tabs in '{spreadsheet_name}'.")
+
+
 # Press the green button in the gutter to run the script.
 if __name__ == '__main__':
     source_path = "./data/2026"
     current_year = 2026
-
-    all_data = read_files(source_path)
-
-    if all_data is None or all_data.empty:
-        logging.warning('No valid transactions found. Nothing to import or export.')
-    else:
-        with Database.connect() as db:
-            result = db.upsert_transactions(all_data)
+    read_workers = int(os.getenv('READ_WORKERS', 1))
+    manifest = ImportManifest.load(os.getenv('IMPORT_MANIFEST', './data/.import_manifest.json'))
+    known_ids_path = os.getenv('KNOWN_IDS_PATH')  # Optional, e.g. ./data/.known_ids.npz
+    known_ids = KnownIdFilter.load(known_ids_path) if known_ids_path else None
+    incremental_export = os.getenv('SHEETS_INCREMENTAL', '0') == '1'
+    sheets_checkpoint = os.getenv('SHEETS_CHECKPOINT', './data/.sheets_checkpoint.json')
+    sheets_fan_out = os.getenv('SHEETS_FAN_OUT')  # Optional: month, account or category
+
+    all_data = read_files(source_path, workers=read_workers, manifest=manifest)
+
+    with Database.connect() as db:
+        if all_data is None or all_data.empty:
+            # Still export: a failed export is retried and label edits reach the sheet
+            logging.info('No new transactions found. Nothing to import.')
+        else:
+            if known_ids is not None:
+                known_ids.sync(db.iter_imported_ids, db.id_digests())
+            result = db.upsert_transactions(all_data, known_ids=known_ids)
             logging.info(
                 f"Import complete — "
                 f"{result['inserted']} new, "
                 f"{result['skipped']} already existed, "
                 f"{result['total']} total processed."
             )
-            year_data = db.query_transactions(year=current_year)
+        year_data = db.query_transactions(year=current_year)
+
+    # Only remember files and IDs once the import has committed
+    manifest.save()  # Also records files that were touched but not modified
+    if known_ids is not None:
+        known_ids.save()
 
-        if year_data.empty:
-            logging.warning(f'No transactions found in database for {current_year}.')
+    if year_data.empty:
+        logging.warning(f'No transactions found in database for {current_year}.')
+    else:
+        logging.info(f'Exporting {len(year_data)} transactions to Google Sheets.')
+        if sheets_fan_out:
+            export_tabs_to_gsheet(year_data, f'{current_year} Budget', by=sheets_fan_out)
         else:
-            logging.info(f'Exporting {len(year_data)} transactions to Google Sheets.')
-            export_to_gsheet(year_data, f'{current_year} Budget', 'Transactions')
+            export_to_gsheet(
+                year_data, f'{current_year} Budget', 'Transactions',
+                incremental=incremental_export, checkpoint_path=sheets_checkpoint,
+            )
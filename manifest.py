@@ -0,0 +1,113 @@
+"""
+manifest.py — Incremental import manifest for the CLI data directory.
+
+Records the size, mtime and content hash of every statement file that was
+imported, so later runs skip files that have not changed. Size and mtime
+are checked first; the file is only hashed when they differ, so an
+unchanged directory costs one stat() per file.
+
+Entries are staged while files are parsed and only written by save(),
+which main.py calls once the import has committed — a failed run
+re-reads the same files next time.
+
+Usage:
+    from manifest import ImportManifest
+
+    manifest = ImportManifest.load('./data/.import_manifest.json')
+    all_data = read_files('./data/2026', manifest=manifest)
+    ...  # upsert
+    manifest.save()
+"""
+
+import hashlib
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+
+@dataclass(frozen=True)
+class ManifestEntry:
+    size: int
+    mtime_ns: int
+    sha256: str
+
+
+class ImportManifest:
+    """File path → ManifestEntry, persisted as JSON."""
+
+    def __init__(self, path: str, entries: Optional[dict] = None):
+        self.path = path
+        self._entries = entries or {}
+        self._staged = {}
+
+    @classmethod
+    def load(cls, path: str) -> 'ImportManifest':
+        """Load a manifest, or start an empty one if the file does not exist yet."""
+        try:
+            with open(path) as f:
+                raw = json.load(f)
+        except FileNotFoundError:
+            return cls(path)
+        except (OSError, ValueError) as e:
+            logger.warning(f'Ignoring unreadable import manifest {path}: {e}')
+            return cls(path)
+        return cls(path, {key: ManifestEntry(**entry) for key, entry in raw.items()})
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def is_changed(self, file_path: str) -> bool:
+        """True if the file is new or its content differs from the last import."""
+        entry = self._entries.get(_key(file_path))
+        if entry is None:
+            return True
+
+        stat = os.stat(file_path)
+        if stat.st_size != entry.size:
+            return True
+        if stat.st_mtime_ns == entry.mtime_ns:
+            return False
+
+        # Touched but possibly identical (e.g. re-downloaded) — compare content
+        sha256 = file_sha256(file_path)
+        if sha256 != entry.sha256:
+            return True
+        self._staged[_key(file_path)] = ManifestEntry(stat.st_size, stat.st_mtime_ns, sha256)
+        return False
+
+    def stage(self, file_path: str):
+        """Mark a file as imported; persisted by the next save()."""
+        stat = os.stat(file_path)
+        self._staged[_key(file_path)] = ManifestEntry(stat.st_size, stat.st_mtime_ns, file_sha256(file_path))
+
+    def save(self):
+        """Write staged entries to disk, replacing the file atomically."""
+        if not self._staged:
+            return
+        self._entries.update(self._staged)
+        self._staged = {}
+
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({key: asdict(entry) for key, entry in sorted(self._entries.items())}, f, indent=2)
+        os.replace(tmp_path, self.path)
+        logger.info(f'Import manifest updated: {len(self._entries)} files tracked')
+
+
+def file_sha256(file_path: str) -> str:
+    """SHA-256 of a file's content, read in fixed-size chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _key(file_path: str) -> str:
+    return os.path.abspath(file_path)
@@ -0,0 +1,74 @@
+"""
+migrate_ids.py — One-off migration of stored transaction IDs to scheme v2.
+
+Scheme v2 hashes the raw CSV record bytes, which the database does not
+keep, so the original statement files are re-read to pair every v1 ID
+with its v2 ID. Transactions whose source file is not passed in keep
+their v1 ID and will not deduplicate against v2 imports.
+
+Usage:
+    python migrate_ids.py ./data/2025 ./data/2026
+
+Then import with the new scheme:
+    export ID_SCHEME=2
+    python main.py
+"""
+
+import logging
+import os
+import sys
+from typing import Optional
+
+import pandas as pd
+
+from db import Database
+from handlers.accounts import ACCOUNT_HANDLERS, FILE_ACCOUNT_MAP
+from handlers.detect import detect_file
+
+logging.basicConfig(level=logging.INFO, force=True)
+
+
+def build_id_mapping(data_dirs: list[str]) -> Optional[pd.DataFrame]:
+    """Pair the v1 and v2 IDs of every recognized CSV file in `data_dirs`."""
+    mappings = []
+
+    for data_dir in data_dirs:
+        for file in sorted(os.listdir(data_dir)):
+            if not file.lower().endswith('.csv'):
+                continue
+
+            # Route by header content, as main.read_files() does, so each
+            # file is re-read with the handler that imported it
+            file_path = os.path.join(data_dir, file)
+            hint = next((key for substring, key in FILE_ACCOUNT_MAP.items() if substring in file), None)
+            account_key = detect_file(file_path, hint=hint)
+            if account_key is None:
+                logging.error(f'Error reading {file}. Unrecognized file format')
+                continue
+
+            try:
+                mappings.append(ACCOUNT_HANDLERS[account_key].id_mapping(file_path))
+            except Exception as e:
+                logging.error(f'Could not map IDs in {file_path}: {e}')
+
+    if not mappings:
+        return None
+
+    # Overlapping statements repeat rows; keep one v2 ID per v1 ID
+    return pd.concat(mappings, ignore_index=True).drop_duplicates('v1')
+
+
+if __name__ == '__main__':
+    source_paths = sys.argv[1:] or ['./data/2026']
+
+    mapping = build_id_mapping(source_paths)
+
+    if mapping is None:
+        logging.warning('No statement files found. Nothing to migrate.')
+    else:
+        with Database.connect() as db:
+            result = db.migrate_id_scheme(mapping)
+        logging.info(
+            f"Migration complete — {result['migrated']} of {result['total']} "
+            f"mapped transactions now use ID scheme v2."
+        )
@@ -12,6 +12,7 @@ USE budget;
 -- Create the transactions table
 CREATE TABLE IF NOT EXISTS transactions (
     id                VARCHAR(32)    NOT NULL PRIMARY KEY,  -- MD5 hex (always 32 chars)
+    id_scheme         TINYINT        NOT NULL DEFAULT 1,    -- 1: hash of parsed row, 2: hash of raw CSV record
     date              DATE           NOT NULL,
     concept           TEXT           NOT NULL,
     account           VARCHAR(255)   NOT NULL,
@@ -19,10 +20,27 @@ CREATE TABLE IF NOT EXISTS transactions (
     label             VARCHAR(255)   DEFAULT NULL,          -- manually assigned; never overwritten on re-import
     category          VARCHAR(255)   DEFAULT NULL,          -- manually assigned; never overwritten on re-import
     additional_labels TEXT           DEFAULT NULL,          -- comma-separated extra tags; never overwritten on re-import
-    imported_at       DATETIME       NOT NULL DEFAULT CURRENT_TIMESTAMP
+    imported_at       DATETIME       NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at        DATETIME       NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP  -- inserts and label edits
 );
 
 -- Indexes for common query patterns
 CREATE INDEX idx_transactions_date         ON transactions (date);
 CREATE INDEX idx_transactions_category     ON transactions (category);
 CREATE INDEX idx_transactions_label        ON transactions (label);
+CREATE INDEX idx_transactions_account_date ON transactions (account, date);  -- one account, one period
+CREATE INDEX idx_transactions_imported_at  ON transactions (imported_at);    -- known-ID filter refresh
+CREATE INDEX idx_transactions_updated_at   ON transactions (updated_at);     -- incremental Parquet snapshot
+
+-- Upgrading an existing database: Database.connect() adds the ID scheme column
+-- when it is missing (existing rows are v1; see MYSQL_UPGRADES in db.py)
+
+-- Upgrading an existing database (adds the per-account date index)
+-- CREATE INDEX idx_transactions_account_date ON transactions (account, date);
+
+-- Upgrading an existing database (adds the import time index)
+-- CREATE INDEX idx_transactions_imported_at ON transactions (imported_at);
+
+-- Upgrading an existing database: Database.connect() adds the change time
+-- used by snapshot.py and its index when missing, backfilled from imported_at
+-- (see MYSQL_UPGRADES in db.py)
@@ -0,0 +1,121 @@
+"""
+query_cache.py — Versioned cache of Database.query_transactions() results.
+
+Results are keyed by the query's filter arguments and stored with the
+table version they were read at — the row count and latest updated_at,
+which one cheap aggregate query returns. A lookup only hits while the
+version is unchanged, so any import, label edit or deletion invalidates
+every entry without bookkeeping.
+
+Two backends: QueryCache keeps results in process memory, for long-lived
+processes; ParquetQueryCache keeps them as Parquet files in a directory,
+so a run that finds nothing new skips the full query (e.g. the export in
+main.py). Use one directory per database.
+
+Only changes the version can see invalidate entries. Database clears the
+cache after migrate_id_scheme(); updated_at has one-second resolution,
+so an edit in the same second as the cached read needs clear().
+
+Usage:
+    from db import Database, DBConfig
+
+    with Database.connect(DBConfig(query_cache='./data/.query_cache')) as db:
+        year_data = db.query_transactions(year=2026)
+"""
+
+import glob
+import hashlib
+import json
+import logging
+import os
+from typing import Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+VERSION_METADATA_KEY = b'query_cache.version'
+DTYPES_METADATA_KEY = b'query_cache.dtypes'
+
+
+def cache_key(**filters) -> str:
+    """Canonical text of a query's filters; unset filters are left out."""
+    return json.dumps({name: value for name, value in filters.items() if value}, default=str, sort_keys=True)
+
+
+def _version_text(version) -> str:
+    return json.dumps(version, default=str)
+
+
+class QueryCache:
+    """Query results in process memory, keyed by filters."""
+
+    def __init__(self):
+        self._entries = {}  # key → (version text, DataFrame)
+
+    def get(self, key: str, version) -> Optional[pd.DataFrame]:
+        """The cached result for `key`, or None if missing or stale."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != _version_text(version):
+            return None
+        return entry[1].copy()  # Callers may modify their result
+
+    def put(self, key: str, version, df: pd.DataFrame):
+        """Remember `df` as the result for `key` at `version`."""
+        self._entries[key] = (_version_text(version), df.copy())
+
+    def clear(self):
+        """Drop every entry."""
+        self._entries.clear()
+
+
+class ParquetQueryCache(QueryCache):
+    """Query results as Parquet files, one per key, with the version in the file metadata."""
+
+    def __init__(self, directory: str):
+        super().__init__()
+        self.directory = directory
+
+    def get(self, key: str, version) -> Optional[pd.DataFrame]:
+        path = self._path(key)
+        try:
+            metadata = pq.read_schema(path).metadata or {}
+            if metadata.get(VERSION_METADATA_KEY) != _version_text(version).encode():
+                return None
+            df = pq.read_table(path).to_pandas()
+        except FileNotFoundError:
+            return None
+        except (OSError, pa.ArrowException) as e:
+            logger.warning(f'Ignoring unreadable query cache entry {path}: {e}')
+            return None
+        return df.astype(json.loads(metadata.get(DTYPES_METADATA_KEY, b'{}')))
+
+    def put(self, key: str, version, df: pd.DataFrame):
+        os.makedirs(self.directory, exist_ok=True)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        # Parquet has no second-resolution datetimes and reads all-null
+        # categoricals back as objects — record those dtypes to restore them
+        dtypes = {
+            column: str(dtype) for column, dtype in df.dtypes.items()
+            if dtype.kind == 'M' or isinstance(dtype, pd.CategoricalDtype)
+        }
+        metadata = {
+            **(table.schema.metadata or {}),
+            VERSION_METADATA_KEY: _version_text(version).encode(),
+            DTYPES_METADATA_KEY: json.dumps(dtypes).encode(),
+        }
+
+        path = self._path(key)
+        tmp_path = f'{path}.tmp'
+        pq.write_table(table.replace_schema_metadata(metadata), tmp_path)
+        os.replace(tmp_path, path)
+
+    def clear(self):
+        for path in glob.glob(os.path.join(self.directory, '*.parquet')):
+            os.remove(path)
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode()).hexdigest()[:16]
+        return os.path.join(self.directory, f'{digest}.parquet')
@@ -0,0 +1,514 @@
+"""
+sheets.py — Google Sheets export: cell serialization and incremental sync.
+
+serialize() turns a DataFrame into the list of rows the Sheets API
+takes, converting each column in one vectorized step: ISO dates, amounts
+in dollars rounded to the cent, and empty strings for nulls (the API
+skips null cells instead of clearing them).
+
+Rewriting a year of transactions on every run sends the whole sheet even
+when a handful of rows are new. sync_rows() reads the sheet once,
+fingerprints every row by transaction ID and content, and rewrites only
+the rows whose fingerprint differs from the one wanted at that position,
+as one values batchUpdate with a range per run of consecutive rows. Rows
+left over below the new data (e.g. deleted transactions) are cleared.
+
+Rows are compared by position, so the sheet ends up identical to a full
+rewrite. New transactions usually sort last and only append; one that
+sorts earlier also rewrites the rows it pushes down.
+
+Both full and incremental writes go through ChunkedWriter. It splits them
+into size-bounded batchUpdate requests, sends a few at a time, and retries
+quota and server errors with exponential backoff. With a checkpoint file,
+a full export that fails part-way resumes after the last confirmed request.
+
+export_tabs() fans rows out to several worksheets (e.g. one per month,
+see partition_rows()) and writes all of them, creating missing tabs, in
+a single spreadsheet-level batchUpdate.
+
+Usage:
+    from sheets import serialize, sync_rows
+
+    rows = serialize(df)                  # list of lists, sheet order
+    result = sync_rows(worksheet, rows)
+    print(result['written'], 'rows written')
+
+    writer = ChunkedWriter(checkpoint_path='./data/.sheets_checkpoint.json')
+    writer.write(worksheet, [(2, rows)])  # Full rewrite from row 2
+
+    tabs = {title: [rows[i] for i in positions] for title, positions in partition_rows(df, 'month').items()}
+    export_tabs(spreadsheet, tabs, header=list(df.columns))
+"""
+
+import calendar
+import copy
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from handlers.schema import dollars
+
+logger = logging.getLogger(__name__)
+
+DATA_START_ROW = 2  # Row 1 holds the header
+
+# Keeps each request well under the API's request size limit
+MAX_REQUEST_CELLS = 50_000
+WRITE_WORKERS = 4  # Concurrent requests; the per-user write quota is per minute
+MAX_ATTEMPTS = 6
+RETRY_BASE_DELAY = 1.0  # Seconds, doubled after every failed attempt
+RETRY_MAX_DELAY = 64.0
+
+FAN_OUT_KEYS = ('month', 'account', 'category')
+UNCATEGORIZED = 'Uncategorized'  # Tab for transactions without a category
+NEW_TAB_GRID = (1000, 26)  # Minimum (rows, columns) of a created tab, as in the Sheets UI
+
+AMOUNT_DECIMALS = 2
+
+
+# ── Serialization ─────────────────────────────────────────────────────────────
+
+def serialize(df: pd.DataFrame) -> list[list]:
+    """
+    DataFrame → rows of JSON-ready cell values, one vectorized conversion
+    per column. Dates are written as 2026-01-15T00:00:00, like
+    Timestamp.isoformat() in earlier exports, so incremental syncs of
+    those sheets see them as unchanged.
+    """
+    columns = [_serialize_column(name, df[name]).tolist() for name in df.columns]
+    return [list(row) for row in zip(*columns)]
+
+
+def _serialize_column(name: str, column: pd.Series) -> pd.Series:
+    if pd.api.types.is_datetime64_any_dtype(column):
+        text = np.datetime_as_string(column.to_numpy(dtype='datetime64[s]'), unit='s')  # Much faster than strftime
+        return pd.Series(text, index=column.index, dtype=object).where(column.notna(), '')
+    if name == 'Amount':
+        column = dollars(column).round(AMOUNT_DECIMALS)  # Cents → dollars
+    if pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column):
+        return column.astype(float).astype(object).where(column.notna(), '')
+    return column.astype(object).where(column.notna(), '').astype(str)
+
+
+# ── A1 notation ───────────────────────────────────────────────────────────────
+
+def column_letter(column: int) -> str:
+    """1-based column number → A1 column letters (1 → 'A', 27 → 'AA')."""
+    letters = ''
+    while column > 0:
+        column, remainder = divmod(column - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+
+def a1_range(start_row: int, start_col: int, end_row: int, end_col: int) -> str:
+    """A1 notation for a block of cells, all 1-based and inclusive."""
+    return f'{column_letter(start_col)}{start_row}:{column_letter(end_col)}{end_row}'
+
+
+def row_fingerprint(row: Sequence[Any]) -> str:
+    """
+    Digest of a row's cells as the Sheets API reads them back: numbers
+    compare as floats (3000 == 3000.0), empty cells as '', and trailing
+    empty cells — which the API leaves out — are ignored.
+    """
+    cells = ['' if cell is None else repr(float(cell)) if isinstance(cell, (int, float)) else str(cell) for cell in row]
+    while cells and cells[-1] == '':
+        cells.pop()
+    return hashlib.md5(json.dumps(cells).encode()).hexdigest()
+
+
+# ── Chunked writer ────────────────────────────────────────────────────────────
+
+class ChunkedWriter:
+    """
+    Writes blocks of rows as values batchUpdate requests of at most
+    `max_cells` cells each, `workers` requests at a time.
+
+    Each worker thread sends through its own HTTP session, since
+    requests.Session is not documented as thread-safe. Requests failing
+    with 429 or 5xx (or a dropped connection) are retried with exponential
+    backoff and jitter, honouring Retry-After. With a `checkpoint_path`,
+    every confirmed request is recorded under its spreadsheet and worksheet
+    by a digest of its ranges and values; a write that fails part-way can
+    be re-run with the same rows and skips what that worksheet already
+    has. A worksheet's entry is removed once its write completes.
+    """
+
+    def __init__(
+            self,
+            max_cells: int = MAX_REQUEST_CELLS,
+            workers: int = WRITE_WORKERS,
+            checkpoint_path: Optional[str] = None,
+            max_attempts: int = MAX_ATTEMPTS,
+            retry_delay: float = RETRY_BASE_DELAY,
+    ):
+        self.max_cells = max_cells
+        self.workers = workers
+        self.checkpoint_path = checkpoint_path
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._lock = threading.Lock()
+
+    def write(self, worksheet, blocks: list[tuple[int, list[list]]]) -> dict:
+        """
+        Write each (first row, rows) block, starting at column A.
+
+        Returns:
+            dict with keys: 'requests' (total), 'sent', 'resumed' (confirmed
+            by an earlier, interrupted write), 'retries'
+        """
+        requests = self._requests(blocks)
+        key = f'{worksheet.spreadsheet_id}/{worksheet.id}'
+        checkpoint = self._load_checkpoint()
+        confirmed = checkpoint.setdefault(key, set())
+        pending = [(digest, data) for digest, data in requests if digest not in confirmed]
+        self._retries = 0
+
+        local, sessions = threading.local(), []
+
+        def send(data: list[dict]):
+            if not hasattr(local, 'worksheet'):
+                local.worksheet = _with_own_session(worksheet)
+                with self._lock:
+                    sessions.append(local.worksheet.client.session)
+            return self._send(local.worksheet, data)
+
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(pending)))) as executor:
+                futures = {executor.submit(send, data): digest for digest, data in pending}
+                try:
+                    for future in as_completed(futures):
+                        future.result()
+                        with self._lock:
+                            confirmed.add(futures[future])
+                            self._save_checkpoint(checkpoint)
+                except BaseException:
+                    executor.shutdown(cancel_futures=True)
+                    raise
+        finally:
+            for session in sessions:
+                session.close()
+
+        del checkpoint[key]
+        self._save_checkpoint(checkpoint)
+        return {
+            'requests': len(requests),
+            'sent': len(pending),
+            'resumed': len(requests) - len(pending),
+            'retries': self._retries,
+        }
+
+    def _requests(self, blocks: list[tuple[int, list[list]]]) -> list[tuple[str, list[dict]]]:
+        """Split blocks into ranges of at most max_cells cells, then pack those into requests."""
+        requests, data, cells = [], [], 0
+        for first_row, rows in blocks:
+            width = max((len(row) for row in rows), default=0)
+            if not width:
+                continue
+            rows_per_range = max(self.max_cells // width, 1)
+            for offset in range(0, len(rows), rows_per_range):
+                values = rows[offset:offset + rows_per_range]
+                if data and cells + len(values) * width > self.max_cells:
+                    requests.append(data)
+                    data, cells = [], 0
+                row = first_row + offset
+                data.append({'range': a1_range(row, 1, row + len(values) - 1, width), 'values': values})
+                cells += len(values) * width
+        if data:
+            requests.append(data)
+        return [(hashlib.md5(json.dumps(data, default=str).encode()).hexdigest(), data) for data in requests]
+
+    def _send(self, worksheet, data: list[dict]):
+        def count_retry():
+            with self._lock:
+                self._retries += 1
+
+        return with_retries(
+            # gspread prefixes each range with the sheet name in place
+            lambda: worksheet.batch_update([dict(item) for item in data], raw=True),
+            description=f"Sheets write of {data[0]['range']}",
+            max_attempts=self.max_attempts,
+            retry_delay=self.retry_delay,
+            on_retry=count_retry,
+        )
+
+    def _load_checkpoint(self) -> dict:
+        """'spreadsheet ID/worksheet ID' → digests of its confirmed requests."""
+        if self.checkpoint_path is None:
+            return {}
+        try:
+            with open(self.checkpoint_path) as f:
+                return {key: set(digests) for key, digests in json.load(f)['worksheets'].items()}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, KeyError, AttributeError) as e:
+            logger.warning(f'Ignoring unreadable Sheets export checkpoint {self.checkpoint_path}: {e}')
+            return {}
+
+    def _save_checkpoint(self, checkpoint: dict):
+        """Write the checkpoint, or remove the file once no write is pending."""
+        if self.checkpoint_path is None:
+            return
+        if not checkpoint:
+            if os.path.exists(self.checkpoint_path):
+                os.remove(self.checkpoint_path)
+            return
+        tmp_path = f'{self.checkpoint_path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'worksheets': {key: sorted(digests) for key, digests in checkpoint.items()}}, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+
+def _with_own_session(worksheet):
+    """
+    A copy of `worksheet` that sends through a new HTTP session with the
+    same credentials and headers, for use from one thread only.
+    """
+    from google.auth.transport.requests import AuthorizedSession
+
+    session = worksheet.client.session
+    if isinstance(session, AuthorizedSession):
+        own_session = AuthorizedSession(session.credentials)
+    else:
+        own_session = type(session)()
+    own_session.headers.update(session.headers)
+
+    client = copy.copy(worksheet.client)
+    client.session = own_session
+    worksheet = copy.copy(worksheet)
+    worksheet.client = client
+    return worksheet
+
+
+def with_retries(
+        call: Callable[[], Any],
+        description: str,
+        max_attempts: int = MAX_ATTEMPTS,
+        retry_delay: float = RETRY_BASE_DELAY,
+        on_retry: Optional[Callable[[], None]] = None,
+):
+    """
+    Return call(), retrying quota (429) and server (5xx) errors and dropped
+    connections with exponential backoff and jitter; other errors, and the
+    last attempt's, are raised.
+    """
+    from gspread.exceptions import APIError
+    from requests.exceptions import ConnectionError, Timeout
+
+    for attempt in range(1, max_attempts + 1):
+        try:
+            return call()
+        except (APIError, ConnectionError, Timeout) as e:
+            response = getattr(e, 'response', None)
+            status = getattr(response, 'status_code', None)
+            if (status is not None and status != 429 and status < 500) or attempt == max_attempts:
+                raise
+            delay = _retry_after(response) or retry_delay * 2 ** (attempt - 1) * random.uniform(0.5, 1)
+            logger.warning(f'{description} failed ({status or e}), retrying in {delay:.1f}s')
+            if on_retry is not None:
+                on_retry()
+            time.sleep(min(delay, RETRY_MAX_DELAY))
+
+
+def _retry_after(response) -> Optional[float]:
+    """Seconds requested by a Retry-After header, if any."""
+    try:
+        return float(response.headers['Retry-After'])
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return None
+
+
+# ── Incremental sync ──────────────────────────────────────────────────────────
+
+def sync_rows(
+        worksheet,
+        rows: list[list],
+        start_row: int = DATA_START_ROW,
+        writer: Optional[ChunkedWriter] = None,
+) -> dict:
+    """
+    Make the worksheet's data rows equal `rows`, writing only what changed.
+    The first cell of each row is the transaction ID.
+
+    Costs one read, then the changed rows as values batchUpdate requests
+    through `writer` (usually one) and at most one batchClear. An
+    interrupted sync resumes by itself: rows already written compare
+    equal next time.
+
+    Returns:
+        dict with keys: 'written', 'unchanged', 'cleared' (stale rows below
+        the data), 'new' (IDs not on the sheet before), 'total'
+    """
+    from gspread.utils import ValueRenderOption
+
+    width = max((len(row) for row in rows), default=0)
+    # Nulls are skipped by the API rather than cleared — send empty strings
+    rows = [['' if cell is None else cell for cell in row] for row in rows]
+
+    existing = list(worksheet.get(
+        f'A{start_row}:{column_letter(max(width, 1))}',
+        value_render_option=ValueRenderOption.unformatted,
+    ))
+    while existing and not any(existing[-1]):  # An empty range reads as [[]]
+        existing.pop()
+    existing_fingerprints = [row_fingerprint(row) for row in existing]
+    existing_ids = {str(row[0]) for row in existing if row}
+
+    changed = [
+        index for index, row in enumerate(rows)
+        if index >= len(existing_fingerprints) or row_fingerprint(row) != existing_fingerprints[index]
+    ]
+
+    blocks = [(start_row + first, rows[first:last + 1]) for first, last in _runs(changed)]
+    if blocks:
+        (writer or ChunkedWriter()).write(worksheet, blocks)
+
+    stale = max(len(existing) - len(rows), 0)
+    if stale:
+        first_stale = start_row + len(rows)
+        worksheet.batch_clear([a1_range(first_stale, 1, first_stale + stale - 1, max(width, 1))])
+
+    result = {
+        'written': len(changed),
+        'unchanged': len(rows) - len(changed),
+        'cleared': stale,
+        'new': sum(1 for row in rows if row and str(row[0]) not in existing_ids),
+        'total': len(rows),
+    }
+    logger.info(
+        f"Sheet sync — {result['written']} rows written in {len(blocks)} ranges "
+        f"({result['new']} new), {result['unchanged']} unchanged, {result['cleared']} cleared."
+    )
+    return result
+
+
+def _runs(indexes: list[int]) -> list[tuple[int, int]]:
+    """Sorted indexes → (first, last) pairs of consecutive runs."""
+    runs = []
+    for index in indexes:
+        if runs and runs[-1][1] == index - 1:
+            runs[-1] = (runs[-1][0], index)
+        else:
+            runs.append((index, index))
+    return runs
+
+
+# ── Fan-out export ────────────────────────────────────────────────────────────
+
+def partition_rows(df: pd.DataFrame, by: str) -> dict[str, list[int]]:
+    """
+    Tab title → positions of the rows of `df` that go in it, in `df` order.
+    Months are titled by name ('January'); accounts and categories by value.
+    """
+    if by == 'month':
+        keys = df['Date'].dt.month.map(lambda month: calendar.month_name[month])
+    elif by == 'account':
+        keys = df['Account']
+    elif by == 'category':
+        keys = df['Category'].astype(object).where(df['Category'].notna(), UNCATEGORIZED)
+    else:
+        raise ValueError(f'Unknown fan-out key: {by!r} (expected one of {", ".join(FAN_OUT_KEYS)})')
+
+    positions = pd.Series(range(len(df)), index=df.index)
+    return {str(title): group.tolist() for title, group in positions.groupby(keys.to_numpy(), sort=False)}
+
+
+def export_tabs(spreadsheet, tabs: dict[str, list[list]], header: list[str], start_row: int = DATA_START_ROW) -> dict:
+    """
+    Write each tab's rows from `start_row` on, replacing the data below it,
+    in one spreadsheet batchUpdate. Tabs that do not exist yet are created
+    in the same request, with `header` as their first row. updateCells
+    does not grow a tab the way the values API does, so new tabs are sized
+    to fit and smaller existing ones get rows or columns appended first.
+
+    The request is all-or-nothing, and retried like ChunkedWriter's. It
+    carries every tab, so keep ChunkedWriter for very large single tabs.
+
+    Returns:
+        dict with keys: 'tabs', 'created' (titles), 'rows'
+    """
+    metadata = spreadsheet.fetch_sheet_metadata()
+    properties = {sheet['properties']['title']: sheet['properties'] for sheet in metadata['sheets']}
+    sheet_ids = {title: tab['sheetId'] for title, tab in properties.items()}
+    next_id = max(sheet_ids.values(), default=0) + 1
+    width = len(header)
+
+    requests, created = [], []
+    for title, rows in tabs.items():
+        row_count, column_count = max(start_row - 1 + len(rows), 1), max(width, 1)
+        if title not in sheet_ids:
+            # Choosing the ID lets later requests in the batch refer to the new tab
+            sheet_ids[title] = next_id
+            next_id += 1
+            created.append(title)
+            requests.append({'addSheet': {'properties': {
+                'sheetId': sheet_ids[title],
+                'title': title,
+                'gridProperties': {
+                    'rowCount': max(row_count, NEW_TAB_GRID[0]),
+                    'columnCount': max(column_count, NEW_TAB_GRID[1]),
+                },
+            }}})
+            requests.append(_update_cells(sheet_ids[title], 0, [header]))
+        else:
+            grid = properties[title].get('gridProperties', {})
+            for dimension, needed, current in (
+                    ('ROWS', row_count, grid.get('rowCount', 0)),
+                    ('COLUMNS', column_count, grid.get('columnCount', 0)),
+            ):
+                if needed > current:
+                    requests.append({'appendDimension': {
+                        'sheetId': sheet_ids[title], 'dimension': dimension, 'length': needed - current,
+                    }})
+
+        # Clear the data columns below the header, then write the rows
+        requests.append({'updateCells': {
+            'range': {
+                'sheetId': sheet_ids[title],
+                'startRowIndex': start_row - 1,
+                'startColumnIndex': 0,
+                'endColumnIndex': width,
+            },
+            'fields': 'userEnteredValue',
+        }})
+        if rows:
+            requests.append(_update_cells(sheet_ids[title], start_row - 1, rows))
+
+    with_retries(
+        lambda: spreadsheet.batch_update({'requests': requests}),
+        description=f'Sheets export of {len(tabs)} tabs',
+    )
+
+    result = {'tabs': len(tabs), 'created': created, 'rows': sum(map(len, tabs.values()))}
+    logger.info(f"Exported {result['rows']} rows to {result['tabs']} tabs ({len(created)} created) in one request.")
+    return result
+
+
+def _update_cells(sheet_id: int, start_row_index: int, rows: list[list]) -> dict:
+    return {'updateCells': {
+        'start': {'sheetId': sheet_id, 'rowIndex': start_row_index, 'columnIndex': 0},
+        'rows': [{'values': [_cell_data(cell) for cell in row]} for row in rows],
+        'fields': 'userEnteredValue',
+    }}
+
+
+def _cell_data(value) -> dict:
+    """A serialized cell as CellData; an empty one clears the cell."""
+    if value is None or value == '':
+        return {}
+    if isinstance(value, bool):
+        return {'userEnteredValue': {'boolValue': value}}
+    if isinstance(value, (int, float)):
+        return {'userEnteredValue': {'numberValue': value}}
+    # Raw strings: a leading '=' or a date-like value is not interpreted
+    return {'userEnteredValue': {'stringValue': str(value)}}
@@ -0,0 +1,207 @@
+"""
+snapshot.py — Incremental Parquet snapshot of the transactions table.
+
+Writes every transaction to Parquet, partitioned by year and account
+(year=2026/account=Chase/part-0.parquet; names are URL-encoded), so analysis can load years of
+history without querying the database. Later runs fetch only the rows
+whose updated_at is at or after the previous run's — new imports and
+label edits alike — and rewrite just the partitions those rows fall in.
+
+Rows deleted from the database, or whose ID was rewritten by
+migrate_ids.py, stay in the snapshot until it is rebuilt with --full.
+
+Usage:
+    python snapshot.py ./data/snapshot           # incremental
+    python snapshot.py ./data/snapshot --full    # rebuild from scratch
+
+    from snapshot import load_snapshot
+    df = load_snapshot('./data/snapshot', years=[2025, 2026])
+"""
+
+import glob
+import json
+import logging
+import os
+import shutil
+import sys
+from datetime import datetime
+from functools import reduce
+from typing import Iterable, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from db import Database
+from handlers.schema import compact
+from known_ids import WATERMARK_OVERLAP
+
+logger = logging.getLogger(__name__)
+
+STATE_FILE = '_snapshot.json'  # Leading underscore: skipped by Parquet readers
+
+# Rows are stamped when written but only visible once committed, so an
+# import that commits after a snapshot run can carry slightly older
+# timestamps than that run saw. Each run re-reads WATERMARK_OVERLAP before
+# the last watermark, as KnownIdFilter.sync() does; merging is idempotent,
+# so the overlap costs nothing else.
+
+PARTITIONING = ds.partitioning(pa.schema([('year', pa.int16()), ('account', pa.string())]), flavor='hive')
+
+# Explicit, so every partition file has the same schema whatever its values
+FILE_SCHEMA = pa.schema([
+    ('ID', pa.string()),
+    ('Date', pa.timestamp('s')),
+    ('Concept', pa.string()),
+    ('Amount', pa.int64()),  # Cents, as in handlers/schema.py
+    ('Label', pa.string()),
+    ('Category', pa.string()),
+    ('Additional Labels', pa.string()),
+])
+
+
+# ── Export ────────────────────────────────────────────────────────────────────
+
+def export_snapshot(db: Database, directory: str, full: bool = False) -> dict:
+    """
+    Bring the snapshot in `directory` up to date with the database.
+    With `full`, or when there is no snapshot yet, it is rebuilt from scratch.
+
+    Returns:
+        dict with keys: 'rows' (changed rows written), 'partitions' (rewritten)
+    """
+    state = {} if full else _read_state(directory)
+    if not state:
+        _clear(directory)
+
+    since = None
+    if state.get('watermark'):
+        since = datetime.fromisoformat(state['watermark']) - WATERMARK_OVERLAP
+
+    changes = [chunk for chunk in db.query_changes(since=since) if not chunk.empty]
+    if not changes:
+        logger.info('Snapshot is up to date.')
+        _write_state(directory, state.get('watermark'))
+        return {'rows': 0, 'partitions': 0}
+
+    changed = pd.concat(changes, ignore_index=True).astype({'Account': 'str'})
+    changed['year'] = changed['Date'].dt.year.astype('int16')
+    watermark = changed.pop('Updated At').max()
+
+    partitions = changed[['year', 'Account']].drop_duplicates()
+    existing = _read_partitions(directory, partitions.itertuples(index=False))
+    if not existing.empty:
+        # Changed rows replace their earlier versions
+        existing = existing[~existing['ID'].isin(changed['ID'])]
+        changed = pd.concat([existing, changed], ignore_index=True)
+
+    changed = changed.sort_values(['Date', 'ID'], ignore_index=True)
+    _write_partitions(directory, changed)
+    _write_state(directory, pd.Timestamp(watermark).isoformat(sep=' '))
+
+    logger.info(f'Snapshot updated — {sum(map(len, changes))} changed rows, {len(partitions)} partitions rewritten.')
+    return {'rows': sum(map(len, changes)), 'partitions': len(partitions)}
+
+
+def _read_partitions(directory: str, partitions: Iterable[tuple]) -> pd.DataFrame:
+    """Current rows of the given (year, account) partitions, with 'year' and 'Account' columns."""
+    if not os.path.isdir(directory):
+        return pd.DataFrame()
+
+    filters = [(ds.field('year') == year) & (ds.field('account') == account) for year, account in partitions]
+    table = _dataset(directory).to_table(filter=reduce(lambda a, b: a | b, filters))
+    return table.to_pandas().rename(columns={'account': 'Account'}).astype({'Account': 'str'})
+
+
+def _write_partitions(directory: str, df: pd.DataFrame):
+    """Write `df` as its partitions, replacing any files they already have."""
+    table = pa.Table.from_pandas(df[list(FILE_SCHEMA.names)], schema=FILE_SCHEMA, preserve_index=False)
+    table = table.append_column('year', pa.array(df['year'], pa.int16()))
+    table = table.append_column('account', pa.array(df['Account'], pa.string()))
+    ds.write_dataset(
+        table,
+        directory,
+        format='parquet',
+        partitioning=PARTITIONING,
+        basename_template='part-{i}.parquet',
+        existing_data_behavior='delete_matching',
+    )
+
+
+def _dataset(directory: str) -> ds.Dataset:
+    """The snapshot's partition files, skipping anything else kept in `directory`."""
+    if not os.path.isdir(directory):
+        raise FileNotFoundError(directory)
+    files = glob.glob(os.path.join(glob.escape(directory), 'year=*', 'account=*', '*.parquet'))
+    return ds.dataset(sorted(files), format='parquet', partitioning=PARTITIONING, partition_base_dir=directory)
+
+
+def _clear(directory: str):
+    """
+    Remove the snapshot in `directory` — its year=* partitions and state
+    file only, so anything else kept there is left alone.
+    """
+    for path in glob.glob(os.path.join(glob.escape(directory), 'year=*')):
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+    for path in (os.path.join(directory, STATE_FILE), os.path.join(directory, f'{STATE_FILE}.tmp')):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _read_state(directory: str) -> dict:
+    try:
+        with open(os.path.join(directory, STATE_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning(f'Ignoring unreadable snapshot state in {directory}: {e}')
+        return {}
+
+
+def _write_state(directory: str, watermark: Optional[str]):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, STATE_FILE)
+    with open(f'{path}.tmp', 'w') as f:
+        json.dump({'watermark': watermark}, f)
+    os.replace(f'{path}.tmp', path)
+
+
+# ── Load ──────────────────────────────────────────────────────────────────────
+
+def load_snapshot(
+        directory: str,
+        years: Optional[Iterable[int]] = None,
+        accounts: Optional[Iterable[str]] = None,
+) -> pd.DataFrame:
+    """
+    Read the snapshot, optionally only some years and accounts — only the
+    matching partitions are opened.
+
+    Returns:
+        DataFrame with the columns and compact dtypes of
+        Database.query_transactions(), in partition order.
+    """
+    dataset = _dataset(directory)
+
+    conditions = []
+    if years is not None:
+        conditions.append(ds.field('year').isin(list(years)))
+    if accounts is not None:
+        conditions.append(ds.field('account').isin(list(accounts)))
+    table = dataset.to_table(filter=reduce(lambda a, b: a & b, conditions) if conditions else None)
+
+    df = table.to_pandas().rename(columns={'account': 'Account'})
+    df['Date'] = df['Date'].astype('datetime64[s]')  # Parquet stores seconds as milliseconds
+    return compact(df[list(Database.QUERY_COLUMNS.values())])
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, force=True)
+    args = sys.argv[1:]
+    snapshot_dir = next((arg for arg in args if not arg.startswith('--')), './data/snapshot')
+
+    with Database.connect() as db:
+        result = export_snapshot(db, snapshot_dir, full='--full' in args)
+    logging.info(f"Snapshot export complete — {result['rows']} rows, {result['partitions']} partitions.")
@@ -0,0 +1,292 @@
+"""
+tests/fake_sheets.py — A local stand-in for the Google Sheets v4 API.
+
+Serves the handful of endpoints the export uses from an in-memory grid per
+worksheet, on a localhost port, so tests drive real gspread clients over
+real HTTP. Every request is recorded for asserting how many calls an
+export made.
+
+Like the real API, null values in a write leave their cell unchanged and
+reads leave out trailing empty cells and rows. Each tab has a grid size
+(1000 × 26 unless addSheet says otherwise): the values endpoints grow it,
+while an updateCells past it fails the whole batchUpdate with 400.
+fail() makes the next writes return an error status instead, e.g. 429
+for an exceeded quota.
+
+Usage:
+    with FakeSheetsServer({'Transactions': [['ID', 'Date']]}) as server:
+        worksheet = server.client().open_by_key(server.SPREADSHEET_ID).worksheet('Transactions')
+        ...
+        assert server.sheets['Transactions'][1] == ['abc123', '2026-01-15T00:00:00']
+"""
+
+import copy
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+import gspread
+import requests
+from gspread.http_client import HTTPClient
+
+GOOGLE_SHEETS_URL = 'https://sheets.googleapis.com'
+
+CELL_PATTERN = re.compile(r'^([A-Z]*)(\d*)$')
+
+DEFAULT_GRID = (1000, 26)  # (rows, columns) of a new tab
+
+
+class FakeSheetsServer:
+    """In-memory spreadsheet served over HTTP on localhost."""
+
+    SPREADSHEET_ID = 'fake-spreadsheet'
+
+    def __init__(self, sheets: dict = None):
+        self.sheets = {title: [list(row) for row in rows] for title, rows in (sheets or {}).items()}
+        self.sheet_ids = {title: index for index, title in enumerate(self.sheets)}
+        self.grids = {title: list(DEFAULT_GRID) for title in self.sheets}  # title → [rows, columns]
+        self.requests = []  # (method, path) per request received
+        self._failures = []  # Statuses for the next writes to return; None lets one through
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), _handler_for(self))
+        self.url = f'http://127.0.0.1:{self._server.server_port}'
+
+    def __enter__(self) -> 'FakeSheetsServer':
+        threading.Thread(target=self._server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def client(self) -> gspread.Client:
+        """A gspread client whose Sheets API calls go to this server."""
+        base_url = self.url
+
+        class LocalHTTPClient(HTTPClient):
+            def request(self, method, endpoint, *args, **kwargs):
+                return super().request(method, endpoint.replace(GOOGLE_SHEETS_URL, base_url), *args, **kwargs)
+
+        return gspread.Client(None, session=requests.Session(), http_client=LocalHTTPClient)
+
+    def fail(self, status: int, times: int = 1, after: int = 0):
+        """Let `after` writes through, then fail the next `times` with `status` without changing anything."""
+        self._failures.extend([None] * after + [status] * times)
+
+    def writes(self) -> list:
+        """The (method, path) of every request that was not a read."""
+        return [request for request in self.requests if request[0] != 'GET']
+
+    # ── Endpoints ─────────────────────────────────────────────────────────────
+
+    def metadata(self) -> dict:
+        return {
+            'spreadsheetId': self.SPREADSHEET_ID,
+            'properties': {'title': 'Fake Budget'},
+            'sheets': [
+                {'properties': {
+                    'sheetId': self.sheet_ids[title],
+                    'title': title,
+                    'index': index,
+                    'gridProperties': {'rowCount': self.grids[title][0], 'columnCount': self.grids[title][1]},
+                }}
+                for index, title in enumerate(self.sheets)
+            ],
+        }
+
+    def get_values(self, range_name: str) -> dict:
+        title, (first_row, first_col, last_row, last_col) = self._resolve(range_name)
+        grid = self.sheets[title]
+        values = [row[first_col:last_col] for row in grid[first_row:last_row]]
+
+        values = [_trim(row) for row in values]
+        while values and not values[-1]:
+            values.pop()
+        response = {'range': range_name, 'majorDimension': 'ROWS'}
+        if values:
+            response['values'] = values
+        return response
+
+    def update_values(self, range_name: str, body: dict) -> dict:
+        self.batch_update_values({'data': [{'range': range_name, 'values': body['values']}]})
+        return {'spreadsheetId': self.SPREADSHEET_ID, 'updatedRange': range_name, 'updatedRows': len(body['values'])}
+
+    def batch_update_values(self, body: dict) -> dict:
+        for item in body['data']:
+            title, (first_row, first_col, _, _) = self._resolve(item['range'])
+            for offset, row in enumerate(item['values']):
+                for column, value in enumerate(row):
+                    if value is not None:
+                        self._grow(title, first_row + offset + 1, first_col + column + 1)
+                        self._set(title, first_row + offset, first_col + column, value)
+        return {'spreadsheetId': self.SPREADSHEET_ID, 'totalUpdatedRows': sum(len(item['values']) for item in body['data'])}
+
+    def batch_clear_values(self, body: dict) -> dict:
+        for range_name in body['ranges']:
+            title, (first_row, first_col, last_row, last_col) = self._resolve(range_name)
+            grid = self.sheets[title]
+            for row in grid[first_row:last_row]:
+                for column in range(first_col, min(last_col, len(row))):
+                    row[column] = ''
+        return {'spreadsheetId': self.SPREADSHEET_ID, 'clearedRanges': body['ranges']}
+
+    def batch_update(self, body: dict) -> dict:
+        """
+        Spreadsheet batchUpdate — the addSheet, appendDimension and
+        updateCells requests only. All-or-nothing, like the real API.
+        """
+        saved = copy.deepcopy((self.sheets, self.sheet_ids, self.grids))
+        try:
+            self._apply_batch_update(body['requests'])
+        except GridLimitError:
+            self.sheets, self.sheet_ids, self.grids = saved
+            raise
+        return {'spreadsheetId': self.SPREADSHEET_ID, 'replies': [{} for _ in body['requests']]}
+
+    def _apply_batch_update(self, requests: list):
+        titles = {sheet_id: title for title, sheet_id in self.sheet_ids.items()}
+        for request in requests:
+            if 'addSheet' in request:
+                properties = request['addSheet']['properties']
+                grid = properties.get('gridProperties', {})
+                self.sheets[properties['title']] = []
+                self.sheet_ids[properties['title']] = properties['sheetId']
+                self.grids[properties['title']] = [
+                    grid.get('rowCount', DEFAULT_GRID[0]), grid.get('columnCount', DEFAULT_GRID[1]),
+                ]
+                titles[properties['sheetId']] = properties['title']
+            elif 'appendDimension' in request:
+                append = request['appendDimension']
+                self.grids[titles[append['sheetId']]][0 if append['dimension'] == 'ROWS' else 1] += append['length']
+            elif 'range' in request.get('updateCells', {}):
+                grid_range = request['updateCells']['range']
+                grid = self.sheets[titles[grid_range['sheetId']]]
+                first_col, last_col = grid_range.get('startColumnIndex', 0), grid_range.get('endColumnIndex', 10 ** 9)
+                for row in grid[grid_range.get('startRowIndex', 0):grid_range.get('endRowIndex')]:
+                    for column in range(first_col, min(last_col, len(row))):
+                        row[column] = ''
+            elif 'updateCells' in request:
+                start = request['updateCells']['start']
+                title = titles[start['sheetId']]
+                rows = request['updateCells']['rows']
+                last_row = start['rowIndex'] + len(rows)
+                last_col = start['columnIndex'] + max((len(row['values']) for row in rows), default=0)
+                if last_row > self.grids[title][0] or last_col > self.grids[title][1]:
+                    raise GridLimitError(
+                        f"Range ('{title}'!R{last_row}C{last_col}) exceeds grid limits. "
+                        f"Max rows: {self.grids[title][0]}, max columns: {self.grids[title][1]}"
+                    )
+                for offset, row in enumerate(rows):
+                    for column, cell in enumerate(row['values']):
+                        value = next(iter(cell.get('userEnteredValue', {'stringValue': ''}).values()))
+                        self._set(title, start['rowIndex'] + offset, start['columnIndex'] + column, value)
+            else:
+                raise ValueError(f'Unsupported request: {request}')
+
+    # ── Helpers ───────────────────────────────────────────────────────────────
+
+    def _resolve(self, range_name: str) -> tuple:
+        """A range like 'Sheet'!A2:F10 → (title, 0-based half-open (first_row, first_col, last_row, last_col))."""
+        title, _, cells = range_name.rpartition('!')
+        title = title.strip("'").replace("''", "'") or next(iter(self.sheets))
+        start, _, end = cells.partition(':')
+        start_col, start_row = CELL_PATTERN.match(start).groups()
+        end_col, end_row = CELL_PATTERN.match(end or start).groups()
+        return title, (
+            int(start_row or 1) - 1,
+            _column_index(start_col or 'A'),
+            int(end_row) if end_row else 10 ** 9,
+            _column_index(end_col) + 1 if end_col else 10 ** 9,
+        )
+
+    def _grow(self, title: str, rows: int, columns: int):
+        grid = self.grids[title]
+        grid[0], grid[1] = max(grid[0], rows), max(grid[1], columns)
+
+    def _set(self, title: str, row: int, column: int, value):
+        grid = self.sheets[title]
+        while len(grid) <= row:
+            grid.append([])
+        while len(grid[row]) <= column:
+            grid[row].append('')
+        grid[row][column] = value
+
+
+class GridLimitError(Exception):
+    """A write past a tab's grid, which the API rejects with 400."""
+
+
+def _column_index(letters: str) -> int:
+    index = 0
+    for letter in letters:
+        index = index * 26 + ord(letter) - ord('A') + 1
+    return index - 1
+
+
+def _trim(row: list) -> list:
+    row = list(row)
+    while row and row[-1] == '':
+        row.pop()
+    return row
+
+
+def _handler_for(server: FakeSheetsServer):
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def log_message(self, *args):
+            pass  # Keep test output quiet
+
+        def do_GET(self):
+            self._dispatch('GET')
+
+        def do_POST(self):
+            self._dispatch('POST')
+
+        def do_PUT(self):
+            self._dispatch('PUT')
+
+        def _dispatch(self, method: str):
+            path = unquote(urlsplit(self.path).path)
+            length = int(self.headers.get('Content-Length') or 0)
+            body = json.loads(self.rfile.read(length)) if length else {}
+
+            with server._lock:
+                server.requests.append((method, path))
+                status = server._failures.pop(0) if method != 'GET' and server._failures else None
+                if status is not None:
+                    self._reply(status, {'error': {'code': status, 'message': 'Injected failure', 'status': 'UNAVAILABLE'}})
+                    return
+                prefix = f'/v4/spreadsheets/{server.SPREADSHEET_ID}'
+                if method == 'GET' and path == prefix:
+                    response = server.metadata()
+                elif method == 'GET' and path.startswith(f'{prefix}/values/'):
+                    response = server.get_values(path[len(f'{prefix}/values/'):])
+                elif method == 'PUT' and path.startswith(f'{prefix}/values/'):
+                    response = server.update_values(path[len(f'{prefix}/values/'):], body)
+                elif method == 'POST' and path == f'{prefix}:batchUpdate':
+                    try:
+                        response = server.batch_update(body)
+                    except GridLimitError as e:
+                        self._reply(400, {'error': {'code': 400, 'message': str(e), 'status': 'INVALID_ARGUMENT'}})
+                        return
+                elif method == 'POST' and path == f'{prefix}/values:batchUpdate':
+                    response = server.batch_update_values(body)
+                elif method == 'POST' and path == f'{prefix}/values:batchClear':
+                    response = server.batch_clear_values(body)
+                else:
+                    self._reply(404, {'error': {'code': 404, 'message': f'Not found: {path}', 'status': 'NOT_FOUND'}})
+                    return
+            self._reply(200, response)
+
+        def _reply(self, status: int, payload: dict):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Handler
@@ -37,7 +37,7 @@ class TestSoFiSavingsHandler:
         assert subject['Account'].iloc[0] == 'SoFi Savings'
 
     def test_amount(self, subject):
-        assert subject['Amount'].iloc[0] == pytest.approx(-180.00)
+        assert subject['Amount'].iloc[0] == -18000
 
     def test_date(self, subject):
         assert subject['Date'].iloc[0] == pd.Timestamp('2026-01-15')
@@ -63,7 +63,7 @@ class TestSoFiCheckingHandler:
         assert subject['Account'].iloc[0] == 'SoFi Checking'
 
     def test_amount(self, subject):
-        assert subject['Amount'].iloc[0] == pytest.approx(2500.00)
+        assert subject['Amount'].iloc[0] == 250000
 
     def test_date(self, subject):
         assert subject['Date'].iloc[0] == pd.Timestamp('2026-02-01')
@@ -101,10 +101,10 @@ class TestCapitalOneCheckingHandler:
         assert debit['Account'].iloc[0] == 'CO Checking'
 
     def test_debit_amount_is_negative(self, debit):
-        assert debit['Amount'].iloc[0] == pytest.approx(-45.50)
+        assert debit['Amount'].iloc[0] == -4550
 
     def test_credit_amount_is_positive(self, credit):
-        assert credit['Amount'].iloc[0] == pytest.approx(1152.91)
+        assert credit['Amount'].iloc[0] == 115291
 
     def test_date(self, debit):
         assert debit['Date'].iloc[0] == pd.Timestamp('2026-01-15')
@@ -142,10 +142,10 @@ class TestCapitalOneSavingsHandler:
         assert debit['Account'].iloc[0] == 'CO Savings'
 
     def test_debit_amount_is_negative(self, debit):
-        assert debit['Amount'].iloc[0] == pytest.approx(-500.00)
+        assert debit['Amount'].iloc[0] == -50000
 
     def test_credit_amount_is_positive(self, credit):
-        assert credit['Amount'].iloc[0] == pytest.approx(500.00)
+        assert credit['Amount'].iloc[0] == 50000
 
     def test_date(self, debit):
         assert debit['Date'].iloc[0] == pd.Timestamp('2026-01-15')
@@ -180,10 +180,10 @@ class TestCapitalOneQuicksilverHandler:
         assert purchase['Account'].iloc[0] == 'Quicksilver'
 
     def test_purchase_amount_is_negative(self, purchase):
-        assert purchase['Amount'].iloc[0] == pytest.approx(-45.50)
+        assert purchase['Amount'].iloc[0] == -4550
 
     def test_payment_amount_is_positive(self, payment):
-        assert payment['Amount'].iloc[0] == pytest.approx(1152.91)
+        assert payment['Amount'].iloc[0] == 115291
 
     def test_empty_credit_debit_cells_do_not_produce_nan(self, purchase):
         assert not purchase['Amount'].isna().any()
@@ -191,6 +191,18 @@ class TestCapitalOneQuicksilverHandler:
     def test_date(self, purchase):
         assert purchase['Date'].iloc[0] == pd.Timestamp('2026-01-15')
 
+    def test_whole_number_amounts_keep_their_ids(self, tmp_path):
+        # IDs hash the cells as pandas renders them: '5', not '5.0'
+        path = tmp_path / 'Quicksilver.csv'
+        path.write_text(
+            "Transaction Date,Description,Credit,Debit\n"
+            "2026-01-15,TRADER JOES,0,5\n"
+            "2026-01-16,MOBILE PAYMENT,12,0\n"
+        )
+        for df in (CapitalOneQuicksilverHandler().process(str(path)),
+                   pd.concat(CapitalOneQuicksilverHandler().process_chunks(str(path), chunksize=1))):
+            assert df['ID'].tolist() == ['f85ca9b1e4546553fe0ba20f6e84f543', '56cd5b01be8620c8b4882c85787e8e53']
+
 
 # ── Amex ──────────────────────────────────────────────────────────────────────
 
@@ -209,7 +221,7 @@ class TestAmexHandler:
         assert subject['Account'].iloc[0] == 'Delta'
 
     def test_amount_is_negated(self, subject):
-        assert subject['Amount'].iloc[0] == pytest.approx(-2.45)
+        assert subject['Amount'].iloc[0] == -245
 
     def test_date(self, subject):
         assert subject['Date'].iloc[0] == pd.Timestamp('2026-02-04')
@@ -235,7 +247,7 @@ class TestChaseHandler:
         assert subject['Account'].iloc[0] == 'Chase'
 
     def test_amount(self, subject):
-        assert subject['Amount'].iloc[0] == pytest.approx(-67.89)
+        assert subject['Amount'].iloc[0] == -6789
 
     def test_date(self, subject):
         assert subject['Date'].iloc[0] == pd.Timestamp('2026-02-15')
@@ -243,6 +255,16 @@ class TestChaseHandler:
     def test_concept(self, subject):
         assert subject['Concept'].iloc[0] == 'WHOLEFDS'
 
+    def test_chunked_ids_match_whole_file(self, tmp_path):
+        path = tmp_path / 'Chase1234_Activity.csv'
+        path.write_text(
+            "Transaction Date,Post Date,Description,Category,Type,Amount,Memo\n"
+            "02/15/2026,02/16/2026,WHOLEFDS,Groceries,Sale,-12.34,\n"
+            "02/17/2026,02/18/2026,PAYROLL,,Payment,100,\n"
+        )
+        batches = pd.concat(ChaseHandler().process_chunks(str(path), chunksize=1))
+        assert batches['ID'].tolist() == ChaseHandler().process(str(path))['ID'].tolist()
+
 
 # ── Discover ──────────────────────────────────────────────────────────────────
 
@@ -261,7 +283,7 @@ class TestDiscoverHandler:
         assert subject['Account'].iloc[0] == 'Discover'
 
     def test_amount_is_negated(self, subject):
-        assert subject['Amount'].iloc[0] == pytest.approx(-29.99)
+        assert subject['Amount'].iloc[0] == -2999
 
     def test_date(self, subject):
         assert subject['Date'].iloc[0] == pd.Timestamp('2026-02-04')
@@ -292,7 +314,7 @@ class TestWellsFargoCheckingHandler:
         assert subject['Account'].iloc[0] == 'WF Checking'
 
     def test_amount(self, subject):
-        assert subject['Amount'].iloc[0] == pytest.approx(-45.50)
+        assert subject['Amount'].iloc[0] == -4550
 
     def test_date(self, subject):
         assert subject['Date'].iloc[0] == pd.Timestamp('2026-02-15')
@@ -300,6 +322,25 @@ class TestWellsFargoCheckingHandler:
     def test_concept(self, subject):
         assert subject['Concept'].iloc[0] == 'GROCERY STORE'
 
+    def test_check_numbers_keep_their_ids(self, tmp_path):
+        # IDs hash the cells as pandas renders them: '1001', not '1001.0'
+        path = tmp_path / 'Checking1.csv'
+        path.write_text(
+            "02/15/2026,-45.50,*,1001,GROCERY STORE\n"
+            "02/16/2026,500.00,*,1002,TRANSFER IN\n"
+        )
+        for df in (WellsFargoCheckingHandler().process(str(path)),
+                   pd.concat(WellsFargoCheckingHandler().process_chunks(str(path), chunksize=1))):
+            assert df['ID'].tolist() == ['aa57255175f44e0c35032cdce1598638', '19976aeba6703dd746138858b2205a43']
+
+    def test_reads_blank_check_numbers(self, tmp_path):
+        path = tmp_path / 'Checking1.csv'
+        path.write_text(
+            "02/15/2026,-45.50,*,1001,GROCERY STORE\n"
+            "02/16/2026,500.00,*,,TRANSFER IN\n"
+        )
+        assert WellsFargoCheckingHandler().process(str(path))['Amount'].tolist() == [-4550, 50000]
+
 
 # ── Wells Fargo Savings ───────────────────────────────────────────────────────
 
@@ -323,7 +364,7 @@ class TestWellsFargoSavingsHandler:
         assert subject['Account'].iloc[0] == 'WF Savings'
 
     def test_amount(self, subject):
-        assert subject['Amount'].iloc[0] == pytest.approx(500.00)
+        assert subject['Amount'].iloc[0] == 50000
 
     def test_date(self, subject):
         assert subject['Date'].iloc[0] == pd.Timestamp('2026-02-15')
@@ -0,0 +1,400 @@
+"""
+tests/unit/test_db.py — Unit tests for the database layer, run on the
+embedded SQLite backend.
+"""
+
+import sqlite3
+from datetime import date, datetime
+from unittest import mock
+
+import pandas as pd
+import pytest
+
+import db as db_module
+from db import Database, DBConfig, SQLiteDatabase
+from handlers.schema import DOLLARS, concat, to_cents
+from known_ids import KnownIdFilter, id_digest
+
+
+# ── Fixtures ──────────────────────────────────────────────────────────────────
+
+@pytest.fixture
+def config(tmp_path):
+    return DBConfig(backend='sqlite', sqlite_path=str(tmp_path / 'budget.sqlite3'))
+
+
+@pytest.fixture
+def db():
+    with SQLiteDatabase.connect(DBConfig(sqlite_path=':memory:')) as db:
+        yield db
+
+
+@pytest.fixture
+def sample_df():
+    return pd.DataFrame({
+        'ID': ['abc123', 'def456', 'ghi789', 'jkl012'],
+        'Date': pd.to_datetime(['2025-12-31', '2026-01-15', '2026-02-01', '2026-02-20']),
+        'Concept': ['GROCERY', 'TRADER JOES', 'SALARY', 'RENT'],
+        'Account': ['Chase', 'Chase', 'SoFi Savings', 'Chase'],
+        'Amount': to_cents([-12.00, -45.50, 3000.00, -1500.00]),
+        'Label': [None, 'Groceries', None, None],
+    })
+
+
+# ── Connection ────────────────────────────────────────────────────────────────
+
+class TestConnect:
+
+    def test_config_selects_sqlite(self, config):
+        with Database.connect(config) as db:
+            assert isinstance(db, SQLiteDatabase)
+
+    def test_unknown_backend_raises(self):
+        with pytest.raises(ValueError, match='Unknown database backend'):
+            with Database.connect(DBConfig(backend='postgres')):
+                pass
+
+    def test_leaves_other_sqlite_connections_alone(self, config, sample_df):
+        with Database.connect(config) as db:
+            db.upsert_transactions(sample_df)
+            assert db.query_transactions()['Date'].min() == pd.Timestamp('2025-12-31')
+        # Only sqlite3's own defaults (before Python 3.12) are registered
+        registered = [*sqlite3.adapters.values(), *sqlite3.converters.values()]
+        assert all(getattr(function, '__module__', None) == 'sqlite3.dbapi2' for function in registered)
+
+    def test_upgrades_files_from_before_updated_at(self, config):
+        conn = sqlite3.connect(config.sqlite_path)
+        conn.executescript("""
+            CREATE TABLE transactions (
+                id TEXT NOT NULL PRIMARY KEY, id_scheme INTEGER NOT NULL DEFAULT 1, date DATE NOT NULL,
+                concept TEXT NOT NULL, account TEXT NOT NULL COLLATE NOCASE, amount REAL NOT NULL,
+                label TEXT DEFAULT NULL COLLATE NOCASE, category TEXT DEFAULT NULL COLLATE NOCASE,
+                additional_labels TEXT DEFAULT NULL, imported_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+            );
+            CREATE INDEX idx_transactions_date ON transactions (date);
+            INSERT INTO transactions (id, date, concept, account, amount, label, imported_at)
+            VALUES ('abc123', '2026-01-15', 'TRADER JOES', 'Chase', -45.5, 'Groceries', '2026-01-16 09:00:00');
+        """)
+        conn.close()
+
+        with Database.connect(config) as db:
+            changes = pd.concat(db.query_changes())
+            assert changes['Updated At'].tolist() == [pd.Timestamp('2026-01-16 09:00:00')]
+            assert db.query_transactions()['Label'].tolist() == ['Groceries']
+            db._conn.execute("UPDATE transactions SET label = 'Food'")
+            assert len(pd.concat(db.query_changes(since=datetime(2026, 2, 1)))) == 1  # Trigger works
+
+        conn = sqlite3.connect(config.sqlite_path)
+        assert conn.execute('PRAGMA user_version').fetchone()[0] == 1
+        conn.close()
+
+    def test_new_files_start_current(self, config):
+        with Database.connect(config):
+            pass
+        conn = sqlite3.connect(config.sqlite_path)
+        assert conn.execute('PRAGMA user_version').fetchone()[0] == 1
+        conn.close()
+
+    def test_uses_wal_mode(self, config):
+        with Database.connect(config):
+            pass
+        conn = sqlite3.connect(config.sqlite_path)
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        conn.close()
+
+    def test_creates_indexes(self, config):
+        with Database.connect(config):
+            pass
+        conn = sqlite3.connect(config.sqlite_path)
+        indexes = {row[1] for row in conn.execute('PRAGMA index_list(transactions)')}
+        conn.close()
+        assert {
+            'idx_transactions_date',
+            'idx_transactions_category',
+            'idx_transactions_label',
+            'idx_transactions_account_date',
+            'idx_transactions_imported_at',
+        } <= indexes
+
+    def test_commits_on_clean_exit(self, config, sample_df):
+        with Database.connect(config) as db:
+            db.upsert_transactions(sample_df)
+        with Database.connect(config) as db:
+            assert len(db.query_transactions()) == 4
+
+    def test_rolls_back_on_error(self, config, sample_df):
+        with pytest.raises(RuntimeError):
+            with Database.connect(config) as db:
+                db.upsert_transactions(sample_df)
+                raise RuntimeError('boom')
+        with Database.connect(config) as db:
+            assert db.query_transactions().empty
+
+
+# ── Upsert ────────────────────────────────────────────────────────────────────
+
+class TestUpsert:
+
+    def test_inserts_new_transactions(self, db, sample_df):
+        assert db.upsert_transactions(sample_df) == {'inserted': 4, 'skipped': 0, 'total': 4}
+
+    def test_counts_ignored_duplicates(self, db, sample_df):
+        db.upsert_transactions(sample_df.iloc[:2])
+        assert db.upsert_transactions(sample_df) == {'inserted': 2, 'skipped': 2, 'total': 4}
+
+    def test_preserves_existing_labels(self, db, sample_df):
+        db.upsert_transactions(sample_df)
+        db.upsert_transactions(sample_df.assign(Label='Changed'))
+        result = db.query_transactions().set_index('ID')
+        assert result.loc['def456', 'Label'] == 'Groceries'
+
+    def stored_amount(self, db, transaction_id) -> float:
+        return db._conn.execute("SELECT amount FROM transactions WHERE id = ?", (transaction_id,)).fetchone()[0]
+
+    def test_cents_are_stored_as_dollars(self, db, sample_df):
+        db.upsert_transactions(sample_df)
+        assert self.stored_amount(db, 'def456') == -45.50
+
+    def test_integer_dollars_are_stored_as_dollars(self, db, sample_df):
+        db.upsert_transactions(sample_df.assign(Amount=[-12, -45, 3000, -1500]), amount_unit=DOLLARS)
+        assert self.stored_amount(db, 'ghi789') == 3000
+
+    def test_dollars_passed_as_cents_raise(self, db, sample_df):
+        with pytest.raises(ValueError, match='whole numbers'):
+            db.upsert_transactions(sample_df.assign(Amount=[-12.00, -45.50, 3000.00, -1500.00]))
+
+    def test_inserts_batches_one_at_a_time(self, db, sample_df):
+        result = db.upsert_transactions(iter([sample_df.iloc[:1], sample_df.iloc[1:]]))
+        assert result == {'inserted': 4, 'skipped': 0, 'total': 4}
+
+    def test_missing_required_column_raises(self, db, sample_df):
+        with pytest.raises(ValueError, match='missing required columns'):
+            db.upsert_transactions(sample_df.drop(columns=['Amount']))
+
+
+# ── Known-ID filter ───────────────────────────────────────────────────────────
+
+class TestKnownIds:
+
+    @pytest.fixture
+    def known_ids(self, tmp_path):
+        return KnownIdFilter(str(tmp_path / '.known_ids.npz'))
+
+    def test_known_rows_are_skipped(self, db, sample_df, known_ids):
+        db.upsert_transactions(sample_df.iloc[:2], known_ids=known_ids)
+        with mock.patch.object(db, '_prepare_records', wraps=db._prepare_records) as prepare:
+            assert db.upsert_transactions(sample_df, known_ids=known_ids)['inserted'] == 2
+        assert len(prepare.call_args.args[0]) == 2  # Only the unknown rows were sent
+
+    def test_failed_insert_adds_nothing(self, db, sample_df, known_ids):
+        with mock.patch.object(db, '_cursor', side_effect=sqlite3.OperationalError('disk I/O error')):
+            with pytest.raises(sqlite3.OperationalError):
+                db.upsert_transactions(sample_df, known_ids=known_ids)
+        assert len(known_ids) == 0
+
+    def test_deleted_row_is_imported_again(self, db, sample_df, known_ids):
+        db.upsert_transactions(sample_df, known_ids=known_ids)
+        known_ids.sync(db.iter_imported_ids, db.id_digests())
+        db._conn.execute("DELETE FROM transactions WHERE id = 'abc123'")
+
+        known_ids.sync(db.iter_imported_ids, db.id_digests())
+        assert db.upsert_transactions(sample_df, known_ids=known_ids)['inserted'] == 1
+
+    def test_id_digests_match_the_filter(self, db, sample_df):
+        db.upsert_transactions(sample_df)
+        expected = {
+            account: (len(group), id_digest(group['ID']))
+            for account, group in sample_df.groupby('Account')
+        }
+        assert db.id_digests() == expected
+
+
+# ── Query ─────────────────────────────────────────────────────────────────────
+
+class TestQuery:
+
+    @pytest.fixture(autouse=True)
+    def populated(self, db, sample_df):
+        db.upsert_transactions(sample_df)
+
+    def test_returns_spreadsheet_columns(self, db):
+        result = db.query_transactions()
+        assert list(result.columns) == list(Database.QUERY_COLUMNS.values())
+        assert pd.api.types.is_datetime64_any_dtype(result['Date'])
+        assert result['Amount'].dtype == 'int64'
+        assert isinstance(result['Account'].dtype, pd.CategoricalDtype)
+
+    def test_round_trips_values(self, db):
+        row = db.query_transactions().set_index('ID').loc['def456']
+        assert row['Date'] == pd.Timestamp('2026-01-15')
+        assert row['Concept'] == 'TRADER JOES'
+        assert row['Amount'] == -4550  # Cents
+
+    def test_filters_by_year(self, db):
+        assert sorted(db.query_transactions(year=2026)['ID']) == ['def456', 'ghi789', 'jkl012']
+
+    def test_filters_by_year_and_month(self, db):
+        assert sorted(db.query_transactions(year=2026, month=2)['ID']) == ['ghi789', 'jkl012']
+
+    def test_filters_by_month_across_years(self, db):
+        assert sorted(db.query_transactions(month=12)['ID']) == ['abc123']
+
+    def test_filters_by_half_open_range(self, db):
+        result = db.query_transactions(start_date=date(2026, 1, 15), end_date=date(2026, 2, 20))
+        assert sorted(result['ID']) == ['def456', 'ghi789']
+
+    def test_account_match_ignores_case(self, db):
+        assert len(db.query_transactions(account='chase')) == 3
+
+    def test_filters_by_several_accounts(self, db):
+        result = db.query_transactions(year=2026, accounts=['Chase', 'SoFi Savings'])
+        assert len(result) == 3
+
+    def test_orders_by_date(self, db):
+        assert db.query_transactions()['Date'].is_monotonic_increasing
+
+    def test_no_match_returns_empty_frame(self, db):
+        assert db.query_transactions(year=2030).empty
+
+    def test_chunks_match_full_query(self, db):
+        chunks = list(db.query_transaction_chunks(chunksize=2))
+        assert [len(chunk) for chunk in chunks] == [2, 2]
+        pd.testing.assert_frame_equal(
+            concat(chunks).reset_index(drop=True),
+            db.query_transactions(),
+        )
+
+    def test_imported_ids_since_watermark(self, db):
+        rows = list(db.iter_imported_ids())
+        assert {transaction_id for _, transaction_id, _ in rows} == {'abc123', 'def456', 'ghi789', 'jkl012'}
+        assert all(isinstance(imported_at, datetime) for _, _, imported_at in rows)
+        assert list(db.iter_imported_ids(since=datetime(2999, 1, 1))) == []
+
+    def test_changes_carry_update_times(self, db):
+        changes = pd.concat(db.query_changes(since=datetime(2000, 1, 1)))
+        assert len(changes) == 4
+        assert pd.api.types.is_datetime64_dtype(changes['Updated At'])
+
+
+# ── Query cache ───────────────────────────────────────────────────────────────
+
+class TestQueryCache:
+
+    @pytest.fixture
+    def cached_config(self, config, tmp_path):
+        config.query_cache = str(tmp_path / 'query_cache')
+        return config
+
+    def test_repeated_query_is_served_from_cache(self, cached_config, sample_df):
+        with Database.connect(cached_config) as db:
+            db.upsert_transactions(sample_df)
+        with Database.connect(cached_config) as db:
+            first = db.query_transactions(year=2026)
+        with Database.connect(cached_config) as db:
+            with mock.patch.object(db, '_build_query', side_effect=AssertionError('queried')):
+                pd.testing.assert_frame_equal(db.query_transactions(year=2026), first)
+
+    def test_import_invalidates_cached_results(self, cached_config, sample_df):
+        with Database.connect(cached_config) as db:
+            db.upsert_transactions(sample_df.iloc[:2])
+        with Database.connect(cached_config) as db:
+            assert len(db.query_transactions()) == 2
+        with Database.connect(cached_config) as db:
+            db.upsert_transactions(sample_df)
+            assert len(db.query_transactions()) == 4  # Uncommitted rows are seen
+        with Database.connect(cached_config) as db:
+            assert len(db.query_transactions()) == 4
+
+    def test_label_edit_invalidates_cached_results(self, cached_config, sample_df):
+        with Database.connect(cached_config) as db:
+            db.upsert_transactions(sample_df)
+            db._conn.execute("UPDATE transactions SET updated_at = '2000-01-01 00:00:00'")
+        with Database.connect(cached_config) as db:
+            assert pd.isna(db.query_transactions().set_index('ID').loc['ghi789', 'Label'])
+        with Database.connect(cached_config) as db:
+            db._conn.execute("UPDATE transactions SET label = 'Income' WHERE id = 'ghi789'")
+        with Database.connect(cached_config) as db:
+            assert db.query_transactions().set_index('ID').loc['ghi789', 'Label'] == 'Income'
+
+    def test_id_migration_clears_cache(self, cached_config, sample_df):
+        with Database.connect(cached_config) as db:
+            db.upsert_transactions(sample_df)
+        with Database.connect(cached_config) as db:
+            db.query_transactions()
+        with Database.connect(cached_config) as db:
+            db.migrate_id_scheme(pd.DataFrame({'v1': ['abc123'], 'v2': ['v2-abc']}))
+        with Database.connect(cached_config) as db:
+            assert 'v2-abc' in set(db.query_transactions()['ID'])
+
+
+# ── ID scheme migration ───────────────────────────────────────────────────────
+
+class TestMigrateIdScheme:
+
+    def test_rewrites_v1_ids(self, db, sample_df):
+        db.upsert_transactions(sample_df)
+        mapping = pd.DataFrame({'v1': ['abc123', 'def456'], 'v2': ['v2-abc', 'ghi789']})
+
+        # def456 → ghi789 collides with an existing row and is left alone
+        assert db.migrate_id_scheme(mapping) == {'migrated': 1, 'total': 2}
+        assert sorted(db.query_transactions()['ID']) == ['def456', 'ghi789', 'jkl012', 'v2-abc']
+
+
+# ── Connection pool ───────────────────────────────────────────────────────────
+
+class TestGetPool:
+
+    @pytest.fixture(autouse=True)
+    def no_pools(self):
+        with mock.patch.object(db_module, '_pools', {}):
+            yield
+
+    def test_same_config_shares_a_pool(self):
+        assert db_module.get_pool(DBConfig(pool_size=2)) is db_module.get_pool(DBConfig(pool_size=2))
+
+    def test_pool_size_gets_its_own_pool(self):
+        small, large = db_module.get_pool(DBConfig(pool_size=2)), db_module.get_pool(DBConfig(pool_size=8))
+        assert small is not large
+        assert large._config.pool_size == 8
+
+
+# ── MySQL schema upgrades ─────────────────────────────────────────────────────
+
+class TestUpgradeSchema:
+
+    @pytest.fixture
+    def conn(self):
+        return mock.MagicMock()
+
+    @pytest.fixture(autouse=True)
+    def fresh_process(self):
+        with mock.patch.object(db_module, '_upgraded', set()):
+            yield
+
+    def statements(self, conn) -> list:
+        return [c.args[0] for c in conn.cursor.return_value.execute.call_args_list]
+
+    def test_adds_missing_columns(self, conn):
+        conn.cursor.return_value.fetchall.return_value = [('id',), ('date',)]
+        db_module.upgrade_schema(conn, DBConfig())
+        statements = self.statements(conn)
+        assert any('ADD COLUMN id_scheme' in sql for sql in statements)
+        assert any('ADD COLUMN updated_at' in sql for sql in statements)
+        assert 'UPDATE transactions SET updated_at = imported_at' in statements  # Backfilled
+
+    def test_leaves_current_table_alone(self, conn):
+        columns = [(column,) for column, _ in db_module.MYSQL_UPGRADES]
+        conn.cursor.return_value.fetchall.return_value = [('id',)] + columns
+        db_module.upgrade_schema(conn, DBConfig())
+        assert len(self.statements(conn)) == 1  # The column lookup only
+
+    def test_skips_missing_table(self, conn):
+        conn.cursor.return_value.fetchall.return_value = []
+        db_module.upgrade_schema(conn, DBConfig())
+        assert len(self.statements(conn)) == 1
+
+    def test_checks_once_per_database(self, conn):
+        conn.cursor.return_value.fetchall.return_value = [('id',)]
+        db_module.upgrade_schema(conn, DBConfig())
+        db_module.upgrade_schema(conn, DBConfig())
+        assert sum('information_schema' in sql for sql in self.statements(conn)) == 1
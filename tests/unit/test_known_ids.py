@@ -0,0 +1,200 @@
+"""
+tests/unit/test_known_ids.py — Unit tests for the client-side known-ID filter.
+"""
+
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from known_ids import WATERMARK_OVERLAP, KnownIdFilter, id_digest
+
+
+# ── Fixtures ──────────────────────────────────────────────────────────────────
+
+@pytest.fixture
+def filter_path(tmp_path):
+    return str(tmp_path / '.known_ids.npz')
+
+
+@pytest.fixture
+def known_ids(filter_path):
+    known_ids = KnownIdFilter(filter_path)
+    known_ids.add(['SoFi Savings', 'SoFi Savings', 'Chase'], ['abc123', 'def456', 'abc123'])
+    return known_ids
+
+
+# ── Membership ────────────────────────────────────────────────────────────────
+
+class TestContains:
+
+    def test_known_ids_are_found(self, known_ids):
+        mask = known_ids.contains(['SoFi Savings', 'Chase'], ['def456', 'abc123'])
+        assert mask.tolist() == [True, True]
+
+    def test_unknown_ids_are_not_found(self, known_ids):
+        mask = known_ids.contains(['SoFi Savings', 'SoFi Savings'], ['zzz999', '000000'])
+        assert mask.tolist() == [False, False]
+
+    def test_ids_are_scoped_to_their_account(self, known_ids):
+        mask = known_ids.contains(['Chase', 'Discover'], ['def456', 'abc123'])
+        assert mask.tolist() == [False, False]
+
+    def test_returns_boolean_array(self, known_ids):
+        mask = known_ids.contains(['Chase'], ['abc123'])
+        assert isinstance(mask, np.ndarray)
+        assert mask.dtype == bool
+
+    def test_empty_input(self, known_ids):
+        assert len(known_ids.contains([], [])) == 0
+
+    def test_add_merges_without_duplicates(self, known_ids):
+        known_ids.add(['SoFi Savings', 'SoFi Savings'], ['abc123', 'ghi789'])
+        assert len(known_ids) == 4
+        assert known_ids.contains(['SoFi Savings'], ['ghi789']).all()
+
+    def test_integer_account_keys(self, filter_path):
+        known_ids = KnownIdFilter(filter_path)
+        known_ids.add([1, 1], ['abc123', 'def456'])
+        assert known_ids.contains([1, 2], ['abc123', 'abc123']).tolist() == [True, False]
+
+
+# ── Refresh ───────────────────────────────────────────────────────────────────
+
+class TestRefresh:
+
+    def test_adds_rows_and_advances_watermark(self, filter_path):
+        known_ids = KnownIdFilter(filter_path)
+        known_ids.refresh([
+            ('Chase', 'abc123', datetime(2026, 3, 1, 9, 0)),
+            ('Chase', 'def456', datetime(2026, 3, 2, 9, 0)),
+        ])
+        assert len(known_ids) == 2
+        assert known_ids.watermark == datetime(2026, 3, 2, 9, 0)
+
+    def test_watermark_never_moves_back(self, filter_path):
+        known_ids = KnownIdFilter(filter_path, watermark=datetime(2026, 3, 5))
+        known_ids.refresh([('Chase', 'abc123', datetime(2026, 3, 1))])
+        assert known_ids.watermark == datetime(2026, 3, 5)
+
+    def test_empty_refresh_keeps_state(self, known_ids):
+        known_ids.refresh([])
+        assert len(known_ids) == 3
+        assert known_ids.watermark is None
+
+
+class TestSync:
+
+    ROWS = [
+        ('Chase', 'abc123', datetime(2026, 3, 1)),
+        ('Chase', 'def456', datetime(2026, 3, 2)),
+    ]
+
+    def iter_ids(self, rows, calls):
+        def iter_ids(since):
+            calls.append(since)
+            return [row for row in rows if since is None or row[2] >= since]
+        return iter_ids
+
+    def digests(self, rows):
+        ids = {}
+        for account, transaction_id, _ in rows:
+            ids.setdefault(account, []).append(transaction_id)
+        return {account: (len(ids), id_digest(ids)) for account, ids in ids.items()}
+
+    def test_fetches_only_rows_since_watermark(self, filter_path):
+        known_ids, calls = KnownIdFilter(filter_path), []
+        known_ids.sync(self.iter_ids(self.ROWS, calls), self.digests(self.ROWS))
+        known_ids.sync(self.iter_ids(self.ROWS, calls), self.digests(self.ROWS))
+        assert calls == [None, datetime(2026, 3, 2) - WATERMARK_OVERLAP]
+
+    def test_picks_up_rows_committed_after_the_watermark_was_taken(self, filter_path):
+        known_ids, calls = KnownIdFilter(filter_path), []
+        known_ids.sync(self.iter_ids(self.ROWS, calls), self.digests(self.ROWS))
+
+        late = self.ROWS + [('Chase', 'ace789', datetime(2026, 3, 2) - timedelta(minutes=1))]
+        known_ids.sync(self.iter_ids(late, calls), self.digests(late))
+        assert calls == [None, datetime(2026, 3, 2) - WATERMARK_OVERLAP]
+        assert known_ids.contains(['Chase'], ['ace789']).all()
+
+    def test_rebuilds_after_deletion(self, filter_path):
+        known_ids, calls = KnownIdFilter(filter_path), []
+        known_ids.sync(self.iter_ids(self.ROWS, calls), self.digests(self.ROWS))
+
+        known_ids.sync(self.iter_ids(self.ROWS[1:], calls), self.digests(self.ROWS[1:]))  # abc123 deleted
+        assert calls == [None, datetime(2026, 3, 2) - WATERMARK_OVERLAP, None]
+        assert known_ids.contains(['Chase', 'Chase'], ['abc123', 'def456']).tolist() == [False, True]
+
+    def test_rebuilds_when_a_deletion_and_a_missed_row_keep_the_count(self, filter_path):
+        known_ids, calls = KnownIdFilter(filter_path), []
+        known_ids.sync(self.iter_ids(self.ROWS, calls), self.digests(self.ROWS))
+
+        # abc123 deleted, fed789 committed long after it was stamped
+        rows = [self.ROWS[1], ('Chase', 'fed789', datetime(2026, 2, 1))]
+        known_ids.sync(self.iter_ids(rows, calls), self.digests(rows))
+        assert calls[-1] is None
+        assert known_ids.contains(['Chase'] * 3, ['abc123', 'def456', 'fed789']).tolist() == [False, True, True]
+
+
+class TestIdDigest:
+
+    def test_ignores_order_and_cancels_duplicates(self):
+        assert id_digest(['abc123', 'def456']) == id_digest(['def456', 'abc123']) == 0xabc123 ^ 0xdef456
+        assert id_digest([]) == id_digest(['abc123', 'abc123']) == 0
+
+    def test_reads_leading_hex_digits_like_mysql_conv(self):
+        assert id_digest(['0123456789ABCDEF0123']) == 0x0123456789abcde
+        assert id_digest(['1g2']) == 1
+        assert id_digest(['ghi789']) == 0
+
+
+# ── Persistence ───────────────────────────────────────────────────────────────
+
+class TestPersistence:
+
+    def test_round_trip(self, known_ids, filter_path):
+        known_ids.watermark = datetime(2026, 3, 2, 9, 30)
+        known_ids.save()
+
+        loaded = KnownIdFilter.load(filter_path)
+        assert len(loaded) == 3
+        assert loaded.watermark == datetime(2026, 3, 2, 9, 30)
+        assert loaded.contains(['SoFi Savings', 'Chase'], ['def456', 'abc123']).all()
+
+    def test_round_trip_of_empty_filter(self, filter_path):
+        KnownIdFilter(filter_path).save()
+        loaded = KnownIdFilter.load(filter_path)
+        assert len(loaded) == 0
+        assert loaded.watermark is None
+
+    def test_missing_file_starts_empty(self, filter_path):
+        assert len(KnownIdFilter.load(filter_path)) == 0
+
+    def test_unreadable_file_starts_empty(self, filter_path):
+        with open(filter_path, 'w') as f:
+            f.write('not a filter')
+        assert len(KnownIdFilter.load(filter_path)) == 0
+
+    def test_save_leaves_no_temporary_file(self, known_ids, tmp_path):
+        known_ids.save()
+        assert [p.name for p in tmp_path.iterdir()] == ['.known_ids.npz']
+
+    def test_concurrent_saves_do_not_collide(self, known_ids, filter_path, tmp_path):
+        errors = []
+
+        def save():
+            try:
+                known_ids.save()
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=save) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert len(KnownIdFilter.load(filter_path)) == 3
+        assert [p.name for p in tmp_path.iterdir()] == ['.known_ids.npz']
@@ -0,0 +1,96 @@
+"""
+tests/unit/test_main.py — Unit tests for the Google Sheets client in main.py.
+"""
+
+from unittest import mock
+
+import gspread
+import pandas as pd
+import pytest
+
+import main
+from tests.fake_sheets import FakeSheetsServer
+
+
+# ── Fixtures ──────────────────────────────────────────────────────────────────
+
+@pytest.fixture
+def auth():
+    """Patch credential loading and authorization; the client cache starts empty."""
+    main.get_gspread_client.cache_clear()
+    with mock.patch('google.oauth2.service_account.Credentials.from_service_account_file') as load, \
+            mock.patch('gspread.authorize') as authorize:
+        yield load, authorize
+    main.get_gspread_client.cache_clear()
+
+
+# ── Client ────────────────────────────────────────────────────────────────────
+
+class TestGetGspreadClient:
+
+    def test_authenticates_once_per_process(self, auth):
+        load, authorize = auth
+        assert main.get_gspread_client() is main.get_gspread_client()
+        load.assert_called_once_with('expenses_credentials.json', scopes=main.SCOPES)
+        authorize.assert_called_once()
+
+    def test_one_client_per_credentials_file(self, auth):
+        load, _ = auth
+        main.get_gspread_client('a.json')
+        main.get_gspread_client('b.json')
+        assert load.call_count == 2
+
+    def test_export_uses_given_credentials_file(self, auth):
+        load, authorize = auth
+        authorize.return_value.open.return_value.worksheet.side_effect = gspread.exceptions.WorksheetNotFound
+        main.export_to_gsheet(pd.DataFrame(), '2026 Budget', 'Transactions', credentials_file='other.json')
+        load.assert_called_once_with('other.json', scopes=main.SCOPES)
+
+
+# ── Export ────────────────────────────────────────────────────────────────────
+
+class TestExportToGsheet:
+
+    @pytest.fixture
+    def server(self):
+        with FakeSheetsServer({'Transactions': [['ID', 'Date', 'Concept', 'Account', 'Amount']]}) as server:
+            spreadsheet = server.client().open_by_key(FakeSheetsServer.SPREADSHEET_ID)
+            with mock.patch.object(main, 'get_gspread_client') as get_client:
+                get_client.return_value.open.return_value = spreadsheet
+                yield server
+
+    @pytest.fixture
+    def year_data(self):
+        return pd.DataFrame({
+            'ID': ['def456', 'abc123'],
+            'Date': pd.to_datetime(['2026-01-15', '2026-01-02']),
+            'Concept': ['TRADER JOES', 'GROCERY'],
+            'Account': ['Chase', 'Chase'],
+            'Amount': [-4550, -1200],  # Cents
+            'Label': ['Groceries', None],
+        })
+
+    def test_full_export_writes_sorted_rows(self, server, year_data):
+        main.export_to_gsheet(year_data.copy(), '2026 Budget', 'Transactions')
+        assert server.sheets['Transactions'][1:] == [
+            ['abc123', '2026-01-02T00:00:00', 'GROCERY', 'Chase', -12.0],
+            ['def456', '2026-01-15T00:00:00', 'TRADER JOES', 'Chase', -45.5],
+        ]
+
+    def test_incremental_export_writes_sorted_rows(self, server, year_data):
+        main.export_to_gsheet(year_data.copy(), '2026 Budget', 'Transactions', incremental=True)
+        assert server.sheets['Transactions'][1:] == [
+            ['abc123', '2026-01-02T00:00:00', 'GROCERY', 'Chase', -12.0],
+            ['def456', '2026-01-15T00:00:00', 'TRADER JOES', 'Chase', -45.5],
+        ]
+
+    def test_incremental_export_skips_unchanged_sheet(self, server, year_data):
+        main.export_to_gsheet(year_data.copy(), '2026 Budget', 'Transactions', incremental=True)
+        server.requests.clear()
+        main.export_to_gsheet(year_data.copy(), '2026 Budget', 'Transactions', incremental=True)
+        assert server.writes() == []
+
+    def test_fan_out_writes_month_tabs(self, server, year_data):
+        main.export_tabs_to_gsheet(year_data.copy(), '2026 Budget', by='month')
+        assert server.sheets['January'][1:] == server.sheets['Transactions'][1:]
+        assert len(server.writes()) == 1
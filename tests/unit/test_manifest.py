@@ -0,0 +1,92 @@
+"""
+tests/unit/test_manifest.py — Unit tests for the incremental import manifest.
+"""
+
+import json
+import os
+import pytest
+
+from manifest import ImportManifest, file_sha256
+
+
+# ── Fixtures ──────────────────────────────────────────────────────────────────
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / 'SOFI-Savings.csv'
+    path.write_text("Date,Description,Amount\n2026-01-15,TRADER JOES,-45.50\n")
+    return str(path)
+
+
+@pytest.fixture
+def manifest_path(tmp_path):
+    return str(tmp_path / '.import_manifest.json')
+
+
+def imported(manifest_path, *file_paths):
+    """A saved manifest that has already recorded `file_paths`."""
+    manifest = ImportManifest.load(manifest_path)
+    for file_path in file_paths:
+        manifest.stage(file_path)
+    manifest.save()
+    return ImportManifest.load(manifest_path)
+
+
+# ── Change detection ──────────────────────────────────────────────────────────
+
+class TestIsChanged:
+
+    def test_new_file_is_changed(self, csv_path, manifest_path):
+        assert ImportManifest.load(manifest_path).is_changed(csv_path)
+
+    def test_imported_file_is_unchanged(self, csv_path, manifest_path):
+        assert not imported(manifest_path, csv_path).is_changed(csv_path)
+
+    def test_unchanged_file_is_not_hashed(self, csv_path, manifest_path, mocker):
+        manifest = imported(manifest_path, csv_path)
+        spy = mocker.patch('manifest.file_sha256')
+        manifest.is_changed(csv_path)
+        spy.assert_not_called()
+
+    def test_modified_file_is_changed(self, csv_path, manifest_path):
+        manifest = imported(manifest_path, csv_path)
+        with open(csv_path, 'a') as f:
+            f.write("2026-01-16,METRO FARE,-2.45\n")
+        assert manifest.is_changed(csv_path)
+
+    def test_same_size_edit_is_changed(self, csv_path, manifest_path):
+        manifest = imported(manifest_path, csv_path)
+        with open(csv_path, 'r+') as f:
+            f.seek(len('Date,Description,Amount\n2026-01-1'))
+            f.write('6')
+        os.utime(csv_path, ns=(0, os.stat(csv_path).st_mtime_ns + 10**9))
+        assert manifest.is_changed(csv_path)
+
+    def test_touched_file_is_unchanged(self, csv_path, manifest_path):
+        manifest = imported(manifest_path, csv_path)
+        os.utime(csv_path, ns=(0, os.stat(csv_path).st_mtime_ns + 10**9))
+        assert not manifest.is_changed(csv_path)
+
+
+# ── Persistence ───────────────────────────────────────────────────────────────
+
+class TestSave:
+
+    def test_staged_entries_need_save(self, csv_path, manifest_path):
+        manifest = ImportManifest.load(manifest_path)
+        manifest.stage(csv_path)
+        assert ImportManifest.load(manifest_path).is_changed(csv_path)
+
+    def test_records_size_mtime_and_hash(self, csv_path, manifest_path):
+        imported(manifest_path, csv_path)
+        with open(manifest_path) as f:
+            entry = json.load(f)[os.path.abspath(csv_path)]
+        stat = os.stat(csv_path)
+        assert entry == {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': file_sha256(csv_path)}
+
+    def test_unreadable_manifest_starts_empty(self, csv_path, manifest_path):
+        with open(manifest_path, 'w') as f:
+            f.write('{not json')
+        manifest = ImportManifest.load(manifest_path)
+        assert len(manifest) == 0
+        assert manifest.is_changed(csv_path)
@@ -0,0 +1,25 @@
+"""
+tests/unit/test_migrate_ids.py — Unit tests for the v1 → v2 ID migration.
+"""
+
+from handlers.accounts import ChaseHandler
+from migrate_ids import build_id_mapping
+
+CHASE_CSV = (
+    "Transaction Date,Post Date,Description,Category,Type,Amount,Memo\n"
+    "02/15/2026,02/16/2026,WHOLEFDS,Groceries,Sale,-12.34,\n"
+)
+
+
+class TestBuildIdMapping:
+
+    def test_routes_files_by_content(self, tmp_path):
+        path = tmp_path / 'statement.csv'  # No account in the name
+        path.write_text(CHASE_CSV)
+
+        mapping = build_id_mapping([str(tmp_path)])
+        assert mapping.to_dict('records') == ChaseHandler().id_mapping(str(path)).to_dict('records')
+
+    def test_skips_unrecognized_files(self, tmp_path):
+        (tmp_path / 'Chase_notes.csv').write_text("just,some\nother,data\n")
+        assert build_id_mapping([str(tmp_path)]) is None
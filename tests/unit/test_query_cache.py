@@ -0,0 +1,108 @@
+"""
+tests/unit/test_query_cache.py — Unit tests for the versioned query result cache.
+"""
+
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from handlers.schema import compact
+from query_cache import ParquetQueryCache, QueryCache, cache_key
+
+
+# ── Fixtures ──────────────────────────────────────────────────────────────────
+
+@pytest.fixture(params=['memory', 'parquet'])
+def cache(request, tmp_path):
+    if request.param == 'memory':
+        return QueryCache()
+    return ParquetQueryCache(str(tmp_path / 'query_cache'))
+
+
+@pytest.fixture
+def result_df():
+    return pd.DataFrame({
+        'ID': ['abc123', 'def456'],
+        'Date': pd.to_datetime(['2026-01-15', '2026-01-20']).astype('datetime64[s]'),
+        'Concept': ['TRADER JOES', 'SALARY'],
+        'Account': ['Chase', 'Chase'],
+        'Amount': [-45.50, 3000.00],
+        'Label': ['Groceries', None],
+        'Category': [None, None],
+        'Additional Labels': [None, None],
+    })
+
+
+VERSION = (2, '2026-03-01 09:00:00')
+
+
+# ── Keys ──────────────────────────────────────────────────────────────────────
+
+class TestCacheKey:
+
+    def test_unset_filters_are_ignored(self):
+        assert cache_key(year=2026, month=None, accounts=[]) == cache_key(year=2026)
+
+    def test_different_filters_differ(self):
+        assert cache_key(year=2026) != cache_key(year=2025)
+        assert cache_key(year=2026) != cache_key(year=2026, account='Chase')
+
+    def test_dates_are_supported(self):
+        assert cache_key(start_date=date(2026, 1, 1)) == '{"start_date": "2026-01-01"}'
+
+
+# ── Lookups ───────────────────────────────────────────────────────────────────
+
+class TestQueryCache:
+
+    def test_miss_when_empty(self, cache):
+        assert cache.get(cache_key(year=2026), VERSION) is None
+
+    def test_hit_returns_equal_frame(self, cache, result_df):
+        cache.put(cache_key(year=2026), VERSION, result_df)
+        pd.testing.assert_frame_equal(cache.get(cache_key(year=2026), VERSION), result_df)
+
+    def test_miss_when_version_changed(self, cache, result_df):
+        cache.put(cache_key(year=2026), VERSION, result_df)
+        assert cache.get(cache_key(year=2026), (3, '2026-03-02 09:00:00')) is None
+
+    def test_miss_for_other_filters(self, cache, result_df):
+        cache.put(cache_key(year=2026), VERSION, result_df)
+        assert cache.get(cache_key(year=2026, month=1), VERSION) is None
+
+    def test_empty_result_is_cached(self, cache):
+        cache.put(cache_key(year=2030), VERSION, pd.DataFrame())
+        assert cache.get(cache_key(year=2030), VERSION).empty
+
+    def test_hit_is_a_copy(self, cache, result_df):
+        cache.put(cache_key(year=2026), VERSION, result_df)
+        hit = cache.get(cache_key(year=2026), VERSION)
+        hit.loc[0, 'Label'] = 'Changed'
+        assert cache.get(cache_key(year=2026), VERSION).loc[0, 'Label'] == 'Groceries'
+
+    def test_clear(self, cache, result_df):
+        cache.put(cache_key(year=2026), VERSION, result_df)
+        cache.clear()
+        assert cache.get(cache_key(year=2026), VERSION) is None
+
+
+class TestParquetQueryCache:
+
+    def test_persists_across_instances(self, tmp_path, result_df):
+        directory = str(tmp_path / 'query_cache')
+        ParquetQueryCache(directory).put(cache_key(year=2026), VERSION, result_df)
+        pd.testing.assert_frame_equal(ParquetQueryCache(directory).get(cache_key(year=2026), VERSION), result_df)
+
+    def test_unreadable_entry_is_a_miss(self, tmp_path, result_df):
+        cache = ParquetQueryCache(str(tmp_path))
+        cache.put(cache_key(year=2026), VERSION, result_df)
+        with open(cache._path(cache_key(year=2026)), 'wb') as f:
+            f.write(b'not parquet')
+        assert cache.get(cache_key(year=2026), VERSION) is None
+
+    def test_compact_dtypes_round_trip(self, tmp_path, result_df):
+        cache = ParquetQueryCache(str(tmp_path))
+        df = compact(result_df.assign(Amount=[-4550, 300000]))
+        cache.put(cache_key(year=2026), VERSION, df)
+        pd.testing.assert_frame_equal(cache.get(cache_key(year=2026), VERSION), df)
@@ -0,0 +1,306 @@
+"""
+tests/unit/test_sheets.py — Unit tests for the incremental Google Sheets
+export, run against a local fake Sheets server.
+"""
+
+import os
+import threading
+from unittest import mock
+
+import gspread
+import pandas as pd
+import pytest
+import requests
+
+from handlers.schema import compact
+from sheets import (
+    ChunkedWriter, a1_range, column_letter, export_tabs, partition_rows, row_fingerprint, serialize, sync_rows,
+)
+from tests.fake_sheets import FakeSheetsServer
+
+HEADER = ['ID', 'Date', 'Concept', 'Account', 'Amount', 'Additional Labels']
+
+
+# ── Fixtures ──────────────────────────────────────────────────────────────────
+
+@pytest.fixture
+def rows():
+    return [
+        ['abc123', '2026-01-02T00:00:00', 'GROCERY', 'Chase', -12.0, ''],
+        ['def456', '2026-01-15T00:00:00', 'TRADER JOES', 'Chase', -45.5, ''],
+        ['ghi789', '2026-02-01T00:00:00', 'SALARY', 'SoFi Savings', 3000.0, 'payroll'],
+    ]
+
+
+@pytest.fixture
+def server():
+    with FakeSheetsServer({'Transactions': [HEADER]}) as server:
+        yield server
+
+
+@pytest.fixture
+def worksheet(server):
+    return server.client().open_by_key(FakeSheetsServer.SPREADSHEET_ID).worksheet('Transactions')
+
+
+# ── Serialization ─────────────────────────────────────────────────────────────
+
+class TestSerialize:
+
+    @pytest.fixture
+    def df(self):
+        return compact(pd.DataFrame({
+            'ID': ['abc123', 'def456'],
+            'Date': pd.to_datetime(['2026-01-02', None]),
+            'Concept': ['GROCERY', None],
+            'Account': ['Chase', 'Chase'],
+            'Amount': [-1200, 333],  # Cents
+            'Additional Labels': [None, 'travel'],
+        }))
+
+    def test_converts_each_column(self, df):
+        assert serialize(df) == [
+            ['abc123', '2026-01-02T00:00:00', 'GROCERY', 'Chase', -12.0, ''],
+            ['def456', '', '', 'Chase', 3.33, 'travel'],
+        ]
+
+    def test_amounts_must_be_cents(self):
+        with pytest.raises(ValueError, match='whole numbers'):
+            serialize(pd.DataFrame({'Amount': [1.005, 2.0]}))
+
+    def test_empty_frame(self, df):
+        assert serialize(df.iloc[:0]) == []
+
+
+# ── A1 notation ───────────────────────────────────────────────────────────────
+
+class TestA1:
+
+    @pytest.mark.parametrize('column, letters', [(1, 'A'), (26, 'Z'), (27, 'AA'), (52, 'AZ'), (703, 'AAA')])
+    def test_column_letter(self, column, letters):
+        assert column_letter(column) == letters
+
+    def test_range(self):
+        assert a1_range(2, 1, 10, 28) == 'A2:AB10'
+
+
+# ── Fingerprints ──────────────────────────────────────────────────────────────
+
+class TestRowFingerprint:
+
+    def test_matches_values_read_back(self):
+        assert row_fingerprint(['abc', 3000.0, None, '']) == row_fingerprint(['abc', 3000])
+
+    def test_differs_on_content(self):
+        assert row_fingerprint(['abc', -12.0]) != row_fingerprint(['abc', -12.5])
+
+
+# ── Sync ──────────────────────────────────────────────────────────────────────
+
+class TestSyncRows:
+
+    def test_first_sync_writes_every_row(self, server, worksheet, rows):
+        result = sync_rows(worksheet, rows)
+        assert result == {'written': 3, 'unchanged': 0, 'cleared': 0, 'new': 3, 'total': 3}
+        assert server.sheets['Transactions'][1:] == rows
+        assert server.sheets['Transactions'][0] == HEADER
+
+    def test_unchanged_sheet_is_only_read(self, server, worksheet, rows):
+        sync_rows(worksheet, rows)
+        server.requests.clear()
+        assert sync_rows(worksheet, rows)['written'] == 0
+        assert server.writes() == []
+
+    def test_appended_rows_are_written_in_one_call(self, server, worksheet, rows):
+        sync_rows(worksheet, rows[:1])
+        server.requests.clear()
+
+        result = sync_rows(worksheet, rows)
+        assert result == {'written': 2, 'unchanged': 1, 'cleared': 0, 'new': 2, 'total': 3}
+        assert len(server.writes()) == 1
+        assert server.sheets['Transactions'][1:] == rows
+
+    def test_only_changed_rows_are_rewritten(self, server, worksheet, rows):
+        sync_rows(worksheet, rows)
+        server.sheets['Transactions'][1][2] = 'EDITED BY HAND'
+        server.sheets['Transactions'][3][2] = 'EDITED BY HAND'
+
+        result = sync_rows(worksheet, rows)
+        assert result['written'] == 2
+        assert result['new'] == 0
+        assert server.sheets['Transactions'][1:] == rows
+
+    def test_null_cells_are_cleared(self, server, worksheet, rows):
+        sync_rows(worksheet, rows)
+        rows[2][5] = None
+        sync_rows(worksheet, rows)
+        assert server.sheets['Transactions'][3][5] == ''
+
+    def test_stale_rows_below_data_are_cleared(self, server, worksheet, rows):
+        sync_rows(worksheet, rows)
+        result = sync_rows(worksheet, rows[1:])
+        assert result['cleared'] == 1
+        assert server.sheets['Transactions'][1:3] == rows[1:]
+        assert not any(server.sheets['Transactions'][3])
+
+
+# ── Chunked writer ────────────────────────────────────────────────────────────
+
+class TestChunkedWriter:
+
+    @pytest.fixture
+    def many_rows(self):
+        return [[f'id{i:03}', f'2026-01-{i % 28 + 1:02}T00:00:00', 'CONCEPT', 'Chase', float(i), ''] for i in range(100)]
+
+    def test_splits_rows_into_bounded_requests(self, server, worksheet, many_rows):
+        writer = ChunkedWriter(max_cells=60, workers=3, retry_delay=0)
+        assert writer.write(worksheet, [(2, many_rows)]) == {'requests': 10, 'sent': 10, 'resumed': 0, 'retries': 0}
+        assert len(server.writes()) == 10
+        assert server.sheets['Transactions'][1:] == [row[:5] + [''] for row in many_rows]
+
+    def test_packs_small_blocks_into_one_request(self, server, worksheet, rows):
+        result = ChunkedWriter(retry_delay=0).write(worksheet, [(2, rows[:1]), (5, rows[1:])])
+        assert result['requests'] == 1
+        assert server.sheets['Transactions'][4:6] == rows[1:]
+
+    def test_retries_quota_and_server_errors(self, server, worksheet, rows):
+        server.fail(429)
+        server.fail(503)
+        result = ChunkedWriter(retry_delay=0).write(worksheet, [(2, rows)])
+        assert result['retries'] == 2
+        assert server.sheets['Transactions'][1:] == rows
+
+    def test_client_errors_are_not_retried(self, server, worksheet, rows):
+        server.fail(400)
+        with pytest.raises(gspread.exceptions.APIError):
+            ChunkedWriter(retry_delay=0).write(worksheet, [(2, rows)])
+        assert len(server.writes()) == 1
+
+    def test_resumes_after_last_confirmed_request(self, server, worksheet, many_rows, tmp_path):
+        checkpoint = str(tmp_path / 'checkpoint.json')
+        writer = ChunkedWriter(max_cells=60, workers=1, checkpoint_path=checkpoint, max_attempts=2, retry_delay=0)
+
+        server.fail(503, times=2, after=4)  # The fifth request fails on both attempts
+        with pytest.raises(gspread.exceptions.APIError):
+            writer.write(worksheet, [(2, many_rows)])
+
+        server.requests.clear()
+        assert writer.write(worksheet, [(2, many_rows)]) == {'requests': 10, 'sent': 6, 'resumed': 4, 'retries': 0}
+        assert len(server.writes()) == 6
+        assert server.sheets['Transactions'][1:] == [row[:5] + [''] for row in many_rows]
+
+    def test_changed_rows_are_not_resumed(self, server, worksheet, many_rows, tmp_path):
+        checkpoint = str(tmp_path / 'checkpoint.json')
+        writer = ChunkedWriter(max_cells=60, workers=1, checkpoint_path=checkpoint, max_attempts=1, retry_delay=0)
+
+        server.fail(503, after=4)
+        with pytest.raises(gspread.exceptions.APIError):
+            writer.write(worksheet, [(2, many_rows)])
+
+        many_rows[0][2] = 'CHANGED'
+        assert writer.write(worksheet, [(2, many_rows)])['resumed'] == 3
+        assert server.sheets['Transactions'][1][2] == 'CHANGED'
+
+    def test_checkpoint_is_kept_per_worksheet(self, many_rows, tmp_path):
+        checkpoint = str(tmp_path / 'checkpoint.json')
+        writer = ChunkedWriter(max_cells=60, workers=1, checkpoint_path=checkpoint, max_attempts=1, retry_delay=0)
+
+        with FakeSheetsServer({'Transactions': [HEADER], 'Copy': [HEADER]}) as server:
+            spreadsheet = server.client().open_by_key(FakeSheetsServer.SPREADSHEET_ID)
+            server.fail(503, after=4)
+            with pytest.raises(gspread.exceptions.APIError):
+                writer.write(spreadsheet.worksheet('Transactions'), [(2, many_rows)])
+
+            # The same rows on another worksheet are all sent
+            assert writer.write(spreadsheet.worksheet('Copy'), [(2, many_rows)])['resumed'] == 0
+            assert server.sheets['Copy'][1:] == [row[:5] + [''] for row in many_rows]
+            assert writer.write(spreadsheet.worksheet('Transactions'), [(2, many_rows)])['resumed'] == 4
+        assert not os.path.exists(checkpoint)
+
+    def test_each_worker_has_its_own_session(self, worksheet, many_rows):
+        used = []  # (thread, session) per request sent
+        send = requests.Session.send
+
+        def record(session, request, **kwargs):
+            used.append((threading.get_ident(), session))
+            return send(session, request, **kwargs)
+
+        with mock.patch.object(requests.Session, 'send', autospec=True, side_effect=record):
+            ChunkedWriter(max_cells=60, workers=3, retry_delay=0).write(worksheet, [(2, many_rows)])
+
+        sessions = {id(session): thread for thread, session in used}
+        assert worksheet.client.session not in [session for _, session in used]
+        assert len(sessions) == len({thread for thread, _ in used})  # One session per thread
+
+
+# ── Fan-out export ────────────────────────────────────────────────────────────
+
+class TestPartitionRows:
+
+    @pytest.fixture
+    def df(self):
+        return compact(pd.DataFrame({
+            'Date': pd.to_datetime(['2026-01-02', '2026-01-15', '2026-02-01']),
+            'Account': ['Chase', 'SoFi Savings', 'Chase'],
+            'Category': ['Food', None, 'Food'],
+        }))
+
+    def test_by_month(self, df):
+        assert partition_rows(df, 'month') == {'January': [0, 1], 'February': [2]}
+
+    def test_by_account(self, df):
+        assert partition_rows(df, 'account') == {'Chase': [0, 2], 'SoFi Savings': [1]}
+
+    def test_by_category_names_missing_ones(self, df):
+        assert partition_rows(df, 'category') == {'Food': [0, 2], 'Uncategorized': [1]}
+
+    def test_unknown_key_raises(self, df):
+        with pytest.raises(ValueError, match='Unknown fan-out key'):
+            partition_rows(df, 'week')
+
+
+class TestExportTabs:
+
+    @pytest.fixture
+    def spreadsheet(self, server):
+        return server.client().open_by_key(FakeSheetsServer.SPREADSHEET_ID)
+
+    def test_writes_every_tab_in_one_request(self, server, spreadsheet, rows):
+        tabs = {'Transactions': rows, 'January': rows[:2], 'February': rows[2:]}
+        server.requests.clear()
+
+        result = export_tabs(spreadsheet, tabs, header=HEADER)
+        assert result == {'tabs': 3, 'created': ['January', 'February'], 'rows': 6}
+        assert len(server.writes()) == 1
+        assert server.sheets['Transactions'] == [HEADER] + rows
+        assert server.sheets['January'] == [HEADER] + rows[:2]
+        assert server.sheets['February'] == [HEADER] + rows[2:]
+
+    def test_replaces_existing_rows(self, server, spreadsheet, rows):
+        export_tabs(spreadsheet, {'January': rows}, header=HEADER)
+        export_tabs(spreadsheet, {'January': rows[:1]}, header=HEADER)
+        assert server.sheets['January'][:2] == [HEADER, rows[0]]
+        assert not any(cell for row in server.sheets['January'][2:] for cell in row)
+
+    def test_tabs_grow_past_the_default_grid(self, server, spreadsheet, rows):
+        many_rows = [[f'id{i:04}'] + rows[0][1:] for i in range(1500)]
+        result = export_tabs(spreadsheet, {'Transactions': many_rows, 'Uncategorized': many_rows}, header=HEADER)
+        assert result['rows'] == 3000
+        assert server.sheets['Transactions'][1:] == many_rows  # Existing tab, appended to
+        assert server.sheets['Uncategorized'][1:] == many_rows  # Created large enough
+        assert server.grids['Transactions'][0] >= 1501
+
+    def test_fake_rejects_writes_past_the_grid(self, server, spreadsheet, rows):
+        request = {'updateCells': {
+            'start': {'sheetId': 0, 'rowIndex': 1000, 'columnIndex': 0},
+            'rows': [{'values': [{'userEnteredValue': {'stringValue': 'x'}}]}],
+            'fields': 'userEnteredValue',
+        }}
+        with pytest.raises(gspread.exceptions.APIError, match='exceeds grid limits'):
+            spreadsheet.batch_update({'requests': [request]})
+
+    def test_retries_server_errors(self, server, spreadsheet, rows, monkeypatch):
+        monkeypatch.setattr('time.sleep', lambda seconds: None)
+        server.fail(503)
+        export_tabs(spreadsheet, {'January': rows}, header=HEADER)
+        assert server.sheets['January'] == [HEADER] + rows
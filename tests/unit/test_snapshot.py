@@ -0,0 +1,139 @@
+"""
+tests/unit/test_snapshot.py — Unit tests for the incremental Parquet
+snapshot, run on the embedded SQLite backend.
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from db import DBConfig, SQLiteDatabase
+from handlers.schema import to_cents
+from snapshot import STATE_FILE, export_snapshot, load_snapshot
+
+
+# ── Fixtures ──────────────────────────────────────────────────────────────────
+
+@pytest.fixture
+def db():
+    with SQLiteDatabase.connect(DBConfig(sqlite_path=':memory:')) as db:
+        yield db
+
+
+@pytest.fixture
+def directory(tmp_path):
+    return str(tmp_path / 'snapshot')
+
+
+@pytest.fixture
+def sample_df():
+    return pd.DataFrame({
+        'ID': ['abc123', 'def456', 'ghi789', 'jkl012'],
+        'Date': pd.to_datetime(['2025-12-31', '2026-01-15', '2026-02-01', '2026-02-20']),
+        'Concept': ['GROCERY', 'TRADER JOES', 'SALARY', 'RENT'],
+        'Account': ['Chase', 'Chase', 'SoFi Savings', 'Chase'],
+        'Amount': to_cents([-12.00, -45.50, 3000.00, -1500.00]),
+        'Label': [None, 'Groceries', None, None],
+    })
+
+
+def _sorted(df):
+    return df.sort_values('ID', ignore_index=True)
+
+
+# ── Export ────────────────────────────────────────────────────────────────────
+
+class TestExportSnapshot:
+
+    def test_first_export_writes_every_row(self, db, directory, sample_df):
+        db.upsert_transactions(sample_df)
+        assert export_snapshot(db, directory) == {'rows': 4, 'partitions': 3}
+        pd.testing.assert_frame_equal(
+            _sorted(load_snapshot(directory)),
+            _sorted(db.query_transactions()),
+            check_dtype=False,  # All-null categoricals differ only in their (empty) categories' dtype
+            check_categorical=False,
+        )
+
+    def test_partitions_by_year_and_account(self, db, directory, sample_df):
+        db.upsert_transactions(sample_df)
+        export_snapshot(db, directory)
+        assert sorted(os.listdir(directory)) == [STATE_FILE, 'year=2025', 'year=2026']
+        assert sorted(os.listdir(os.path.join(directory, 'year=2026'))) == ['account=Chase', 'account=SoFi%20Savings']
+
+    def test_rewrites_only_changed_rows(self, db, directory, sample_df):
+        db.upsert_transactions(sample_df)
+        export_snapshot(db, directory)
+        db._conn.execute("UPDATE transactions SET updated_at = '2000-01-01 00:00:00'")
+
+        new = sample_df.iloc[[1]].assign(ID='mno345', Concept='COFFEE')
+        db.upsert_transactions(new)
+        assert export_snapshot(db, directory) == {'rows': 1, 'partitions': 1}
+        assert sorted(load_snapshot(directory)['ID']) == ['abc123', 'def456', 'ghi789', 'jkl012', 'mno345']
+
+    def test_label_edit_replaces_row(self, db, directory, sample_df):
+        db.upsert_transactions(sample_df)
+        export_snapshot(db, directory)
+        db._conn.execute("UPDATE transactions SET updated_at = '2000-01-01 00:00:00'")
+
+        db._conn.execute("UPDATE transactions SET label = 'Income' WHERE id = 'ghi789'")
+        assert export_snapshot(db, directory)['rows'] == 1
+        result = load_snapshot(directory).set_index('ID')
+        assert len(result) == 4
+        assert result.loc['ghi789', 'Label'] == 'Income'
+
+    def test_nothing_changed_writes_nothing(self, db, directory, sample_df):
+        db.upsert_transactions(sample_df)
+        export_snapshot(db, directory)
+        db._conn.execute("UPDATE transactions SET updated_at = '2000-01-01 00:00:00'")
+        assert export_snapshot(db, directory) == {'rows': 0, 'partitions': 0}
+
+    def test_full_rebuild_drops_deleted_rows(self, db, directory, sample_df):
+        db.upsert_transactions(sample_df)
+        export_snapshot(db, directory)
+        db._conn.execute("DELETE FROM transactions WHERE id = 'abc123'")
+
+        export_snapshot(db, directory, full=True)
+        assert sorted(load_snapshot(directory)['ID']) == ['def456', 'ghi789', 'jkl012']
+        assert not os.path.exists(os.path.join(directory, 'year=2025'))
+
+    @pytest.mark.parametrize('state', [None, 'not json'])
+    def test_rebuild_keeps_files_it_does_not_own(self, db, directory, sample_df, state):
+        os.makedirs(directory)
+        with open(os.path.join(directory, 'budget.sqlite3'), 'w') as f:
+            f.write('not part of the snapshot')
+        if state is not None:
+            with open(os.path.join(directory, STATE_FILE), 'w') as f:
+                f.write(state)
+
+        db.upsert_transactions(sample_df)
+        export_snapshot(db, directory)
+        export_snapshot(db, directory, full=True)
+        assert os.path.exists(os.path.join(directory, 'budget.sqlite3'))
+        assert len(load_snapshot(directory)) == len(sample_df)
+
+    def test_empty_database_exports_nothing(self, db, directory):
+        assert export_snapshot(db, directory) == {'rows': 0, 'partitions': 0}
+
+
+# ── Load ──────────────────────────────────────────────────────────────────────
+
+class TestLoadSnapshot:
+
+    @pytest.fixture(autouse=True)
+    def exported(self, db, directory, sample_df):
+        db.upsert_transactions(sample_df)
+        export_snapshot(db, directory)
+
+    def test_returns_query_schema(self, db, directory):
+        result = load_snapshot(directory)
+        assert list(result.columns) == list(SQLiteDatabase.QUERY_COLUMNS.values())
+        assert result['Amount'].dtype == 'int64'
+        assert isinstance(result['Account'].dtype, pd.CategoricalDtype)
+
+    def test_filters_by_year(self, directory):
+        assert sorted(load_snapshot(directory, years=[2026])['ID']) == ['def456', 'ghi789', 'jkl012']
+
+    def test_filters_by_year_and_account(self, directory):
+        assert sorted(load_snapshot(directory, years=[2026], accounts=['Chase'])['ID']) == ['def456', 'jkl012']